@@ -9,6 +9,25 @@ class BaseConfig:
     ENV_CONFIG_DIR = BASE_DIR / "config" / "environments"
     REPORT_DIR = BASE_DIR / "reports" / "allure-results"
     RECORD_VIDEO_DIR = BASE_DIR / "reports" / "videos"
+    ATTACHMENT_STORE_DIR = BASE_DIR / "reports" / "attachment-store"
+    PAGE_METRICS_FILE = BASE_DIR / "reports" / "page-metrics.json"
+    PERF_BUDGETS_FILE = BASE_DIR / "config" / "perf_budgets.yaml"
+    TEST_BUDGETS_FILE = BASE_DIR / "config" / "test_budgets.yaml"
+    WATCHDOG_DIR = BASE_DIR / "reports" / "watchdog"
+    MEMORY_FILE = BASE_DIR / "reports" / "memory.json"
+    FLIGHT_RECORDER_DIR = BASE_DIR / "reports" / "flight-recorder"
+    STAGE_TIMINGS_FILE = BASE_DIR / "reports" / "stage-timings.json"
+    VISUAL_DIFF_DIR = BASE_DIR / "reports" / "visual-diff"
+    VISUAL_BASELINE_DIR = BASE_DIR / "test_data" / "visual_baselines"
+    # Kept across runs, unlike reports/ and logs/ which are wiped at session start
+    METRICS_DIR = BASE_DIR / "metrics"
+    TRANSITIONS_HISTORY_FILE = METRICS_DIR / "transitions.jsonl"
+    METRICS_DB = METRICS_DIR / "runs.sqlite3"
+    SOAK_DIR = METRICS_DIR / "soak"
+    BROWSER_DAEMON_DIR = BASE_DIR / ".browser-daemon"
+    SNAPSHOT_HISTORY_DIR = METRICS_DIR / "snapshots"
+    LEAD_POOL_DB = BASE_DIR / "test_data" / "lead_pool.sqlite3"
+    PAYMENT_STUB_CONFIG = BASE_DIR / "test_data" / "payment_stub.json"
 
     load_dotenv(dotenv_path=BASE_DIR / ".env")
 
@@ -17,3 +36,25 @@ class BaseConfig:
     BROWSER = os.getenv("BROWSER", "chromium").lower()
     PREBUY = os.getenv("PREBUY", "True").lower() in ("true", "1", "yes")
     DECISION = os.getenv("DECISION", "IMMDEDIATE")
+    LAUNCH_PROFILE = os.getenv("LAUNCH_PROFILE", "default")
+    HTTP_CACHE_DIR = os.getenv("HTTP_CACHE_DIR")
+    PAGE_METRICS = os.getenv("PAGE_METRICS", "False").lower() in ("true", "1", "yes")
+    NETWORK_PROFILE = os.getenv("NETWORK_PROFILE", "none")
+    CPU_THROTTLE = float(os.getenv("CPU_THROTTLE", "1"))
+    TRANSITION_METRICS = os.getenv("TRANSITION_METRICS", "True").lower() in ("true", "1", "yes")
+    RUN_METRICS_DB = os.getenv("RUN_METRICS_DB", str(METRICS_DB))
+    DEFAULT_TIMEOUT_MS = int(os.getenv("DEFAULT_TIMEOUT_MS", "60000"))
+    ADAPTIVE_RETRIES = os.getenv("ADAPTIVE_RETRIES", "False").lower() in ("true", "1", "yes")
+    LEAD_POOL = os.getenv("LEAD_POOL")
+    PAYMENT_STUB = os.getenv("PAYMENT_STUB", "off")
+    CAPTURE_MODE = os.getenv("CAPTURE_MODE", "png").lower()
+    VISUAL_DIFF = os.getenv("VISUAL_DIFF", "False").lower() in ("true", "1", "yes")
+    DAG_WORKERS = int(os.getenv("DAG_WORKERS", "0"))
+    WATCHDOG_GRACE = float(os.getenv("WATCHDOG_GRACE", "0"))
+    FLIGHT_RECORDER_SIZE = int(os.getenv("FLIGHT_RECORDER_SIZE", "500"))
+    MEMORY_SAMPLING = os.getenv("MEMORY_SAMPLING", "True").lower() in ("true", "1", "yes")
+    RECYCLE_AFTER_CONTEXTS = int(os.getenv("RECYCLE_AFTER_CONTEXTS", "0"))
+    RECYCLE_ABOVE_MB = float(os.getenv("RECYCLE_ABOVE_MB", "0"))
+    BROWSER_SERVERS = os.getenv("BROWSER_SERVERS", "")
+    BROWSER_DAEMON = os.getenv("BROWSER_DAEMON", "auto").lower()
+    VISUAL_TRUST_PHASH = os.getenv("VISUAL_TRUST_PHASH", "False").lower() in ("true", "1", "yes")
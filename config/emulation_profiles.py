@@ -0,0 +1,48 @@
+# Network emulation profiles selectable with --network-profile, applied through CDP
+# (Network.emulateNetworkConditions). Throughput is in bytes per second, latency in ms.
+# Values follow the Chrome DevTools presets.
+NETWORK_PROFILES = {
+    "none": None,
+    "slow-3g": {
+        "offline": False,
+        "latency": 2000,
+        "downloadThroughput": 500 * 1000 / 8 * 0.8,
+        "uploadThroughput": 500 * 1000 / 8 * 0.8,
+    },
+    "fast-3g": {
+        "offline": False,
+        "latency": 562.5,
+        "downloadThroughput": 1.6 * 1000 * 1000 / 8 * 0.9,
+        "uploadThroughput": 750 * 1000 / 8 * 0.9,
+    },
+    "4g": {
+        "offline": False,
+        "latency": 170,
+        "downloadThroughput": 9 * 1000 * 1000 / 8 * 0.9,
+        "uploadThroughput": 1.5 * 1000 * 1000 / 8 * 0.9,
+    },
+}
+
+
+def emulation_label(network_profile, cpu_throttle):
+    """Human-readable name of the active emulation, e.g. 'slow-3g + 4x CPU'."""
+    parts = []
+    if network_profile and network_profile != "none":
+        parts.append(network_profile)
+    if cpu_throttle and cpu_throttle > 1:
+        parts.append(f"{cpu_throttle:g}x CPU")
+    return " + ".join(parts) or "no emulation"
+
+
+def apply_emulation(context, page, network_profile, cpu_throttle):
+    """Throttle the page's network and CPU through a CDP session (Chromium only)."""
+    conditions = NETWORK_PROFILES[network_profile]
+    if not conditions and not (cpu_throttle and cpu_throttle > 1):
+        return None
+    cdp = context.new_cdp_session(page)
+    if conditions:
+        cdp.send("Network.enable")
+        cdp.send("Network.emulateNetworkConditions", conditions)
+    if cpu_throttle and cpu_throttle > 1:
+        cdp.send("Emulation.setCPUThrottlingRate", {"rate": cpu_throttle})
+    return cdp
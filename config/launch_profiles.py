@@ -0,0 +1,51 @@
+# Browser launch profiles selectable with --launch-profile
+
+# Keep background tabs, timers and renderers running at full speed and skip
+# first-run/background network work that only adds noise to funnel timings.
+CHROMIUM_PERFORMANCE_ARGS = [
+    "--disable-background-timer-throttling",
+    "--disable-backgrounding-occluded-windows",
+    "--disable-renderer-backgrounding",
+    "--disable-background-networking",
+    "--disable-component-update",
+    "--disable-default-apps",
+    "--disable-extensions",
+    "--disable-sync",
+    "--disable-domain-reliability",
+    "--disable-client-side-phishing-detection",
+    "--disable-hang-monitor",
+    "--disable-ipc-flooding-protection",
+    "--disable-features=Translate,OptimizationHints,MediaRouter,CalculateNativeWinOcclusion",
+    "--metrics-recording-only",
+    "--no-first-run",
+    "--mute-audio",
+]
+
+FIREFOX_PERFORMANCE_PREFS = {
+    "dom.min_background_timeout_value": 0,
+    "dom.timeout.enable_budget_timer_throttling": False,
+    "browser.shell.checkDefaultBrowser": False,
+    "app.update.enabled": False,
+    "datareporting.policy.dataSubmissionEnabled": False,
+    "toolkit.telemetry.enabled": False,
+    "extensions.update.enabled": False,
+    "media.volume_scale": "0.0",
+}
+
+LAUNCH_PROFILES = {
+    "default": {},
+    "performance": {
+        "chromium": {"args": CHROMIUM_PERFORMANCE_ARGS},
+        "firefox": {"firefox_user_prefs": FIREFOX_PERFORMANCE_PREFS},
+        "webkit": {},
+    },
+}
+
+
+def launch_options(profile, browser_name, headless):
+    """Return the keyword arguments for browser_type.launch() under the given profile."""
+    if profile not in LAUNCH_PROFILES:
+        raise ValueError(f"Unknown launch profile: '{profile}'. Use {', '.join(LAUNCH_PROFILES)}.")
+    options = {"headless": headless}
+    options.update(LAUNCH_PROFILES[profile].get(browser_name, {}))
+    return options
@@ -1,4 +1,4 @@
-import yaml
+import functools
 from config.base_config import BaseConfig
 
 ENV = BaseConfig.ENV
@@ -7,12 +7,25 @@ BROWSER = BaseConfig.BROWSER
 PREBUY = BaseConfig.PREBUY
 DECISION = BaseConfig.DECISION
 
-try:
-    yaml_path = BaseConfig.ENV_CONFIG_DIR / f"{ENV}.yaml"
-    with open(yaml_path, "r") as file:
-        config_data = yaml.safe_load(file)
-        BASE_URL = config_data.get("college_bridge_url")
-        print(f"[INFO] Loaded BASE_URL from {yaml_path}: {BASE_URL}")
-except FileNotFoundError:
-    print(f"[ERROR] {ENV}.yaml file not found in config/environments.")
-    BASE_URL = None
+
+@functools.lru_cache(maxsize=None)
+def load_environment_config(env=ENV):
+    """Load config/environments/<env>.yaml on first use instead of at import time."""
+    import yaml
+
+    yaml_path = BaseConfig.ENV_CONFIG_DIR / f"{env}.yaml"
+    try:
+        with open(yaml_path, "r") as file:
+            config_data = yaml.safe_load(file) or {}
+            print(f"[INFO] Loaded BASE_URL from {yaml_path}: {config_data.get('college_bridge_url')}")
+            return config_data
+    except FileNotFoundError:
+        print(f"[ERROR] {env}.yaml file not found in config/environments.")
+        return {}
+
+
+def __getattr__(name):
+    # Module-level lazy attributes; BASE_URL stays importable as before
+    if name == "BASE_URL":
+        return load_environment_config().get("college_bridge_url")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
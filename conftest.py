@@ -1,13 +1,35 @@
+import json
 import pytest
 import allure
-from playwright.sync_api import sync_playwright
 
 from config.base_config import BaseConfig
+from config.launch_profiles import LAUNCH_PROFILES, launch_options
+from config.emulation_profiles import NETWORK_PROFILES, apply_emulation, emulation_label
+from utils.page_metrics import PAGE_METRICS, VITALS_INIT_SCRIPT, load_budgets
+from utils.transitions import TRANSITIONS, TRANSITION_INIT_SCRIPT, edge_percentiles, format_edges
+from utils.stage_timings import STAGE_TIMINGS
+from utils.retry_telemetry import RETRY_TELEMETRY, AdaptivePolicy
+from utils.payment_stub import parse_mode
+from utils.snapshots import CAPTURE_MODES, STEP_SNAPSHOTS, session_run_id
+from utils.dag_scheduler import is_worker
+from utils.flight_recorder import FlightRecorder
+from utils.browser_memory import MEMORY, RecyclingBrowser
+from utils.browser_servers import BrowserServerPool, parse_endpoints, worker_index
+from utils.browser_daemon import daemon_for
+from utils.budget import BUDGETS, Watchdog, budget_for, load_test_budgets
 from utils.helpers import take_screenshot
+from utils.attachments import install_linking_file_logger
+from datetime import datetime
 import shutil
 import os
 import pytest
 
+RUN_STARTED_AT = pytest.StashKey[str]()
+TEST_BUDGETS = pytest.StashKey[dict]()
+WATCHDOG = pytest.StashKey[Watchdog]()
+
+pytest_plugins = ["utils.dag_scheduler"]
+
 def clean_directory(directory):
     if os.path.exists(directory):
         for filename in os.listdir(directory):
@@ -22,14 +44,170 @@ def clean_directory(directory):
     else:
         os.makedirs(directory)
 
+@pytest.hookimpl(tryfirst=True)
+def pytest_configure(config):
+    """Link Allure attachments into the results directory instead of copying them."""
+    install_linking_file_logger()
+    PAGE_METRICS.enabled = config.getoption("--page-metrics")
+    TRANSITIONS.enabled = config.getoption("--transition-metrics").lower() == "true"
+
+    network_profile = config.getoption("--network-profile")
+    cpu_throttle = config.getoption("--cpu-throttle")
+    STAGE_TIMINGS.label = emulation_label(network_profile, cpu_throttle)
+    if STAGE_TIMINGS.label != "no emulation" and config.getoption("--test-browser").lower() != "chromium":
+        raise pytest.UsageError("--network-profile and --cpu-throttle use CDP and need --test-browser=chromium")
+
+    STEP_SNAPSHOTS.mode = config.getoption("--capture-mode")
+    # Set before any DAG worker starts, so every worker writes to this run's snapshot directory
+    STEP_SNAPSHOTS.run_id = session_run_id()
+    MEMORY.enabled = config.getoption("--memory-sampling").lower() == "true"
+    if config.getoption("--test-budgets"):
+        config.stash[TEST_BUDGETS] = load_test_budgets(config.getoption("--test-budgets"))
+        if config.getoption("--watchdog-grace") > 0:
+            config.stash[WATCHDOG] = Watchdog(config.getoption("--watchdog-grace"))
+    try:
+        parse_mode(config.getoption("--payment-stub"))
+        parse_endpoints(config.getoption("--browser-servers"))
+    except ValueError as e:
+        raise pytest.UsageError(str(e))
+
+    if config.getoption("--adaptive-retries"):
+        metrics_db = config.getoption("--run-metrics-db")
+        if not metrics_db:
+            raise pytest.UsageError("--adaptive-retries learns from the run history and needs --run-metrics-db")
+        RETRY_TELEMETRY.policy = AdaptivePolicy.from_store(
+            metrics_db, last_runs=config.getoption("--adaptive-history-runs"))
+
 def pytest_sessionstart(session):
     """Hook to clean up folders before test session starts."""
+    # Scheduler workers share the controller's freshly cleaned directories
+    if session.config.option.collectonly or is_worker(session.config):
+        return
+    session.config.stash[RUN_STARTED_AT] = datetime.now().isoformat(timespec="seconds")
     clean_directory(BaseConfig.REPORT_DIR)
     clean_directory(BaseConfig.SCREENSHOT_DIR)
     clean_directory(BaseConfig.RECORD_VIDEO_DIR)
+    clean_directory(BaseConfig.ATTACHMENT_STORE_DIR)
+    clean_directory(BaseConfig.FLIGHT_RECORDER_DIR)
+    clean_directory(BaseConfig.WATCHDOG_DIR)
     clean_directory(BaseConfig.LOGS_DIR)
     print("✅ Cleaned reports/ , screenshots/ and video/ folders.")
 
+def pytest_sessionfinish(session, exitstatus):
+    """Save page-performance metrics and fail the run when a page exceeds its budget."""
+    if is_worker(session.config):
+        return  # the scheduler controller saves and checks the merged results
+    if STAGE_TIMINGS.stages:
+        STAGE_TIMINGS.save(BaseConfig.STAGE_TIMINGS_FILE)
+    if TRANSITIONS.samples:
+        TRANSITIONS.append_history()
+    if PAGE_METRICS.records:
+        PAGE_METRICS.save(BaseConfig.PAGE_METRICS_FILE)
+        violations = PAGE_METRICS.check_budgets(load_budgets(session.config.getoption("--perf-budgets")))
+        for violation in violations:
+            print(f"❌ Page budget exceeded - {violation}")
+        if violations and session.exitstatus == pytest.ExitCode.OK:
+            session.exitstatus = pytest.ExitCode.TESTS_FAILED
+    if session.config.getoption("--visual-diff") and os.path.isdir(BaseConfig.SCREENSHOT_DIR):
+        from utils.visual_diff import compare_run, format_results, save_results
+        results = compare_run(trust_phash=session.config.getoption("--visual-trust-phash"))
+        print(format_results(results))
+        print(f"Visual diff report saved to: {save_results(results)}")
+        changed = [r["step"] for r in results if r["status"] in ("changed", "size_changed")]
+        if changed:
+            print(f"❌ Screenshots differ from their baselines: {', '.join(changed)}")
+            if session.exitstatus == pytest.ExitCode.OK:
+                session.exitstatus = pytest.ExitCode.TESTS_FAILED
+    if MEMORY.samples:
+        MEMORY.save(BaseConfig.MEMORY_FILE)
+    # A session without funnel tests (e.g. the unit tests) leaves the run history alone
+    if STAGE_TIMINGS.stages and session.config.getoption("--run-metrics-db"):
+        record_run_metrics(session)
+
+def record_run_metrics(session):
+    """Append this run's timings, retries, artifact sizes and environment to the SQLite history."""
+    from utils.metrics_store import MetricsStore, directory_usage
+
+    config = session.config
+    url_metrics = [(key, name, value) for key, metrics in PAGE_METRICS.summary().items()
+                   for name, value in metrics.items() if name != "samples"]
+    url_metrics += [(sample["edge"], "transition_ms", sample["duration_ms"]) for sample in TRANSITIONS.samples]
+    artifacts = [(name, *directory_usage(directory)) for name, directory in (
+        ("allure-results", BaseConfig.REPORT_DIR),
+        ("screenshots", BaseConfig.SCREENSHOT_DIR),
+        ("videos", BaseConfig.RECORD_VIDEO_DIR),
+    )]
+    run_id = MetricsStore(config.getoption("--run-metrics-db")).record_run(
+        started_at=config.stash.get(RUN_STARTED_AT, datetime.now().isoformat(timespec="seconds")),
+        exit_status=session.exitstatus,
+        environment={
+            "env": BaseConfig.ENV,
+            "browser": config.getoption("--test-browser").lower(),
+            "headless": config.getoption("--headless").lower() == "true",
+            "launch_profile": config.getoption("--launch-profile"),
+            "emulation": STAGE_TIMINGS.label,
+            "prebuy": BaseConfig.PREBUY,
+            "decision": BaseConfig.DECISION,
+        },
+        stages=STAGE_TIMINGS.stages,
+        url_metrics=url_metrics,
+        retries=[(helper, locator, count)
+                 for (helper, locator), count in RETRY_TELEMETRY.retry_counts().items()],
+        artifacts=artifacts,
+        attempts=RETRY_TELEMETRY.attempts,
+        memory=MEMORY.samples,
+    )
+    print(f"📈 Run metrics saved as run #{run_id} in {config.getoption('--run-metrics-db')}")
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_call(item):
+    """Give each test its wall-clock and retry budget, watched for hangs, and sample browser memory after it."""
+    budgets = item.config.stash.get(TEST_BUDGETS, None)
+    watchdog = item.config.stash.get(WATCHDOG, None)
+    if budgets is not None:
+        budget = BUDGETS.start(item.nodeid, *budget_for(budgets, item.name))
+        if watchdog:
+            watchdog.arm(budget)
+    try:
+        yield
+    finally:
+        if watchdog:
+            watchdog.disarm()
+        BUDGETS.stop()
+    if MEMORY.enabled and "browser" in item.funcargs:
+        MEMORY.sample(item.nodeid, page=getattr(item.cls, "page", None), browser=item.funcargs["browser"])
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    """Dump the page's flight recorder when a test fails and attach it to Allure."""
+    outcome = yield
+    report = outcome.get_result()
+    recorder = getattr(item.cls, "flight_recorder", None) if item.cls else None
+    if not (report.failed and recorder):
+        return
+    dump_path = recorder.dump(f"{item.nodeid}-{report.when}")
+    print(f"🛩️ Flight recorder for {item.name}: {len(recorder.events)} events saved to {dump_path}")
+    allure.attach.file(str(dump_path), name=f"{item.name}_flight_recorder",
+                       attachment_type=allure.attachment_type.TEXT)
+
+@pytest.hookimpl(trylast=True)
+def pytest_collection_modifyitems(config, items):
+    """Only browser funnel tests are timed, stored in the run history and learned from."""
+    STAGE_TIMINGS.select(items)
+
+def pytest_runtest_logreport(report):
+    # Tests skipped by pytest-dependency never reach the call phase
+    if report.when == "call" or (report.when == "setup" and report.skipped):
+        STAGE_TIMINGS.record(report)
+
+def pytest_terminal_summary(terminalreporter):
+    if STAGE_TIMINGS.stages:
+        terminalreporter.write_sep("=", f"Stage timings ({STAGE_TIMINGS.label})")
+        terminalreporter.write_line(STAGE_TIMINGS.format())
+    if TRANSITIONS.samples:
+        terminalreporter.write_sep("=", "SPA transition latency (ms)")
+        terminalreporter.write_line(format_edges(edge_percentiles(TRANSITIONS.samples)))
+
 def pytest_addoption(parser):
     parser.addoption(
         "--test-browser", action="store", default="chromium",
@@ -39,24 +217,197 @@ def pytest_addoption(parser):
         "--headless", action="store", default="False",
         help="Run browser in headless mode: True or False"
     )
+    parser.addoption(
+        "--capture-api", action="store", default=None,
+        help="Record the funnel's API calls for protocol-level replay; each test class writes its own "
+             "<stem>.<test module>.<class>.json file next to this path"
+    )
+    parser.addoption(
+        "--launch-profile", action="store", default=BaseConfig.LAUNCH_PROFILE,
+        choices=sorted(LAUNCH_PROFILES),
+        help="Browser launch profile: 'performance' disables throttling and background features"
+    )
+    parser.addoption(
+        "--http-cache-dir", action="store", default=BaseConfig.HTTP_CACHE_DIR,
+        help="Share an on-disk cache of static JS/CSS/font/image assets across contexts and runs"
+    )
+    parser.addoption(
+        "--network-profile", action="store", default=BaseConfig.NETWORK_PROFILE,
+        choices=sorted(NETWORK_PROFILES),
+        help="Emulate a network profile through CDP: slow-3g, fast-3g, 4g or none"
+    )
+    parser.addoption(
+        "--cpu-throttle", action="store", type=float, default=BaseConfig.CPU_THROTTLE,
+        help="CPU slowdown factor applied through CDP, e.g. 4 for a 4x slower CPU"
+    )
+    parser.addoption(
+        "--page-metrics", action="store_true", default=BaseConfig.PAGE_METRICS,
+        help="Collect navigation timing, Web Vitals, JS heap and resource usage for every funnel page"
+    )
+    parser.addoption(
+        "--transition-metrics", action="store", default=str(BaseConfig.TRANSITION_METRICS),
+        help="Time every click-to-next-URL transition: True or False"
+    )
+    parser.addoption(
+        "--perf-budgets", action="store", default=str(BaseConfig.PERF_BUDGETS_FILE),
+        help="YAML file with page-performance budgets checked when --page-metrics is on"
+    )
+    parser.addoption(
+        "--run-metrics-db", action="store", default=BaseConfig.RUN_METRICS_DB,
+        help="SQLite file the run's timings, retries and artifact sizes are appended to; empty to disable"
+    )
+    parser.addoption(
+        "--lead-pool", action="store", default=BaseConfig.LEAD_POOL,
+        help="SQLite lead pool (python -m utils.lead_pool) each funnel class leases a unique lead from"
+    )
+    parser.addoption(
+        "--capture-mode", action="store", default=BaseConfig.CAPTURE_MODE, choices=CAPTURE_MODES,
+        help="Per-step capture: 'png' screenshots, or 'snapshot' for compressed ARIA/text snapshots "
+             "diffed across runs, with PNGs only on failure"
+    )
+    parser.addoption(
+        "--visual-diff", action="store_true", default=BaseConfig.VISUAL_DIFF,
+        help="Compare each step's latest screenshot with its baseline (python -m utils.visual_diff approve)"
+    )
+    parser.addoption(
+        "--visual-trust-phash", action="store_true", default=BaseConfig.VISUAL_TRUST_PHASH,
+        help="With --visual-diff, treat a screenshot whose perceptual hash equals the baseline's as a match "
+             "without a pixel diff"
+    )
+    parser.addoption(
+        "--test-budgets", action="store", default=str(BaseConfig.TEST_BUDGETS_FILE),
+        help="YAML file with per-test wall-clock and retry budgets for the BasePage helpers; empty to disable"
+    )
+    parser.addoption(
+        "--watchdog-grace", action="store", type=float, default=BaseConfig.WATCHDOG_GRACE,
+        help="Opt-in hang watchdog: abort the whole session with a stack and page-state dump when a test "
+             "overruns its budget by this many seconds (default 0, off)"
+    )
+    parser.addoption(
+        "--flight-recorder-size", action="store", type=int, default=BaseConfig.FLIGHT_RECORDER_SIZE,
+        help="Console, network and navigation events kept per page and dumped for failed tests; 0 disables"
+    )
+    parser.addoption(
+        "--browser-servers", action="store", default=BaseConfig.BROWSER_SERVERS,
+        help="Comma-separated ws:// Playwright browser servers to connect to instead of launching a browser"
+    )
+    parser.addoption(
+        "--browser-daemon", action="store", default=BaseConfig.BROWSER_DAEMON, choices=["auto", "off"],
+        help="auto: attach to the warm browser daemon (python -m utils.browser_daemon start) when one matches"
+    )
+    parser.addoption(
+        "--memory-sampling", action="store", default=str(BaseConfig.MEMORY_SAMPLING),
+        help="Sample browser RSS and CDP heap/DOM counters after every test: True or False"
+    )
+    parser.addoption(
+        "--recycle-after-contexts", action="store", type=int, default=BaseConfig.RECYCLE_AFTER_CONTEXTS,
+        help="Relaunch the browser after this many contexts; 0 never"
+    )
+    parser.addoption(
+        "--recycle-above-mb", action="store", type=float, default=BaseConfig.RECYCLE_ABOVE_MB,
+        help="Relaunch the browser once its processes use more than this many MB of RSS; 0 never"
+    )
+    parser.addoption(
+        "--payment-stub", action="store", default=BaseConfig.PAYMENT_STUB,
+        help="Answer checkout payment calls locally: off, success, decline or delay:<ms>"
+    )
+    parser.addoption(
+        "--payment-stub-config", action="store", default=str(BaseConfig.PAYMENT_STUB_CONFIG),
+        help="JSON file with the payment URL patterns and stubbed responses"
+    )
+    parser.addoption(
+        "--adaptive-retries", action="store_true", default=BaseConfig.ADAPTIVE_RETRIES,
+        help="Derive per-locator timeouts and attempt counts from the p99 of earlier runs' retry telemetry"
+    )
+    parser.addoption(
+        "--adaptive-history-runs", action="store", type=int, default=20,
+        help="Number of recent runs the adaptive retry policy learns from"
+    )
 
 @pytest.fixture(scope="session")
 def browser(pytestconfig):
     browser_name = pytestconfig.getoption("--test-browser").lower()
     headless = pytestconfig.getoption("--headless").lower() == "true"
 
+    from playwright.sync_api import sync_playwright
+
     with sync_playwright() as p:
         try:
             browser_type = getattr(p, browser_name)
         except AttributeError:
             raise ValueError(f"Unsupported browser: '{browser_name}'. Use chromium, firefox, or webkit.")
 
-        browser = browser_type.launch(headless=headless)
+        launch_profile = pytestconfig.getoption("--launch-profile")
+        launch_kwargs = launch_options(launch_profile, browser_name, headless)
+        launcher = None
+        max_contexts = pytestconfig.getoption("--recycle-after-contexts")
+        max_rss_mb = pytestconfig.getoption("--recycle-above-mb")
+        endpoints = parse_endpoints(pytestconfig.getoption("--browser-servers"))
+        daemon = None
+        if not endpoints and pytestconfig.getoption("--browser-daemon") == "auto":
+            daemon = daemon_for(browser_name, headless, launch_profile)
+        if endpoints:
+            pool = BrowserServerPool(endpoints)
+            index = worker_index(pytestconfig.getoption("--dag-worker"))
+            launcher = lambda: (pool.connect(browser_type, index, launch_kwargs)[0], ())
+        elif daemon:
+            print(f"🔥 Attaching to the warm browser daemon at {daemon['endpoint']}")
+            launcher = lambda: (browser_type.connect_over_cdp(daemon["endpoint"]), (daemon["pid"],))
+            # Closing a CDP connection only detaches, so recycling could not free anything
+            max_contexts = max_rss_mb = 0
+        browser = RecyclingBrowser(browser_type, launch_kwargs, max_contexts=max_contexts,
+                                   max_rss_mb=max_rss_mb, launcher=launcher)
         yield browser
         browser.close()
 
+@pytest.fixture(scope="session")
+def local_chromium():
+    """Headless local Chromium for the offline unit tests; skips them where Playwright's browsers are missing."""
+    from playwright.sync_api import Error, sync_playwright
+
+    with sync_playwright() as p:
+        try:
+            browser = p.chromium.launch(headless=True)
+        except Error as e:
+            pytest.skip(f"Playwright Chromium is not installed: {e.message.splitlines()[0]}")
+        yield browser
+        browser.close()
+
+@pytest.fixture(scope="session")
+def asset_cache(pytestconfig):
+    cache_dir = pytestconfig.getoption("--http-cache-dir")
+    if not cache_dir:
+        return None
+    from utils.asset_cache import StaticAssetCache
+    return StaticAssetCache(cache_dir)
+
+@pytest.fixture(scope="session")
+def payment_stub(pytestconfig):
+    mode = pytestconfig.getoption("--payment-stub")
+    if not parse_mode(mode):
+        return None
+    from utils.payment_stub import PaymentStub, load_stub_config
+    return PaymentStub(mode, load_stub_config(pytestconfig.getoption("--payment-stub-config")))
+
+@pytest.fixture(scope="class")
+def lead(request):
+    """The lead a funnel class submits: leased from --lead-pool, or the run's shared FakerAPI lead."""
+    pool_path = request.config.getoption("--lead-pool")
+    if not pool_path:
+        from pages.college_bridge_pages2 import CollegeBridgeLandingPage
+        yield CollegeBridgeLandingPage.default_test_data()
+        return
+
+    from utils.lead_pool import LeadPool, default_owner
+    pool = LeadPool(pool_path)
+    lease = pool.lease(default_owner(request.node.nodeid))
+    print(f"🎫 Leased lead #{lease.id} ({lease.data['email']}) for {request.node.name}")
+    yield lease.data
+    # The lead may have been submitted partway through the funnel, so it is never reused
+    pool.consume(lease.id)
+
 @pytest.fixture(scope="class")
-def page(browser, request):
+def page(browser, asset_cache, payment_stub, lead, request):
     BaseConfig.RECORD_VIDEO_DIR.mkdir(parents=True, exist_ok=True)
     context = browser.new_context(
         record_video_dir=str(BaseConfig.RECORD_VIDEO_DIR),
@@ -64,12 +415,58 @@ def page(browser, request):
     )
     context.clear_cookies()
     context.clear_permissions()
+    cache_stats = asset_cache.install(context) if asset_cache else None
+    stub_hits = payment_stub.install(context) if payment_stub else None
+    if PAGE_METRICS.enabled:
+        context.add_init_script(VITALS_INIT_SCRIPT)
+    if TRANSITIONS.enabled:
+        context.add_init_script(TRANSITION_INIT_SCRIPT)
     page = context.new_page()
+    apply_emulation(context, page, request.config.getoption("--network-profile"),
+                    request.config.getoption("--cpu-throttle"))
     request.cls.page = page
+    recorder_size = request.config.getoption("--flight-recorder-size")
+    request.cls.flight_recorder = FlightRecorder(page, recorder_size) if recorder_size > 0 else None
+    failures_before = request.session.testsfailed
+
+    capture_path = request.config.getoption("--capture-api")
+    if capture_path:
+        from config.settings import BASE_URL
+        from utils.protocol_replay import ApiRecorder, capture_file, default_host_suffixes
+        capture_path = capture_file(capture_path, request.cls)
+        recorder = ApiRecorder(page, default_host_suffixes(BASE_URL))
+
     yield page
 
-    # Stop and save video
+    if capture_path:
+        recorder.save(capture_path, lead)
+
+    if cache_stats:
+        print(f"📦 Static asset cache for {request.node.name}: {cache_stats.hits} hits, "
+              f"{cache_stats.revalidated} revalidated, {cache_stats.bytes_from_cache} bytes and "
+              f"{cache_stats.time_saved_ms:.0f} ms saved")
+        allure.attach(
+            json.dumps(cache_stats.as_dict(), indent=4),
+            name=f"{request.node.name}_asset_cache",
+            attachment_type=allure.attachment_type.JSON
+        )
+
+    if stub_hits:
+        print(f"💳 Payment stub ({request.config.getoption('--payment-stub')}) answered "
+              f"{stub_hits.hits} payment calls for {request.node.name}")
+
+    # Automatically take a screenshot after each test; in snapshot mode only when a test failed
+    if STEP_SNAPSHOTS.mode == "png" or request.session.testsfailed > failures_before:
+        screenshot_path = take_screenshot(page, request.node.name)
+        allure.attach.file(
+            str(screenshot_path),
+            name=f"{request.node.name}_screenshot",
+            attachment_type=allure.attachment_type.PNG
+        )
+
+    # Stop and save video; the file is only complete once the context is closed
     video_path = page.video.path()
+    context.close()
 
     # Attach video to Allure
     allure.attach.file(
@@ -77,12 +474,3 @@ def page(browser, request):
         name=f"{request.node.name}_video",
         attachment_type=allure.attachment_type.MP4  # Only MP4 is supported
     )
-
-    # Automatically take a screenshot after each test
-    screenshot_path = take_screenshot(page, request.node.name)
-    allure.attach.file(
-        str(screenshot_path),
-        name=f"{request.node.name}_screenshot",
-        attachment_type=allure.attachment_type.PNG
-    )
-    context.close()
@@ -1,23 +1,76 @@
 import time
 
-from utils.generate_random_test_data import fetch_fake_users, save_to_json
+import allure
+
 from utils.logger import setup_logger
 from utils.helpers import highlight_element, take_screenshot
-from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
-import allure
+from utils.page_metrics import PAGE_METRICS
+from utils.transitions import TRANSITIONS
+from utils.retry_telemetry import RETRY_TELEMETRY
+from utils.budget import BUDGETS, BudgetExceeded
+from utils.snapshots import STEP_SNAPSHOTS
+from config.base_config import BaseConfig
+
+# Evaluated by page.wait_for_function on every animation frame until it returns the matched text,
+# so URL and text conditions resolve in the browser the moment they hold.
+EXPECT_TEXT_SCRIPT = r"""
+({selector, isXpath, expected, match, flags, expectedUrl, apostrophes, whitespace}) => {
+    if (expectedUrl !== null && location.href !== expectedUrl) return false;
+    const el = isXpath
+        ? document.evaluate(selector, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue
+        : document.querySelector(selector);
+    if (!el || !(el.offsetWidth || el.offsetHeight || el.getClientRects().length)) return false;
+    const normalize = (text) => {
+        if (apostrophes) text = text.replace(/['\u2018\u02bc]/g, "\u2019");
+        if (whitespace) text = text.replace(/\s+/g, " ");
+        return text.trim();
+    };
+    const actual = normalize(el.textContent || "");
+    let matched;
+    if (match === "regex") matched = new RegExp(expected, flags).test(actual);
+    else if (match === "exact") matched = actual === normalize(expected);
+    else matched = actual.includes(normalize(expected));
+    return matched ? actual : false;
+}
+"""
+
+# Reports what the page showed when an expect_text wait timed out
+CURRENT_TEXT_SCRIPT = """
+({selector, isXpath}) => {
+    const el = isXpath
+        ? document.evaluate(selector, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue
+        : document.querySelector(selector);
+    return {url: location.href, text: el ? el.textContent : null};
+}
+"""
+
+
+def _selector_arg(selector):
+    """Split a Playwright CSS or XPath selector into (selector, is_xpath) for document lookups."""
+    if selector.startswith("xpath="):
+        return selector[len("xpath="):], True
+    if selector.startswith("css="):
+        return selector[len("css="):], False
+    return selector, selector.startswith(("//", "(/", ".."))
 
 class BasePage:
     def __init__(self, page):
         self.page = page
         self.logger = setup_logger(self.__class__.__name__)
-        self.default_timeout = 60000  # milliseconds
+        self.default_timeout = BaseConfig.DEFAULT_TIMEOUT_MS  # milliseconds
 
     # ---------- Core Waits ----------
     def wait_for_visible(self, selector, timeout=None):
+        # Imported here so that importing page objects does not load Playwright
+        from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+        timeout, _ = self._retry_params("wait_for_visible", selector, timeout or self.default_timeout, 1)
+        started = time.perf_counter()
         try:
             self.logger.info(f"Waiting for {selector} to be visible.")
-            self.page.locator(selector).wait_for(state="visible", timeout=timeout or self.default_timeout)
+            self.page.locator(selector).wait_for(state="visible", timeout=timeout)
+            self._record_attempt("wait_for_visible", selector, 1, started, "ok", timeout)
         except PlaywrightTimeoutError:
+            self._record_attempt("wait_for_visible", selector, 1, started, "failed", timeout)
             self.logger.error(f"Element {selector} not visible after timeout.")
             raise
 
@@ -128,6 +181,61 @@ class BasePage:
         highlight_element(self.page, selector)
         assert not self.is_visible(selector), f"Element {selector} should not be visible"
 
+    def expect_text(self, selector, expected="", expected_url=None, match="contains", flags="",
+                    normalize_apostrophes=True, normalize_whitespace=True, timeout=None):
+        """Wait in the browser until selector is visible and its text matches, and return that text.
+
+        match is "contains", "exact" or "regex" (expected is then a JavaScript pattern, flags its
+        flags). Apostrophes are normalized to ’ and whitespace runs collapsed on both sides unless
+        disabled. When expected_url is given the page URL must equal it as well. Only CSS and XPath
+        selectors are supported. Raises AssertionError with the last seen text on timeout.
+        """
+        if match not in ("contains", "exact", "regex"):
+            raise ValueError(f"Unsupported match mode: {match}")
+        timeout, _ = self._retry_params("expect_text", selector, timeout or self.default_timeout, 1)
+        lookup, is_xpath = _selector_arg(selector)
+        self.logger.info(f"Expecting {match} text '{expected}' in {selector}")
+        started = time.perf_counter()
+        try:
+            handle = self.page.wait_for_function(EXPECT_TEXT_SCRIPT, arg={
+                "selector": lookup, "isXpath": is_xpath, "expected": expected, "match": match, "flags": flags,
+                "expectedUrl": expected_url, "apostrophes": normalize_apostrophes,
+                "whitespace": normalize_whitespace,
+            }, timeout=timeout)
+        except Exception as e:
+            self._record_attempt("expect_text", selector, 1, started, "failed", timeout)
+            try:
+                current = self.page.evaluate(CURRENT_TEXT_SCRIPT, {"selector": lookup, "isXpath": is_xpath})
+            except Exception:
+                current = {"url": self.page.url, "text": None}
+            raise AssertionError(
+                f"Text in {selector} did not {match} '{expected}' within {timeout} ms"
+                + (f" on {expected_url}" if expected_url else "")
+                + f"\nLast seen URL: {current['url']}\nLast seen text: {current['text']!r}\n{e}"
+            ) from None
+        self._record_attempt("expect_text", selector, 1, started, "ok", timeout)
+        text = handle.json_value()
+        self.logger.info(f"Text matched in {selector}: '{text}'")
+        return text
+
+    # ---------- Step Capture ----------
+    def capture_step(self, name, failed=False):
+        """Attach the page state for a step: a PNG, or in snapshot mode a compressed ARIA/text
+        snapshot plus its diff against the previous run, with PNGs only for failures."""
+        if STEP_SNAPSHOTS.mode == "png" or failed:
+            screenshot_path = take_screenshot(self.page, name)
+            allure.attach.file(str(screenshot_path), name=name, attachment_type=allure.attachment_type.PNG)
+        if STEP_SNAPSHOTS.mode != "snapshot":
+            return
+        try:
+            text, diff = STEP_SNAPSHOTS.capture(self.page, name)
+        except Exception as e:
+            self.logger.warning(f"Could not capture snapshot for {name}: {e}")
+            return
+        allure.attach(text, name=f"{name}_snapshot", attachment_type=allure.attachment_type.TEXT)
+        if diff:
+            allure.attach(diff, name=f"{name}_snapshot_diff", attachment_type=allure.attachment_type.TEXT)
+
     # ---------- Utility ----------
     def reload_page(self):
         self.logger.info("Reloading the page.")
@@ -146,75 +254,124 @@ class BasePage:
         self.logger.info(f"Retrieved current URL: '{url}'")
         return url
 
+    def _retry_params(self, helper, locator, timeout, retries):
+        """Timeout and attempt count for a retry helper; learned per locator in adaptive mode and
+        limited to what is left of the current test's budget."""
+        timeout, retries = RETRY_TELEMETRY.params(helper, locator, timeout, retries)
+        return BUDGETS.clamp(helper, locator, timeout, retries, self.page.url)
+
+    def _record_attempt(self, helper, locator, attempt, started, outcome, timeout, wait_ms=0, waited_ms=None):
+        RETRY_TELEMETRY.record(helper, locator, attempt, started, outcome, timeout, wait_ms, waited_ms)
+        if outcome == "retry":
+            BUDGETS.charge_retry(helper, locator)
+
     def compare_current_url(self, expected_url, timeout=5000, retries=5):
         """Compare current URL with expected URL, waiting and retrying if needed."""
+        timeout, retries = self._retry_params("compare_current_url", expected_url, timeout, retries)
         attempt = 1
         while attempt <= retries:
+            started = time.perf_counter()
             try:
                 self.logger.debug(f"Attempt {attempt}/{retries}: Waiting for URL {expected_url}")
                 self.page.wait_for_url(expected_url, timeout=timeout)
+                self._record_attempt("compare_current_url", expected_url, attempt, started, "ok", timeout)
                 self.logger.info(f"URL matched: {self.page.url}")
+                PAGE_METRICS.record(self.page)
                 return True
+            except BudgetExceeded:
+                raise
             except Exception as e:
                 self.logger.warning(
                     f"Attempt {attempt}/{retries}: Current URL {self.page.url} does not match {expected_url}. Error: {e}")
                 if attempt == retries:
+                    self._record_attempt("compare_current_url", expected_url, attempt, started, "failed", timeout)
                     self.logger.error(f"URL check failed after {retries} attempts")
                     return False
+                self._record_attempt("compare_current_url", expected_url, attempt, started, "retry", timeout)
                 attempt += 1
         return False
 
     def compare_element_href(self, selector, expected_href, timeout=5000, retries=5):
         """Compare element's href attribute with expected href, waiting and retrying if needed."""
+        timeout, retries = self._retry_params("compare_element_href", selector, timeout, retries)
         attempt = 1
         while attempt <= retries:
+            started = time.perf_counter()
             try:
                 self.logger.debug(
                     f"Attempt {attempt}/{retries}: Waiting for href {expected_href} on element {selector}")
                 element = self.page.wait_for_selector(selector, timeout=timeout)
                 actual_href = element.get_attribute('href')
                 if actual_href == expected_href:
+                    self._record_attempt("compare_element_href", selector, attempt, started, "ok", timeout)
                     self.logger.info(f"Href matched: {actual_href}")
                     return True
                 else:
                     raise Exception(f"Href mismatch: got {actual_href}, expected {expected_href}")
+            except BudgetExceeded:
+                raise
             except Exception as e:
                 self.logger.warning(
                     f"Attempt {attempt}/{retries}: Href check failed for {selector}. Error: {e}")
                 if attempt == retries:
+                    self._record_attempt("compare_element_href", selector, attempt, started, "failed", timeout)
                     self.logger.error(f"Href check failed after {retries} attempts")
                     return False
+                self._record_attempt("compare_element_href", selector, attempt, started, "retry", timeout)
                 attempt += 1
         return False
 
-    def click_with_retry(self, locator, expected_url, retries=5):
+    def click_with_retry(self, locator, expected_url, retries=5, timeout=5000, retry_wait=1000):
         """Click an element with retries, handling same-page scenarios."""
+        timeout, retries = self._retry_params("click_with_retry", locator, timeout, retries)
         initial_url = self.page.url
         for attempt in range(retries):
+            started = time.perf_counter()
             try:
                 element = self.page.locator(locator)
                 element.scroll_into_view_if_needed()
-                element.wait_for(state="visible", timeout=5000)
+                wait_started = time.perf_counter()
+                element.wait_for(state="visible", timeout=timeout)
+                waited_ms = (time.perf_counter() - wait_started) * 1000
                 is_enabled = element.is_enabled()
                 self.logger.info(f"Attempt {attempt + 1}: Clicking locator {locator}, enabled={is_enabled}")
                 if attempt < retries - 1:
                     highlight_element(self.page, locator)
+                    click_started = time.perf_counter()
                     element.click()
                 else:
+                    click_started = time.perf_counter()
                     self.page.evaluate("el => el.click()", element)
-                self.page.wait_for_timeout(1500)
+                self.wait_for_url_change(initial_url, timeout=1500)
                 if self.page.url != initial_url:
+                    self._record_attempt("click_with_retry", locator, attempt + 1, started, "ok", timeout,
+                                         waited_ms=waited_ms)
                     self.logger.info(f"Click successful on attempt {attempt + 1}, URL changed to {self.page.url}")
+                    TRANSITIONS.measure(self.page, initial_url, click_started)
                     return
                 if self.is_content_updated(locator):
+                    self._record_attempt("click_with_retry", locator, attempt + 1, started, "ok", timeout,
+                                         waited_ms=waited_ms)
                     self.logger.info(f"Click successful on attempt {attempt + 1}, content updated without URL change")
                     return
                 self.logger.warning(f"Attempt {attempt + 1}: URL did not change after clicking {locator}, retrying...")
+            except BudgetExceeded:
+                raise
             except Exception as e:
                 self.logger.warning(f"Attempt {attempt + 1} failed for locator {locator}: {e}")
             if attempt == retries - 1:
+                self._record_attempt("click_with_retry", locator, attempt + 1, started, "failed", timeout)
                 raise ValueError(f"Failed to navigate or update content after {retries} attempts on locator {locator}")
-            self.page.wait_for_timeout(1000)
+            self._record_attempt("click_with_retry", locator, attempt + 1, started, "retry", timeout, retry_wait)
+            self.page.wait_for_timeout(retry_wait)
+
+    def wait_for_url_change(self, initial_url, timeout=1500):
+        """Wait until the URL differs from initial_url, returning as soon as it does."""
+        try:
+            self.page.wait_for_url(lambda url: url != initial_url, timeout=timeout)
+            return True
+        except Exception:
+            return False
 
     def is_content_updated(self, locator, timeout=2000):
         """Check if page content updated (e.g., new element appeared)."""
@@ -224,11 +381,13 @@ class BasePage:
         except:
             return False
 
-    def select_dropdown_with_retry(self, locator, value, retries=5):
+    def select_dropdown_with_retry(self, locator, value, retries=5, timeout=5000, retry_wait=2000):
         """Select a dropdown option with retries."""
+        timeout, retries = self._retry_params("select_dropdown_with_retry", locator, timeout, retries)
         last_exception = None
 
         for attempt in range(retries):
+            started = time.perf_counter()
             try:
                 # Always get a fresh reference to the element
                 element = self.page.locator(locator)
@@ -242,93 +401,58 @@ class BasePage:
                 highlight_element(self.page, locator)
 
                 # More specific selection approach
-                element.select_option(value, timeout=5000)
+                wait_started = time.perf_counter()
+                element.select_option(value, timeout=timeout)
+                self._record_attempt("select_dropdown_with_retry", locator, attempt + 1, started, "ok", timeout,
+                                     waited_ms=(time.perf_counter() - wait_started) * 1000)
 
                 # Optional: Verify selection was successful
                 self.page.wait_for_timeout(1000)  # Small delay for UI update
                 return
+            except BudgetExceeded:
+                raise
             except Exception as e:
                 last_exception = e
                 self.logger.warning(f"Attempt {attempt + 1} failed for dropdown {locator}: {str(e)}")
                 if attempt < retries - 1:
+                    self._record_attempt("select_dropdown_with_retry", locator, attempt + 1, started, "retry",
+                                         timeout, retry_wait)
                     self.logger.info("Waiting before retry...")
-                    self.page.wait_for_timeout(2000)  # Longer wait between retries
+                    self.page.wait_for_timeout(retry_wait)  # Longer wait between retries
+                else:
+                    self._record_attempt("select_dropdown_with_retry", locator, attempt + 1, started, "failed",
+                                         timeout)
 
         raise ValueError(
             f"Failed to select '{value}' in dropdown {locator} after {retries} attempts. "
             f"Last error: {str(last_exception)}"
         )
 
-    def enter_text_with_retry(self, locator, value, retries=5):
+    def enter_text_with_retry(self, locator, value, retries=5, timeout=5000, retry_wait=1000):
         """Enter text into a field with retries."""
+        timeout, retries = self._retry_params("enter_text_with_retry", locator, timeout, retries)
         for attempt in range(retries):
+            started = time.perf_counter()
             try:
                 element = self.page.locator(locator)
                 element.scroll_into_view_if_needed()
-                element.wait_for(state="visible", timeout=5000)
+                wait_started = time.perf_counter()
+                element.wait_for(state="visible", timeout=timeout)
+                waited_ms = (time.perf_counter() - wait_started) * 1000
                 self.logger.info(f"Attempt {attempt + 1}: Entering {value} in field {locator}")
                 highlight_element(self.page, locator)
                 element.fill(value)
+                self._record_attempt("enter_text_with_retry", locator, attempt + 1, started, "ok", timeout,
+                                     waited_ms=waited_ms)
                 self.page.wait_for_timeout(1000)
                 return
+            except BudgetExceeded:
+                raise
             except Exception as e:
                 self.logger.warning(f"Attempt {attempt + 1} failed for field {locator}: {e}")
                 if attempt == retries - 1:
+                    self._record_attempt("enter_text_with_retry", locator, attempt + 1, started, "failed", timeout)
                     raise ValueError(f"Failed to enter {value} in field {locator} after {retries} attempts")
-                self.page.wait_for_timeout(1000)
-
-    def get_text_with_retry(self, locator, expected_text=None, expected_url=None, retries=5, timeout=1000):
-
-        for attempt in range(retries):
-            try:
-                # First verify URL if expected_url was provided
-                if expected_url is not None:
-                    current_url = self.page.url
-                    if current_url != expected_url:
-                        self.logger.warning(
-                            f"Attempt {attempt + 1}: URL mismatch\n"
-                            f"Expected: {expected_url}\n"
-                            f"Actual: {current_url}"
-                        )
-                        if attempt == retries - 1:
-                            raise ValueError(f"URL never matched expected URL after {retries} attempts\n"
-                                             f"Expected: {expected_url}\nLast seen: {current_url}")
-                        self.page.wait_for_timeout(timeout)
-                        continue  # Skip text verification if URL is wrong
-
-                # Only proceed to text verification if URL is correct (or not checked)
-                element = self.page.locator(locator)
-                element.scroll_into_view_if_needed()
-                element.wait_for(state="visible", timeout=5000)
-
-                # Highlight the element (except on last attempt)
-                if attempt < retries - 1:
-                    highlight_element(self.page, locator)
-
-                # Get the text content
-                text = element.text_content().strip()
-
-                # Verify text content if expected_text was provided
-                if expected_text is not None and expected_text not in text:
-                    self.logger.warning(
-                        f"Attempt {attempt + 1}: Text mismatch\n"
-                        f"Expected to contain: {expected_text}\n"
-                        f"Actual text: {text}"
-                    )
-                    raise ValueError("Text content mismatch")  # Will trigger retry
-
-                # If we got here, all verifications passed
-                self.logger.info(
-                    f"Verifications passed on attempt {attempt + 1}\n"
-                    f"URL: {self.page.url}\n"
-                    f"Text: {text}"
-                )
-                return text
-
-            except Exception as e:
-                self.logger.warning(f"Attempt {attempt + 1} failed for locator {locator}: {str(e)}")
-                if attempt == retries - 1:
-                    raise ValueError(f"Failed after {retries} attempts on locator {locator}\n"
-                                     f"Last error: {str(e)}")
-
-            self.page.wait_for_timeout(timeout)
\ No newline at end of file
+                self._record_attempt("enter_text_with_retry", locator, attempt + 1, started, "retry", timeout,
+                                     retry_wait)
+                self.page.wait_for_timeout(retry_wait)
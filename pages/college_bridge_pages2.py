@@ -1,8 +1,9 @@
 import json
-import time
+import os
 import allure
 from pathlib import Path
-from config.settings import BASE_URL, PREBUY, DECISION
+from config import settings
+from config.settings import PREBUY, DECISION
 from locators.college_bridge_locators import (
     LandingPageLocators,
     StartQualifyPageLocators,
@@ -15,7 +16,6 @@ from locators.college_bridge_locators import (
     ReadyNotYetThanksPageLocators
 )
 from pages.base_page import BasePage
-from utils.helpers import take_screenshot
 from utils.generate_random_test_data import fetch_fake_users, save_to_json, clean_phone_number
 
 
@@ -24,25 +24,46 @@ class CollegeBridgeLandingPage(BasePage):
     TEST_URLS = Path(__file__).resolve().parent.parent / "test_data" / "college_bridge_urls.json"
     TEST_CARDS = Path(__file__).resolve().parent.parent / "test_data" / "test_card.json"
 
-    # Prepare fresh test data once per test run at the class level
-    try:
-        # Delete existing test data file to force regeneration
-        if TEST_DATA_FILE.exists():
-            TEST_DATA_FILE.unlink()
-        # Generate and save new test data
-        users = fetch_fake_users(quantity=1)  # Generate one user
-        save_to_json(users, TEST_DATA_FILE)  # Save to JSON file
-        with open(TEST_DATA_FILE, "r") as file:
-            TEST_DATA = json.load(file)[0]  # Load first user
-
-    except Exception as e:
-        raise RuntimeError(f"Failed to prepare or load test data: {e}")
-
-    def __init__(self, page):
+    TEST_DATA = None
+
+    @classmethod
+    def data_file(cls):
+        """The run's test data file; parallel worker processes each write their own."""
+        worker = os.getenv("DAG_WORKER") or os.getenv("PYTEST_XDIST_WORKER")
+        if not worker:
+            return cls.TEST_DATA_FILE
+        return cls.TEST_DATA_FILE.with_name(f"{cls.TEST_DATA_FILE.stem}.worker{worker}.json")
+
+    @classmethod
+    def default_test_data(cls):
+        """Prepare fresh test data once per test run, on first use rather than at import."""
+        if cls.TEST_DATA is None:
+            data_file = cls.data_file()
+            try:
+                # Delete existing test data file to force regeneration
+                if data_file.exists():
+                    data_file.unlink()
+                # Generate and save new test data
+                users = fetch_fake_users(quantity=1)  # Generate one user
+                save_to_json(users, data_file)  # Save to JSON file
+                with open(data_file, "r") as file:
+                    cls.TEST_DATA = json.load(file)[0]  # Load first user
+
+            except Exception as e:
+                raise RuntimeError(f"Failed to prepare or load test data: {e}")
+        return cls.TEST_DATA
+
+    def __init__(self, page, test_data=None, base_url=None, funnel_url=None):
         super().__init__(page)
-        self.test_data = self.TEST_DATA  # Use class-level test data
+        self.test_data = test_data or self.default_test_data()  # Use class-level test data unless a lead is given
+        self.base_url = base_url or settings.BASE_URL
         self.test_urls = self._load_json_file(self.TEST_URLS)
         self.test_cards = self._load_json_file(self.TEST_CARDS)
+        if funnel_url:
+            # Point the qualify funnel at another host, e.g. a load-test target; the paths are appended to it
+            funnel_url = funnel_url.rstrip("/") + "/"
+            self.test_urls["base_url"] = funnel_url
+            self.test_urls["paths"][0] = funnel_url
 
     def _load_json_file(self, file_path):
         """Load JSON file and handle errors."""
@@ -59,20 +80,18 @@ class CollegeBridgeLandingPage(BasePage):
     def open(self):
         """Open the landing page and verify URL."""
         self.logger.info("Opening College Bridge Landing Page.")
-        self.page.goto(BASE_URL, wait_until="domcontentloaded")
-        if not self.compare_current_url(BASE_URL):
-            raise ValueError(f"Current URL {self.page.url} does not match {BASE_URL}.")
-        screenshot_path = take_screenshot(self.page, "landing_page_opened")
-        allure.attach.file(str(screenshot_path), name="landing_page_opened", attachment_type=allure.attachment_type.PNG)
+        self.page.goto(self.base_url, wait_until="domcontentloaded")
+        if not self.compare_current_url(self.base_url):
+            raise ValueError(f"Current URL {self.page.url} does not match {self.base_url}.")
+        self.capture_step("landing_page_opened")
 
     @allure.step("Fill and submit College Bridge landing form")
     def fill_form_and_submit(self):
         """Fills and submits the landing page form with URL checks and retries."""
-        if not self.compare_current_url(BASE_URL):
-            screenshot = take_screenshot(self.page, "wrong_url")
-            allure.attach.file(str(screenshot), name="wrong_url", attachment_type=allure.attachment_type.PNG)
-            self.logger.error(f"Wrong URL: got {self.page.url}, expected {BASE_URL}")
-            raise ValueError(f"Wrong URL: got {self.page.url}, expected {BASE_URL}")
+        if not self.compare_current_url(self.base_url):
+            self.capture_step("wrong_url", failed=True)
+            self.logger.error(f"Wrong URL: got {self.page.url}, expected {self.base_url}")
+            raise ValueError(f"Wrong URL: got {self.page.url}, expected {self.base_url}")
 
         try:
             self.select_dropdown_with_retry(LandingPageLocators.PROGRAM_OF_INTEREST, self.test_data["program_of_interest"])
@@ -82,14 +101,12 @@ class CollegeBridgeLandingPage(BasePage):
             self.enter_text_with_retry(LandingPageLocators.PHONE_NUMBER, self.test_data["phone_number"])
             self.enter_text_with_retry(LandingPageLocators.ZIP_CODE, self.test_data["zip_code"])
 
-            screenshot = take_screenshot(self.page, "form_filled")
-            allure.attach.file(str(screenshot), name="form_filled", attachment_type=allure.attachment_type.PNG)
+            self.capture_step("form_filled")
 
-            self.click_with_retry(LandingPageLocators.GET_STARTED, BASE_URL)
+            self.click_with_retry(LandingPageLocators.GET_STARTED, self.base_url)
             self.logger.info("Form submitted successfully.")
         except Exception as e:
-            screenshot = take_screenshot(self.page, "form_failed")
-            allure.attach.file(str(screenshot), name="form_failed", attachment_type=allure.attachment_type.PNG)
+            self.capture_step("form_failed", failed=True)
             self.logger.error(f"Form submission failed: {e}")
             raise
 
@@ -102,12 +119,10 @@ class CollegeBridgeLandingPage(BasePage):
                 raise ValueError(f"Current URL {self.page.url} does not match {expected_url}")
             self.logger.info(f"Clicking Start Qualify button on URL {self.page.url}")
             self.click_with_retry(StartQualifyPageLocators.NEXT_BUTTON, expected_url)
-            screenshot_path = take_screenshot(self.page, "start_qualify_clicked")
-            allure.attach.file(str(screenshot_path), name="start_qualify_clicked", attachment_type=allure.attachment_type.PNG)
+            self.capture_step("start_qualify_clicked")
             self.logger.info("Start Qualify button clicked successfully.")
         except Exception as e:
-            screenshot_path = take_screenshot(self.page, "start_qualify_failed")
-            allure.attach.file(str(screenshot_path), name="start_qualify_failed", attachment_type=allure.attachment_type.PNG)
+            self.capture_step("start_qualify_failed", failed=True)
             self.logger.error(f"Start Qualify button click failed: {e}")
             raise
 
@@ -143,14 +158,10 @@ class CollegeBridgeLandingPage(BasePage):
                 self.logger.info(f"Step {step_index}: {description} on URL {self.page.url}")
                 action(locator, expected_url)
 
-            screenshot_path = take_screenshot(self.page, "mindset_process_completed")
-            allure.attach.file(str(screenshot_path), name="mindset_process_completed",
-                               attachment_type=allure.attachment_type.PNG)
+            self.capture_step("mindset_process_completed")
             self.logger.info("Mindset qualification process completed.")
         except Exception as e:
-            screenshot_path = take_screenshot(self.page, "mindset_process_failed")
-            allure.attach.file(str(screenshot_path), name="mindset_process_failed",
-                               attachment_type=allure.attachment_type.PNG)
+            self.capture_step("mindset_process_failed", failed=True)
             self.logger.error(f"Mindset qualification process failed: {e}")
             raise
 
@@ -163,14 +174,10 @@ class CollegeBridgeLandingPage(BasePage):
                 raise ValueError(f"Current URL {self.page.url} does not match {expected_url}")
             self.logger.info(f"Clicking Next button on URL {self.page.url}")
             self.click_with_retry(BridgeStartPageLocators.NEXT_BUTTON, expected_url)
-            screenshot_path = take_screenshot(self.page, "bridge_start_clicked")
-            allure.attach.file(str(screenshot_path), name="bridge_start_clicked",
-                               attachment_type=allure.attachment_type.PNG)
+            self.capture_step("bridge_start_clicked")
             self.logger.info("Bridge start process completed.")
         except Exception as e:
-            screenshot_path = take_screenshot(self.page, "bridge_start_failed")
-            allure.attach.file(str(screenshot_path), name="bridge_start_failed",
-                               attachment_type=allure.attachment_type.PNG)
+            self.capture_step("bridge_start_failed", failed=True)
             self.logger.error(f"Bridge Start process failed: {e}")
             raise
 
@@ -202,12 +209,10 @@ class CollegeBridgeLandingPage(BasePage):
                 self.logger.info(f"Step {step_index}: {description} on URL {self.page.url}")
                 action(locator, expected_url)
 
-            screenshot_path = take_screenshot(self.page, "general_education_process_completed")
-            allure.attach.file(str(screenshot_path), name="general_education_process_completed", attachment_type=allure.attachment_type.PNG)
+            self.capture_step("general_education_process_completed")
             self.logger.info("General Education process completed.")
         except Exception as e:
-            screenshot_path = take_screenshot(self.page, "general_education_process_failed")
-            allure.attach.file(str(screenshot_path), name="general_education_process_failed", attachment_type=allure.attachment_type.PNG)
+            self.capture_step("general_education_process_failed", failed=True)
             self.logger.error(f"General Education process failed: {e}")
             raise
 
@@ -240,14 +245,10 @@ class CollegeBridgeLandingPage(BasePage):
                 self.logger.info(f"Step {step_index}: {description} on URL {self.page.url}")
                 action(locator, expected_url)
 
-            screenshot_path = take_screenshot(self.page, "entrance_exam_process_completed")
-            allure.attach.file(str(screenshot_path), name="entrance_exam_process_completed",
-                               attachment_type=allure.attachment_type.PNG)
+            self.capture_step("entrance_exam_process_completed")
             self.logger.info("Entrance Exam process completed.")
         except Exception as e:
-            screenshot_path = take_screenshot(self.page, "entrance_exam_process_failed")
-            allure.attach.file(str(screenshot_path), name="entrance_exam_process_failed",
-                               attachment_type=allure.attachment_type.PNG)
+            self.capture_step("entrance_exam_process_failed", failed=True)
             self.logger.error(f"Entrance Exam process failed: {e}")
             raise
 
@@ -279,14 +280,10 @@ class CollegeBridgeLandingPage(BasePage):
                 self.logger.info(f"Step {step_index}: {description} on URL {self.page.url}")
                 action(locator, expected_url)
 
-            screenshot_path = take_screenshot(self.page, "core_nursing_process_completed")
-            allure.attach.file(str(screenshot_path), name="core_nursing_process_completed",
-                               attachment_type=allure.attachment_type.PNG)
+            self.capture_step("core_nursing_process_completed")
             self.logger.info("Core Nursing process completed.")
         except Exception as e:
-            screenshot_path = take_screenshot(self.page, "core_nursing_process_failed")
-            allure.attach.file(str(screenshot_path), name="core_nursing_process_failed",
-                               attachment_type=allure.attachment_type.PNG)
+            self.capture_step("core_nursing_process_failed", failed=True)
             self.logger.error(f"Core Nursing process failed: {e}")
             raise
 
@@ -318,14 +315,10 @@ class CollegeBridgeLandingPage(BasePage):
                 self.logger.info(f"Step {step_index}: {description} on URL {self.page.url}")
                 action(locator, expected_url)
 
-            screenshot_path = take_screenshot(self.page, "exit_exam_process_completed")
-            allure.attach.file(str(screenshot_path), name="exit_exam_process_completed",
-                               attachment_type=allure.attachment_type.PNG)
+            self.capture_step("exit_exam_process_completed")
             self.logger.info("Exit Exam process completed.")
         except Exception as e:
-            screenshot_path = take_screenshot(self.page, "exit_exam_process_failed")
-            allure.attach.file(str(screenshot_path), name="exit_exam_process_failed",
-                               attachment_type=allure.attachment_type.PNG)
+            self.capture_step("exit_exam_process_failed", failed=True)
             self.logger.error(f"Exit Exam process failed: {e}")
             raise
 
@@ -352,14 +345,10 @@ class CollegeBridgeLandingPage(BasePage):
             self.logger.info(f"Clicking Next button on URL {self.page.url}")
             self.click_with_retry(ConfirmContactPageLocators.NEXT_BUTTON, expected_url)
 
-            screenshot_path = take_screenshot(self.page, "confirm_contact_passed")
-            allure.attach.file(str(screenshot_path), name="confirm_contact_passed",
-                               attachment_type=allure.attachment_type.PNG)
+            self.capture_step("confirm_contact_passed")
             self.logger.info("Confirm Contact process completed.")
         except Exception as e:
-            screenshot_path = take_screenshot(self.page, "confirm_contact_failed")
-            allure.attach.file(str(screenshot_path), name="confirm_contact_failed",
-                               attachment_type=allure.attachment_type.PNG)
+            self.capture_step("confirm_contact_failed", failed=True)
             self.logger.error(f"Confirm Contact process failed: {e}")
             raise
 
@@ -372,14 +361,10 @@ class CollegeBridgeLandingPage(BasePage):
 
             self.logger.info(f"Clicking Next button on URL {self.page.url}")
             self.click_with_retry(ResultsPageLocators.NEXT_BUTTON, expected_url)
-            screenshot_path = take_screenshot(self.page, "result_page_passed")
-            allure.attach.file(str(screenshot_path), name="result_page_passed",
-                               attachment_type=allure.attachment_type.PNG)
+            self.capture_step("result_page_passed")
             self.logger.info("Result Page process completed.")
         except Exception as e:
-            screenshot_path = take_screenshot(self.page, "result_page_failed")
-            allure.attach.file(str(screenshot_path), name="result_page_failed",
-                               attachment_type=allure.attachment_type.PNG)
+            self.capture_step("result_page_failed", failed=True)
             self.logger.error(f"Result Page process failed: {e}")
             raise
 
@@ -406,14 +391,10 @@ class CollegeBridgeLandingPage(BasePage):
 
             self.click(CollegePlanPageLocators.NEXT_BUTTON)
 
-            screenshot_path = take_screenshot(self.page, "college_plan_process_completed")
-            allure.attach.file(str(screenshot_path), name="college_plan_process_completed",
-                               attachment_type=allure.attachment_type.PNG)
+            self.capture_step("college_plan_process_completed")
             self.logger.info("College Plan process completed.")
         except Exception as e:
-            screenshot_path = take_screenshot(self.page, "college_plan_process_failed")
-            allure.attach.file(str(screenshot_path), name="college_plan_process_failed",
-                               attachment_type=allure.attachment_type.PNG)
+            self.capture_step("college_plan_process_failed", failed=True)
             self.logger.error(f"College Plan process failed: {e}")
             raise
 
@@ -438,9 +419,7 @@ class CollegeBridgeLandingPage(BasePage):
                     self.ready_not_yet_path()
 
         except Exception as e:
-            screenshot_path = take_screenshot(self.page, "college_plan_process_failed")
-            allure.attach.file(str(screenshot_path), name="college_plan_process_failed",
-                               attachment_type=allure.attachment_type.PNG)
+            self.capture_step("college_plan_process_failed", failed=True)
             self.logger.error(f"College Plan process failed: {e}")
             raise
 
@@ -473,34 +452,21 @@ class CollegeBridgeLandingPage(BasePage):
 
             self.click_with_retry(PreBuyCheckoutPageLocators.CHECKBOX, expected_url)
             self.click_with_retry(PreBuyCheckoutPageLocators.PAY_NOW, expected_url)
-            time.sleep(25)
 
             self.logger.info(f"Verify the Bridge Plan Purchased Message")
             expected_congratulations_text = f"Congrats, {self.test_data['first_name']}!You’ve taken the first step toward building an RN Bridge Plan that fits your life."
 
-            # Wait for the element to ensure it’s loaded
-            self.page.wait_for_selector(PreBuyPurchasedPageLocators.CONGRATULATIONS_TEXT, state="visible")
-            congratulations_text = self.page.text_content(PreBuyPurchasedPageLocators.CONGRATULATIONS_TEXT).strip()
+            # Resolves as soon as the purchased page shows the message; apostrophes are normalized
+            congratulations_text = self.expect_text(
+                PreBuyPurchasedPageLocators.CONGRATULATIONS_TEXT, expected_congratulations_text, match="exact",
+                normalize_whitespace=False, timeout=60000)
+            print(f"Congratulations text: {congratulations_text}")
 
-            # Log raw strings for debugging
-            print(f"Actual (repr): {repr(congratulations_text)}")
-            print(f"Expected (repr): {repr(expected_congratulations_text)}")
-
-            # Normalize apostrophes
-            congratulations_text = congratulations_text.replace("'", "’")
-
-            # Assert with stripped strings
-            assert congratulations_text == expected_congratulations_text, f"Text mismatch: got '{congratulations_text}', expected '{expected_congratulations_text}'"
-
-            screenshot_path = take_screenshot(self.page, "bridge_plan_checkout_process_completed")
-            allure.attach.file(str(screenshot_path), name="bridge_plan_checkout_process_completed",
-                               attachment_type=allure.attachment_type.PNG)
+            self.capture_step("bridge_plan_checkout_process_completed")
             self.logger.info("Bridge Plan Checkout process completed.")
 
         except Exception as e:
-            screenshot_path = take_screenshot(self.page, "bridge_plan_checkout_process_failed")
-            allure.attach.file(str(screenshot_path), name="bridge_plan_checkout_process_failed",
-                               attachment_type=allure.attachment_type.PNG)
+            self.capture_step("bridge_plan_checkout_process_failed", failed=True)
             self.logger.error(f"Bridge Plan Checkout process failed: {e}")
             raise
 
@@ -516,15 +482,11 @@ class CollegeBridgeLandingPage(BasePage):
             self.logger.info(f"Clicking Next button on URL {self.page.url}")
             self.click_with_retry(ReadinessPageLocators.NEXT_BUTTON, expected_url)
 
-            screenshot_path = take_screenshot(self.page, "ready_immediate_process_completed")
-            allure.attach.file(str(screenshot_path), name="ready_immediate_process_completed",
-                               attachment_type=allure.attachment_type.PNG)
+            self.capture_step("ready_immediate_process_completed")
             self.logger.info("Ready Immediate process completed.")
 
         except Exception as e:
-            screenshot_path = take_screenshot(self.page, "ready_immediate_process_failed")
-            allure.attach.file(str(screenshot_path), name="ready_immediate_process_failed",
-                               attachment_type=allure.attachment_type.PNG)
+            self.capture_step("ready_immediate_process_failed", failed=True)
             self.logger.error(f"'Immediately. I'm ready to select a plan.' process failed: {e}")
             raise
 
@@ -551,15 +513,11 @@ class CollegeBridgeLandingPage(BasePage):
                 self.logger.info(f"Step {step_index}: {description} on URL {self.page.url}")
                 action(locator, expected_value)
 
-            screenshot_path = take_screenshot(self.page, "ready_soon_process_completed")
-            allure.attach.file(str(screenshot_path), name="ready_soon_process_completed",
-                               attachment_type=allure.attachment_type.PNG)
+            self.capture_step("ready_soon_process_completed")
             self.logger.info("Ready Immediate process completed.")
 
         except Exception as e:
-            screenshot_path = take_screenshot(self.page, "ready_soon_process_failed")
-            allure.attach.file(str(screenshot_path), name="ready_soon_process_failed",
-                               attachment_type=allure.attachment_type.PNG)
+            self.capture_step("ready_soon_process_failed", failed=True)
             self.logger.error(f"'Soon. I’m ready to discuss my RN goals.' process failed: {e}")
             raise
 
@@ -589,14 +547,10 @@ class CollegeBridgeLandingPage(BasePage):
                 action(locator, expected_value)
 
 
-            screenshot_path = take_screenshot(self.page, "ready_soon_process_completed")
-            allure.attach.file(str(screenshot_path), name="ready_soon_process_completed",
-                               attachment_type=allure.attachment_type.PNG)
+            self.capture_step("ready_soon_process_completed")
             self.logger.info("'Not yet. I'd like more information.' process completed.")
 
         except Exception as e:
-            screenshot_path = take_screenshot(self.page, "ready_soon_process_failed")
-            allure.attach.file(str(screenshot_path), name="ready_soon_process_failed",
-                               attachment_type=allure.attachment_type.PNG)
+            self.capture_step("ready_soon_process_failed", failed=True)
             self.logger.error(f"'Not yet. I'd like more information.' process failed: {e}")
             raise
\ No newline at end of file
@@ -0,0 +1,157 @@
+import argparse
+
+from config.base_config import BaseConfig
+from config.launch_profiles import LAUNCH_PROFILES
+
+from utils.asset_cache import StaticAssetCache
+from utils.browser_servers import parse_endpoints
+from utils.concurrency import AdaptiveConcurrency, format_history
+from utils.lead_dataset import JsonlLeadSource
+from utils.lead_pool import LeadPool, LeadPoolSource
+from utils.payment_stub import PAYMENT_STUB_MODES, PaymentStub, load_stub_config, parse_mode
+from utils.load_generator import LoadGenerator, build_report, format_report, save_report
+from utils.protocol_replay import ReplayEngine, load_capture
+
+
+def lead_source(args):
+    if args.lead_pool:
+        return LeadPoolSource(LeadPool(args.lead_pool))
+    if args.leads_file:
+        return JsonlLeadSource(args.leads_file)
+    return None
+
+
+def payment_stub(args):
+    if not parse_mode(args.payment_stub):
+        return None
+    return PaymentStub(args.payment_stub, load_stub_config(args.payment_stub_config))
+
+
+def run_browser_load(args):
+    controller = None
+    if args.adaptive:
+        controller = AdaptiveConcurrency(
+            min_limit=args.min_concurrency,
+            max_limit=args.concurrency,
+            initial=args.initial_concurrency,
+            max_stage_latency_s=args.max_stage_latency,
+            max_cpu_percent=args.max_cpu,
+            max_memory_percent=args.max_memory,
+            interval=args.adjust_interval,
+        )
+    generator = LoadGenerator(
+        rate_per_minute=args.rate,
+        concurrency=args.concurrency,
+        base_url=args.base_url,
+        funnel_url=args.funnel_url,
+        duration=args.duration,
+        total_leads=args.leads,
+        browser_name=args.browser,
+        headless=args.headless.lower() == "true",
+        launch_profile=args.launch_profile,
+        asset_cache=StaticAssetCache(args.http_cache_dir) if args.http_cache_dir else None,
+        lead_source=lead_source(args),
+        payment_stub=payment_stub(args),
+        recycle_after_contexts=args.recycle_after_contexts,
+        recycle_above_mb=args.recycle_above_mb,
+        browser_servers=parse_endpoints(args.browser_servers),
+        controller=controller,
+    )
+    results = generator.run()
+    report = build_report(results, generator.started_at, interval=args.interval)
+    print(format_report(report))
+    if controller:
+        report["concurrency"] = controller.history
+        print("\n" + format_history(controller.history))
+    print(f"Report saved to: {save_report(report, results)}")
+    return 1 if report["errors"] else 0
+
+
+def run_replay_load(args):
+    engine = ReplayEngine(
+        load_capture(args.capture),
+        concurrency=args.concurrency,
+        total_sequences=args.sequences,
+        duration=args.duration,
+        timeout=args.timeout,
+        lead_source=lead_source(args),
+    )
+    results = engine.run()
+    report = build_report(results, engine.started_at, interval=args.interval)
+    print(format_report(report))
+    print(f"Report saved to: {save_report(report, results)}")
+    return 1 if report["errors"] else 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Generate College Bridge lead-creation load.")
+    subparsers = parser.add_subparsers(dest="mode", required=True)
+
+    browser = subparsers.add_parser("browser", help="Drive full funnels through real browsers.")
+    browser.add_argument("--rate", type=float, required=True, help="Target leads per minute.")
+    browser.add_argument("--concurrency", type=int, default=4, help="Maximum concurrent funnels.")
+    browser.add_argument("--duration", type=float, help="Stop scheduling new leads after this many seconds.")
+    browser.add_argument("--leads", type=int, help="Stop after scheduling this many leads.")
+    browser.add_argument("--base-url", help="Landing page URL (defaults to the configured environment).")
+    browser.add_argument("--funnel-url", help="Qualify funnel base URL (defaults to test_data/college_bridge_urls.json).")
+    browser.add_argument("--browser", default="chromium", help="Browser to use: chromium, firefox, or webkit")
+    browser.add_argument("--headless", default="True", help="Run browser in headless mode: True or False")
+    browser.add_argument("--interval", type=float, default=60, help="Reporting window in seconds.")
+    browser.add_argument("--launch-profile", default="default", choices=sorted(LAUNCH_PROFILES),
+                         help="Browser launch profile.")
+    browser.add_argument("--http-cache-dir", help="Shared on-disk cache for static assets.")
+    browser.add_argument("--leads-file", help="JSONL lead dataset (python -m utils.lead_dataset) instead of FakerAPI.")
+    browser.add_argument("--payment-stub", default="off",
+                         help=f"Answer checkout payment calls locally: {', '.join(PAYMENT_STUB_MODES)}.")
+    browser.add_argument("--payment-stub-config", default=str(BaseConfig.PAYMENT_STUB_CONFIG),
+                         help="JSON file with the payment URL patterns and stubbed responses.")
+    browser.add_argument("--lead-pool", help="Consume leads from this SQLite lead pool (python -m utils.lead_pool).")
+    browser.add_argument("--recycle-after-contexts", type=int, default=BaseConfig.RECYCLE_AFTER_CONTEXTS,
+                         help="Relaunch each worker's browser after this many contexts; 0 never.")
+    browser.add_argument("--recycle-above-mb", type=float, default=BaseConfig.RECYCLE_ABOVE_MB,
+                         help="Relaunch a worker's browser once its processes exceed this RSS in MB; 0 never.")
+    browser.add_argument("--browser-servers", default=BaseConfig.BROWSER_SERVERS,
+                         help="Comma-separated ws:// browser servers (python -m utils.browser_servers) to spread "
+                              "workers across instead of launching browsers locally.")
+    adaptive = browser.add_argument_group("adaptive concurrency")
+    adaptive.add_argument("--adaptive", action="store_true",
+                          help="Let an AIMD controller pick the number of concurrent funnels, up to --concurrency, "
+                               "from host CPU, memory and stage latency. Use a --rate above the expected capacity.")
+    adaptive.add_argument("--min-concurrency", type=int, default=1, help="Lowest concurrency the controller may use.")
+    adaptive.add_argument("--initial-concurrency", type=int, help="Starting concurrency (default: --min-concurrency).")
+    adaptive.add_argument("--max-stage-latency", type=float, default=30,
+                          help="p95 stage duration in seconds above which concurrency is cut.")
+    adaptive.add_argument("--max-cpu", type=float, default=85, help="Host CPU %% above which concurrency is cut.")
+    adaptive.add_argument("--max-memory", type=float, default=85, help="Host memory %% above which concurrency is cut.")
+    adaptive.add_argument("--adjust-interval", type=float, default=15, help="Seconds between controller decisions.")
+    browser.set_defaults(func=run_browser_load)
+
+    replay = subparsers.add_parser("replay", help="Replay captured API calls over HTTP without a browser.")
+    replay.add_argument("--capture", required=True, help="Per-class capture file written by pytest --capture-api.")
+    replay.add_argument("--concurrency", type=int, default=50, help="Concurrent call sequences.")
+    replay.add_argument("--duration", type=float, help="Keep replaying for this many seconds.")
+    replay.add_argument("--sequences", type=int, help="Replay this many sequences.")
+    replay.add_argument("--timeout", type=float, default=30, help="Per-request timeout in seconds.")
+    replay.add_argument("--interval", type=float, default=60, help="Reporting window in seconds.")
+    replay.add_argument("--leads-file", help="JSONL lead dataset (python -m utils.lead_dataset) instead of FakerAPI.")
+    replay.add_argument("--lead-pool", help="Consume leads from this SQLite lead pool (python -m utils.lead_pool).")
+    replay.set_defaults(func=run_replay_load)
+    return parser
+
+
+if __name__ == "__main__":
+    parser = build_parser()
+    args = parser.parse_args()
+    if args.mode == "browser" and not (args.duration or args.leads):
+        parser.error("browser mode needs --duration or --leads")
+    if args.mode == "browser" and args.adaptive and not 1 <= args.min_concurrency <= args.concurrency:
+        parser.error("--min-concurrency must be between 1 and --concurrency")
+    if args.mode == "browser":
+        try:
+            parse_mode(args.payment_stub)
+            parse_endpoints(args.browser_servers)
+        except ValueError as e:
+            parser.error(str(e))
+    if args.mode == "replay" and not (args.duration or args.sequences):
+        parser.error("replay mode needs --duration or --sequences")
+    raise SystemExit(args.func(args))
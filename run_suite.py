@@ -1,4 +1,9 @@
-import pytest
+import argparse
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
 
 # List of test files or directories to run
 test_files = [
@@ -11,7 +16,136 @@ allure_args = [
     "--clean-alluredir"  # Optional: Cleans the directory first
 ]
 
-# Combine test files and allure arguments
-pytest_args = test_files + allure_args
+JUNIT_DIR = Path("reports") / "junit"
+DECISIONS = ("IMMEDIATE", "SOON", "NOTYET")
 
-exit_code = pytest.main(pytest_args)
\ No newline at end of file
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description="Run the College Bridge test suite with Allure reporting.",
+        epilog="Any other arguments are passed through to pytest.",
+    )
+    parser.add_argument("--tests", action="append",
+                        help=f"Test file or directory to run (repeatable; default: {', '.join(test_files)}).")
+
+    run = parser.add_argument_group("execution")
+    run.add_argument("--workers", type=int, default=0,
+                     help="Run independent dependency chains in up to N parallel worker processes.")
+    run.add_argument("--shard-index", type=int, default=1, help="Run shard N of --shard-total (1-based).")
+    run.add_argument("--shard-total", type=int, default=1,
+                     help="Split the dependency chains into this many shards, e.g. one per machine.")
+    run.add_argument("--repeat", type=int, default=1, help="Run the suite this many times in a row.")
+    run.add_argument("--retries", type=int, default=0, help="Re-run a failed test up to N times (pytest-rerunfailures).")
+    run.add_argument("--retry-delay", type=float, default=0, help="Seconds to wait before each re-run.")
+
+    target = parser.add_argument_group("target")
+    target.add_argument("--browser", choices=("chromium", "firefox", "webkit"), help="Browser to test with.")
+    target.add_argument("--headless", choices=("True", "False"), help="Run the browser headless.")
+    target.add_argument("--env", help="Environment config to test against (config/environments/<env>.yaml).")
+    target.add_argument("--prebuy", choices=("True", "False"), help="Funnel branch: take the PreBuy offer or not.")
+    target.add_argument("--decision", choices=DECISIONS, help="Funnel branch: the enrollment decision answer.")
+
+    soak = parser.add_argument_group("soak")
+    soak.add_argument("--soak-duration",
+                      help="Soak mode: repeat the funnel in fresh processes for this long (e.g. 3600, 90m, 8h).")
+    soak.add_argument("--soak-iterations", type=int, help="Soak mode: repeat the funnel this many times.")
+    soak.add_argument("--soak-pause", type=float, default=0, help="Seconds to wait between soak iterations.")
+    soak.add_argument("--drift-threshold", type=float, default=0.2,
+                      help="Relative change over the soak reported as drift (default 0.2 = 20%%).")
+    return parser
+
+
+def apply_environment(args):
+    """Branch and environment overrides go through the environment, where BaseConfig reads them."""
+    overrides = {"ENV": args.env, "PREBUY": args.prebuy, "DECISION": args.decision}
+    os.environ.update({name: value for name, value in overrides.items() if value is not None})
+
+
+def pytest_options(args):
+    """Translate the runner options into pytest options."""
+    options = []
+    if args.browser:
+        options.append(f"--test-browser={args.browser}")
+    if args.headless:
+        options.append(f"--headless={args.headless}")
+    if args.workers > 1:
+        options.append(f"--dag-workers={args.workers}")
+    if args.shard_total > 1:
+        options += [f"--shard-index={args.shard_index}", f"--shard-total={args.shard_total}"]
+    if args.retries:
+        options += [f"--reruns={args.retries}", f"--reruns-delay={args.retry_delay}"]
+    return options
+
+
+def main(argv=None):
+    parser = build_parser()
+    args, pytest_extra_args = parser.parse_known_args(argv)
+    if not 1 <= args.shard_index <= args.shard_total:
+        parser.error("--shard-index must be between 1 and --shard-total")
+    if args.repeat < 1:
+        parser.error("--repeat must be at least 1")
+
+    apply_environment(args)
+    tests = args.tests or test_files
+    if args.soak_duration or args.soak_iterations:
+        return run_soak(args, tests + pytest_options(args) + pytest_extra_args)
+
+    JUNIT_DIR.mkdir(parents=True, exist_ok=True)
+    runs = []
+    for run in range(1, args.repeat + 1):
+        junit_path = JUNIT_DIR / f"run-{run}.xml"
+        junit_path.unlink(missing_ok=True)
+        # Allure results of repeated runs accumulate, so only the first run cleans the directory
+        run_allure_args = allure_args if run == 1 else [arg for arg in allure_args if arg != "--clean-alluredir"]
+        pytest_args = tests + run_allure_args + pytest_options(args) + pytest_extra_args + [f"--junitxml={junit_path}"]
+        if args.repeat > 1:
+            print(f"🔁 Run {run}/{args.repeat}")
+        started = time.perf_counter()
+        exit_code = run_pytest(pytest_args, in_process=args.repeat == 1)
+        runs.append((run, exit_code, time.perf_counter() - started, junit_path))
+
+    print_summary(runs)
+    # pytest's own exit codes are kept for a single run; any failing repeat fails the whole run
+    return max(exit_code for _, exit_code, _, _ in runs) if args.repeat > 1 else runs[0][1]
+
+
+def run_pytest(pytest_args, in_process):
+    if in_process:
+        # Imported after argument parsing so that --help stays instant
+        import pytest
+
+        return int(pytest.main(pytest_args))
+    # Repeats run in fresh processes so the per-run metrics singletons start empty
+    return subprocess.call([sys.executable, "-m", "pytest", *pytest_args])
+
+
+def print_summary(runs):
+    from utils.junit import format_timing_summary, merge_junit, timing_summary
+
+    merged = merge_junit([path for *_, path in runs], JUNIT_DIR / "results.xml",
+                         labels=[f"run {run}" for run, *_ in runs])
+    print("\n" + format_timing_summary(timing_summary(merged)))
+    for run, exit_code, seconds, _ in runs:
+        print(f"{'✅' if exit_code == 0 else '❌'} Run {run}: exit code {exit_code}, {seconds:.1f} s")
+    print(f"Merged JUnit results saved to: {merged}")
+
+
+def run_soak(args, pytest_args):
+    from utils.soak import SoakRunner, drift_report, format_drift, parse_duration, save_drift
+
+    # Allure results of hundreds of iterations are not useful; the soak keeps its own series
+    runner = SoakRunner(
+        pytest_args,
+        duration=parse_duration(args.soak_duration) if args.soak_duration else None,
+        iterations=args.soak_iterations,
+        pause=args.soak_pause,
+    )
+    series = runner.run()
+    report = drift_report(series, threshold=args.drift_threshold)
+    print(format_drift(report))
+    print(f"Series and drift report saved to: {save_drift(report, runner.output_dir).parent}")
+    return 1 if report["drifting"] or report["failed_iterations"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,156 @@
+import time
+from email.utils import formatdate
+
+import allure
+import pytest
+
+from utils.asset_cache import DEFAULT_MAX_AGE, CacheStats, StaticAssetCache, freshness_lifetime
+
+NOW = 1_800_000_000
+BUNDLE = "https://cdn.example.test/static/app.js"
+
+
+class FakeRequest:
+    def __init__(self, url=BUNDLE, method="GET"):
+        self.url = url
+        self.method = method
+        self.headers = {"accept": "*/*"}
+
+
+class FakeResponse:
+    def __init__(self, status=200, headers=None, body=b"console.log(1)"):
+        self.status = status
+        self.headers = headers or {}
+        self._body = body
+
+    def body(self):
+        return self._body
+
+
+class FakeRoute:
+    def __init__(self, response):
+        self.response = response
+        self.fetched_headers = []
+        self.fulfilled = None
+        self.fell_back = False
+
+    def fetch(self, headers=None):
+        self.fetched_headers.append(headers)
+        return self.response
+
+    def fulfill(self, **kwargs):
+        self.fulfilled = kwargs
+
+    def fallback(self):
+        self.fell_back = True
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return StaticAssetCache(tmp_path)
+
+
+def serve(cache, response, url=BUNDLE):
+    """Request url through the cache with `response` as the origin's answer; return (route, stats)."""
+    route, stats = FakeRoute(response), CacheStats()
+    cache._handle(route, FakeRequest(url), stats)
+    return route, stats
+
+
+def age(cache, seconds, url=BUNDLE):
+    """Move a stored response's storage time `seconds` into the past."""
+    meta, body = cache._read(url)
+    cache._write(url, {**meta, "stored_at": meta["stored_at"] - seconds}, body)
+
+
+@allure.suite("Static asset cache")
+@allure.feature("Freshness")
+class TestFreshnessLifetime:
+
+    @pytest.mark.parametrize("url, headers, expected", [
+        (BUNDLE, {"Cache-Control": "public, max-age=600"}, 600),
+        (BUNDLE, {"cache-control": "max-age=31536000, immutable"}, DEFAULT_MAX_AGE),
+        (BUNDLE, {"cache-control": "no-cache, max-age=600"}, 0),
+        (BUNDLE, {"cache-control": "s-maxage=600"}, 0),
+        (BUNDLE, {"expires": formatdate(NOW + 120, usegmt=True)}, 120),
+        (BUNDLE, {"expires": formatdate(NOW - 120, usegmt=True)}, 0),
+        (BUNDLE, {"expires": "0"}, 0),
+        (BUNDLE, {"cache-control": "max-age=60", "expires": formatdate(NOW + 120, usegmt=True)}, 60),
+        (BUNDLE, {}, 0),
+        (BUNDLE, {"cache-control": "public, immutable"}, DEFAULT_MAX_AGE),
+        ("https://cdn.example.test/static/app.3f9a1c2b.js?v=2", {}, DEFAULT_MAX_AGE),
+        ("https://cdn.example.test/static/chunk-0A1B2C3D4E.css", {}, DEFAULT_MAX_AGE),
+        ("https://cdn.example.test/3f9a1c2b/app.js", {}, 0),
+    ])
+    @allure.title("Cache-Control, Expires and content-hashed URLs decide how long a response is fresh")
+    def test_lifetime(self, url, headers, expected):
+        assert freshness_lifetime(url, headers, NOW) == pytest.approx(expected)
+
+
+@allure.suite("Static asset cache")
+@allure.feature("Serving and revalidation")
+class TestStaticAssetCache:
+
+    @allure.title("A fresh response is served from disk without a request")
+    def test_fresh_hit(self, cache):
+        route, stats = serve(cache, FakeResponse(headers={"cache-control": "max-age=600", "content-length": "14"}))
+        assert stats.misses == 1 and route.fulfilled["body"] == b"console.log(1)"
+        assert "content-length" not in route.fulfilled["headers"]
+
+        route, stats = serve(cache, None)
+        assert stats.hits == 1 and stats.bytes_from_cache == 14
+        assert route.fetched_headers == [] and route.fulfilled["body"] == b"console.log(1)"
+
+    @allure.title("A stale response with an ETag is revalidated and served again on a 304")
+    def test_revalidate_not_modified(self, cache):
+        serve(cache, FakeResponse(headers={"cache-control": "max-age=60", "etag": '"v1"',
+                                           "last-modified": "Mon, 01 Jun 2026 00:00:00 GMT"}))
+        age(cache, 120)
+
+        route, stats = serve(cache, FakeResponse(status=304, headers={"cache-control": "max-age=300"}, body=b""))
+        assert route.fetched_headers == [{"accept": "*/*", "if-none-match": '"v1"',
+                                          "if-modified-since": "Mon, 01 Jun 2026 00:00:00 GMT"}]
+        assert stats.revalidated == 1 and stats.misses == 0
+        assert route.fulfilled["status"] == 200 and route.fulfilled["body"] == b"console.log(1)"
+        meta, _ = cache._read(BUNDLE)
+        assert meta["headers"]["cache-control"] == "max-age=300"
+        assert meta["expires_at"] == pytest.approx(time.time() + 300, abs=5)
+
+    @allure.title("A changed asset replaces the stored one")
+    def test_revalidate_modified(self, cache):
+        serve(cache, FakeResponse(headers={"etag": '"v1"'}))
+        route, stats = serve(cache, FakeResponse(headers={"etag": '"v2"'}, body=b"console.log(2)"))
+        assert route.fetched_headers[0]["if-none-match"] == '"v1"'
+        assert stats.misses == 1 and route.fulfilled["body"] == b"console.log(2)"
+        assert cache._read(BUNDLE)[1] == b"console.log(2)"
+
+    @allure.title("Without freshness or validators every use goes to the network")
+    def test_no_cache_headers(self, cache):
+        serve(cache, FakeResponse())
+        route, stats = serve(cache, FakeResponse(body=b"console.log(2)"))
+        assert route.fetched_headers == [None] and stats.misses == 1
+        assert route.fulfilled["body"] == b"console.log(2)"
+
+    @allure.title("A content-hashed asset stays fresh whatever its headers leave out")
+    def test_hashed_url(self, cache):
+        url = "https://cdn.example.test/static/app.3f9a1c2b.js"
+        serve(cache, FakeResponse(), url=url)
+        age(cache, 24 * 3600, url=url)
+        _, stats = serve(cache, None, url=url)
+        assert stats.hits == 1
+
+    @pytest.mark.parametrize("response", [
+        FakeResponse(headers={"cache-control": "no-store, max-age=600"}),
+        FakeResponse(status=404, headers={"cache-control": "max-age=600"}),
+    ])
+    @allure.title("no-store and error responses are passed through without being stored")
+    def test_not_stored(self, cache, response):
+        route, _ = serve(cache, response)
+        assert route.fulfilled["status"] == response.status
+        assert cache._read(BUNDLE) == (None, None)
+
+    @allure.title("Non-GET requests fall back to the network")
+    def test_non_get(self, cache):
+        route = FakeRoute(None)
+        cache._handle(route, FakeRequest(method="POST"), CacheStats())
+        assert route.fell_back and route.fetched_headers == []
@@ -0,0 +1,63 @@
+import allure
+import pytest
+
+from pages.base_page import BasePage
+
+CONTENT = """
+<h1 id="title">Welcome   to  College Bridge</h1>
+<p id="plan">You're enrolled in the Bridge Plan</p>
+<p id="hidden" style="display: none">Hidden text</p>
+<p id="late"></p>
+<script>setTimeout(() => { document.getElementById("late").textContent = "Order 1234 confirmed"; }, 300);</script>
+"""
+
+
+@pytest.fixture
+def base_page(local_chromium):
+    context = local_chromium.new_context()
+    page = context.new_page()
+    page.set_content(CONTENT)
+    yield BasePage(page)
+    context.close()
+
+
+@allure.suite("Page helpers")
+@allure.feature("Browser-side text assertions")
+class TestExpectText:
+
+    @pytest.mark.parametrize("selector, expected, match, flags", [
+        ("#title", "College Bridge", "contains", ""),
+        ("#title", "Welcome to College Bridge", "exact", ""),
+        ("//h1", "welcome\\s+to", "regex", "i"),
+        ("css=#late", "^Order \\d+ confirmed$", "regex", ""),
+    ])
+    @allure.title("expect_text matches contains, exact and regex text")
+    def test_match_modes(self, base_page, selector, expected, match, flags):
+        text = base_page.expect_text(selector, expected, match=match, flags=flags, timeout=3000)
+        assert text in ("Welcome to College Bridge", "Order 1234 confirmed")
+
+    @allure.title("Apostrophes and whitespace are normalized unless disabled")
+    def test_normalization(self, base_page):
+        assert base_page.expect_text("#plan", "You’re enrolled", timeout=1000) == "You’re enrolled in the Bridge Plan"
+        with pytest.raises(AssertionError):
+            base_page.expect_text("#title", "Welcome to", normalize_whitespace=False, timeout=300)
+
+    @pytest.mark.parametrize("selector, expected, match", [
+        ("#title", "College", "exact"),
+        ("#title", "^College", "regex"),
+        ("#hidden", "Hidden", "contains"),
+    ])
+    @allure.title("A mismatch or hidden element times out with the last seen text")
+    def test_mismatch(self, base_page, selector, expected, match):
+        with pytest.raises(AssertionError, match="Last seen text"):
+            base_page.expect_text(selector, expected, match=match, timeout=300)
+
+    @allure.title("An expected URL must match as well")
+    def test_expected_url(self, base_page):
+        with pytest.raises(AssertionError, match="on https://example.test/"):
+            base_page.expect_text("#title", "College", expected_url="https://example.test/", timeout=300)
+
+    @allure.title("An unknown match mode is rejected")
+    def test_unknown_mode(self, base_page):
+        with pytest.raises(ValueError, match="Unsupported match mode"):
+            base_page.expect_text("#title", "College", match="fuzzy")
@@ -0,0 +1,108 @@
+import json
+import socket
+
+import allure
+import pytest
+
+from utils.browser_servers import BrowserServerPool, LocalBrowserServers, parse_endpoints, worker_index
+
+ENDPOINTS = ["ws://10.0.0.1:3000/", "ws://10.0.0.2:3000/", "ws://10.0.0.3:3000/"]
+
+
+class FakeBrowserType:
+    """Records connect() calls; endpoints in `dead` refuse the connection."""
+
+    def __init__(self, dead=()):
+        self.dead = set(dead)
+        self.calls = []
+
+    def connect(self, endpoint, timeout=None, headers=None):
+        self.calls.append({"endpoint": endpoint, "timeout": timeout, "headers": headers})
+        if endpoint in self.dead:
+            raise Exception("connect ECONNREFUSED")
+        return f"browser@{endpoint}"
+
+
+def dead_port():
+    """A local port nothing listens on."""
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@allure.suite("Browser servers")
+@allure.feature("Browser server pool")
+class TestBrowserServerPool:
+
+    @allure.title("Endpoints and worker ids are parsed")
+    def test_parse(self):
+        assert parse_endpoints("ws://a:1/, ws://b:2/\nws://c:3/") == ["ws://a:1/", "ws://b:2/", "ws://c:3/"]
+        assert parse_endpoints("") == []
+        with pytest.raises(ValueError, match="Invalid browser server endpoint"):
+            parse_endpoints("http://a:1/")
+        assert worker_index("gw3") == 3
+        assert worker_index(2) == 2
+        assert worker_index("master") == 0
+
+    @pytest.mark.parametrize("index, first", [(0, 0), (1, 1), (2, 2), (3, 0), (7, 1)])
+    @allure.title("Worker N starts at endpoint N modulo the pool size")
+    def test_order(self, index, first):
+        order = BrowserServerPool(ENDPOINTS).order(index)
+        assert order[0] == ENDPOINTS[first]
+        assert sorted(order) == sorted(ENDPOINTS)
+
+    @allure.title("An unreachable endpoint falls through to the next one")
+    def test_fall_through(self):
+        browser_type = FakeBrowserType(dead={ENDPOINTS[1]})
+        browser, endpoint = BrowserServerPool(ENDPOINTS, connect_timeout_ms=500).connect(browser_type, index=1)
+        assert endpoint == ENDPOINTS[2] and browser == f"browser@{ENDPOINTS[2]}"
+        assert [call["endpoint"] for call in browser_type.calls] == ENDPOINTS[1:]
+        assert browser_type.calls[0]["timeout"] == 500
+
+    @allure.title("No reachable endpoint raises ConnectionError naming every endpoint")
+    def test_none_reachable(self):
+        browser_type = FakeBrowserType(dead=ENDPOINTS)
+        with pytest.raises(ConnectionError) as error:
+            BrowserServerPool(ENDPOINTS).connect(browser_type, index=0)
+        assert all(endpoint in str(error.value) for endpoint in ENDPOINTS)
+
+    @allure.title("Launch options travel in the x-playwright-launch-options header")
+    def test_launch_options_header(self):
+        browser_type = FakeBrowserType()
+        launch_kwargs = {"headless": True, "args": ["--disable-gpu"]}
+        BrowserServerPool(ENDPOINTS).connect(browser_type, index=0, launch_kwargs=launch_kwargs)
+        headers = browser_type.calls[0]["headers"]
+        assert json.loads(headers["x-playwright-launch-options"]) == launch_kwargs
+
+        BrowserServerPool(ENDPOINTS).connect(browser_type, index=0)
+        assert browser_type.calls[1]["headers"] is None
+
+
+@allure.suite("Browser servers")
+@allure.feature("Local browser servers")
+class TestLocalBrowserServers:
+
+    @allure.title("Local run-server processes report their endpoints and stop cleanly")
+    def test_start_stop(self):
+        servers = LocalBrowserServers(count=2)
+        with servers:
+            assert len(servers.endpoints) == 2
+            assert all(endpoint.startswith("ws://127.0.0.1:") for endpoint in servers.endpoints)
+            processes = list(servers.processes)
+            assert all(process.poll() is None for process in processes)
+        assert servers.processes == []
+        assert all(process.poll() is not None for process in processes)
+
+    @allure.title("A worker whose endpoint is dead connects to the live local server")
+    def test_dead_endpoint_falls_through(self, local_chromium):
+        dead = f"ws://127.0.0.1:{dead_port()}/"
+        with LocalBrowserServers(count=1) as servers:
+            pool = BrowserServerPool([dead] + servers.endpoints, connect_timeout_ms=5000)
+            browser, endpoint = pool.connect(local_chromium.browser_type, index=0, launch_kwargs={"headless": True})
+            try:
+                assert endpoint == servers.endpoints[0]
+                page = browser.new_page()
+                page.set_content("<p>served</p>")
+                assert page.text_content("p") == "served"
+            finally:
+                browser.close()
@@ -0,0 +1,154 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import allure
+import pytest
+
+from pages.base_page import BasePage
+from utils.budget import BUDGETS, BudgetExceeded, BudgetManager, Watchdog, budget_for
+from utils.retry_telemetry import RetryTelemetry
+
+
+@pytest.fixture
+def budgets():
+    manager = BudgetManager()
+    yield manager
+    manager.stop()
+
+
+@allure.suite("Budgets")
+@allure.feature("Per-test time and retry budgets")
+class TestBudgetManager:
+
+    @allure.title("Without an active budget the helpers' values pass through")
+    def test_no_budget_passthrough(self, budgets):
+        assert budgets.clamp("click", "#go", 30000, 5) == (30000, 5)
+        budgets.charge_retry("click", "#go")
+
+    @allure.title("Timeouts are clamped to the time left and attempts to the retries left")
+    def test_clamp(self, budgets):
+        budget = budgets.start("test_stage", seconds=10, retries=3)
+        timeout, retries = budgets.clamp("click", "#go", 60000, 10, url="https://example.test/")
+        assert 9000 < timeout <= 10000
+        assert retries == 4  # three retries left plus the first attempt
+        assert budget.last_state["helper"] == "click" and budget.last_state["url"] == "https://example.test/"
+
+        budget.retries_used = 3
+        assert budgets.clamp("click", "#go", 5000, 10) == (5000, 1)
+
+    @allure.title("An exhausted time budget stops the next helper")
+    def test_clamp_time_exhausted(self, budgets):
+        budget = budgets.start("test_stage", seconds=10, retries=3)
+        budget.deadline = time.monotonic() - 1
+        with pytest.raises(BudgetExceeded, match="Time budget exhausted before click"):
+            budgets.clamp("click", "#go", 5000, 3)
+
+    @allure.title("charge_retry raises once the retries are spent")
+    def test_charge_retry(self, budgets):
+        budget = budgets.start("test_stage", seconds=60, retries=2)
+        budgets.charge_retry("fill", "#email")
+        budgets.charge_retry("fill", "#email")
+        assert budget.retries_used == 2
+        with pytest.raises(BudgetExceeded, match=r"Retry budget exhausted in fill\(#email\)"):
+            budgets.charge_retry("fill", "#email")
+
+    @allure.title("charge_retry raises when the time ran out during the retry")
+    def test_charge_retry_time_exhausted(self, budgets):
+        budget = budgets.start("test_stage", seconds=60, retries=5)
+        budget.deadline = time.monotonic() - 1
+        with pytest.raises(BudgetExceeded, match="Time budget exhausted in fill"):
+            budgets.charge_retry("fill", "#email")
+
+    @allure.title("Budgets are per thread")
+    def test_thread_local(self, budgets):
+        budgets.start("main", seconds=60, retries=1)
+        seen = []
+        thread = threading.Thread(target=lambda: seen.append(budgets.current))
+        thread.start()
+        thread.join()
+        assert seen == [None]
+        assert budgets.current.name == "main"
+
+    @allure.title("Stage budgets override the defaults")
+    def test_budget_for(self):
+        config = {"default": {"seconds": 180, "retries": 15}, "stages": {"test_open_url": {"seconds": 90}}}
+        assert budget_for(config, "test_open_url") == (90, 15)
+        assert budget_for(config, "test_other") == (180, 15)
+        assert budget_for({}, "test_other") == (300, 20)
+
+RETRY_HELPERS = [
+    ("compare_current_url", ("https://example.test/done",)),
+    ("compare_element_href", ("#go", "/done")),
+    ("click_with_retry", ("#go", "https://example.test/done")),
+    ("select_dropdown_with_retry", ("#state", "CA")),
+    ("enter_text_with_retry", ("#email", "lead@example.test")),
+]
+
+
+class SlowFailingPage:
+    """Page stub whose every wait takes `delay` seconds and then raises `error`."""
+
+    url = "https://example.test/"
+
+    def __init__(self, delay, error=TimeoutError("still waiting")):
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+        self.waits = []
+
+    def _fail(self, *args, **kwargs):
+        self.calls += 1
+        time.sleep(self.delay)
+        raise self.error
+
+    wait_for_url = wait_for_selector = eval_on_selector = _fail
+
+    def locator(self, selector):
+        return SimpleNamespace(scroll_into_view_if_needed=self._fail)
+
+    def wait_for_timeout(self, timeout):
+        self.waits.append(timeout)
+
+
+@allure.suite("Budgets")
+@allure.feature("Per-test time and retry budgets")
+class TestRetryHelpersBudget:
+
+    @pytest.mark.parametrize("helper, args", RETRY_HELPERS)
+    @allure.title("A budget spent during a failed attempt stops the retry helper at once")
+    def test_budget_stops_retries(self, monkeypatch, helper, args):
+        monkeypatch.setattr("pages.base_page.RETRY_TELEMETRY", RetryTelemetry())
+        page = SlowFailingPage(delay=0.1)
+        BUDGETS.start("test_stage", seconds=0.05, retries=5)
+        try:
+            with pytest.raises(BudgetExceeded, match="Time budget exhausted in"):
+                getattr(BasePage(page), helper)(*args)
+        finally:
+            BUDGETS.stop()
+        assert page.calls == 1 and page.waits == []
+
+    @pytest.mark.parametrize("helper, args", RETRY_HELPERS)
+    @allure.title("BudgetExceeded raised within an attempt is not retried")
+    def test_budget_exceeded_not_retried(self, monkeypatch, helper, args):
+        monkeypatch.setattr("pages.base_page.RETRY_TELEMETRY", RetryTelemetry())
+        page = SlowFailingPage(delay=0, error=BudgetExceeded("Time budget exhausted"))
+        with pytest.raises(BudgetExceeded):
+            getattr(BasePage(page), helper)(*args)
+        assert page.calls == 1 and page.waits == []
+
+
+@allure.suite("Budgets")
+@allure.feature("Hang watchdog")
+class TestWatchdog:
+
+    @allure.title("The watchdog dump holds the budget state and every thread's stack")
+    def test_dump(self, tmp_path):
+        watchdog = Watchdog(grace=3600, dump_dir=tmp_path, poll_interval=3600)
+        budget = BudgetManager().start("tests/test_x.py::TestX::test_y", seconds=1, retries=1)
+        budget.last_state = {"helper": "click", "locator": "#go"}
+        dump = watchdog.dump(budget)
+        assert dump.parent == tmp_path and dump.name == "tests_test_x.py_TestX_test_y.txt"
+        text = dump.read_text()
+        assert "'locator': '#go'" in text
+        assert "--- Thread MainThread ---" in text
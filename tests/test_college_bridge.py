@@ -7,9 +7,9 @@ from pages.college_bridge_pages2 import CollegeBridgeLandingPage
 class TestCollegeBridge:
 
     @pytest.fixture(autouse=True)
-    def setup(self, page):
+    def setup(self, page, lead):
         self.page = page
-        self.landing_page = CollegeBridgeLandingPage(self.page)
+        self.landing_page = CollegeBridgeLandingPage(self.page, test_data=lead)
 
     @allure.title("Open College Bridge URL")
     @pytest.mark.order(1)
@@ -0,0 +1,102 @@
+import allure
+import pytest
+
+from utils import concurrency
+from utils.concurrency import AdaptiveConcurrency
+
+
+class FakeSampler:
+    def __init__(self, cpu=None, memory=None):
+        self.cpu = cpu
+        self.memory = memory
+
+    def cpu_percent(self):
+        return self.cpu
+
+    def memory_percent(self):
+        return self.memory
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Deterministic monotonic clock: every adjust() window lasts exactly 10 s."""
+    now = [1000.0]
+    monkeypatch.setattr(concurrency.time, "monotonic", lambda: now[0])
+
+    def advance(seconds=10.0):
+        now[0] += seconds
+
+    return advance
+
+
+def run_window(controller, clock, busy=0, stages=0, latency=1.0):
+    """Hold `busy` slots at once and finish `stages` stages, then close the window."""
+    slots = [controller.slot() for _ in range(busy)]
+    for slot in slots:
+        slot.__enter__()
+    for _ in range(stages):
+        controller.observe("stage", latency)
+    for slot in slots:
+        slot.__exit__(None, None, None)
+    clock()
+    return controller.adjust()
+
+
+@allure.suite("Load generation")
+@allure.feature("Adaptive concurrency")
+class TestAdaptiveConcurrency:
+
+    @allure.title("An empty window without host metrics holds the limit")
+    def test_empty_window(self, clock):
+        controller = AdaptiveConcurrency(min_limit=1, max_limit=8, initial=2, sampler=FakeSampler())
+        decision = run_window(controller, clock)
+        assert decision["action"] == "hold"
+        assert decision["stage_p95_s"] is None and decision["cpu_percent"] is None
+        assert controller.limit == 2
+
+    @pytest.mark.parametrize("sampler, latency", [
+        (FakeSampler(cpu=95, memory=40), 1.0),
+        (FakeSampler(cpu=20, memory=95), 1.0),
+        (FakeSampler(cpu=20, memory=40), 60.0),
+    ], ids=["cpu", "memory", "stage-latency"])
+    @allure.title("An overloaded host or slow stages halve the limit")
+    def test_overload_halves_limit(self, clock, sampler, latency):
+        controller = AdaptiveConcurrency(min_limit=1, max_limit=8, initial=6, max_stage_latency_s=30,
+                                         sampler=sampler)
+        decision = run_window(controller, clock, busy=6, stages=10, latency=latency)
+        assert decision["action"] == "decrease"
+        assert decision["reason"]
+        assert controller.limit == 3
+
+    @allure.title("The limit only grows when it was fully used")
+    def test_growth_needs_saturation(self, clock):
+        controller = AdaptiveConcurrency(min_limit=1, max_limit=8, initial=3, sampler=FakeSampler(20, 40))
+        assert run_window(controller, clock, busy=2, stages=10)["action"] == "hold"
+        assert controller.limit == 3
+        assert run_window(controller, clock, busy=3, stages=10)["action"] == "increase"
+        assert controller.limit == 4
+
+    @allure.title("The limit never grows past max_limit")
+    def test_growth_capped(self, clock):
+        controller = AdaptiveConcurrency(min_limit=1, max_limit=2, initial=2, sampler=FakeSampler(20, 40))
+        assert run_window(controller, clock, busy=2, stages=10)["action"] == "hold"
+        assert controller.limit == 2
+
+    @allure.title("An increase that did not raise throughput is rolled back and not retried at once")
+    def test_unhelpful_increase_rolled_back(self, clock):
+        controller = AdaptiveConcurrency(min_limit=1, max_limit=8, initial=2, probe_cooldown=2,
+                                         sampler=FakeSampler(20, 40))
+        assert run_window(controller, clock, busy=2, stages=20)["action"] == "increase"
+        assert controller.limit == 3
+        # Same stage throughput at the higher limit: the extra funnel did not help
+        assert run_window(controller, clock, busy=3, stages=20)["action"] == "revert"
+        assert controller.limit == 2
+        assert [run_window(controller, clock, busy=2, stages=20)["action"] for _ in range(3)] == \
+            ["hold", "hold", "increase"]
+
+    @allure.title("An increase that raised throughput is kept")
+    def test_helpful_increase_kept(self, clock):
+        controller = AdaptiveConcurrency(min_limit=1, max_limit=8, initial=2, sampler=FakeSampler(20, 40))
+        run_window(controller, clock, busy=2, stages=20)
+        assert run_window(controller, clock, busy=3, stages=30)["action"] == "increase"
+        assert controller.limit == 4
@@ -0,0 +1,170 @@
+"""Scheduler tests run pytest in-process; they need the pytester plugin: python -m pytest -p pytester."""
+from collections import namedtuple
+
+import allure
+import pytest
+
+from utils.dag_scheduler import assign_shards, build_components
+
+FakeItem = namedtuple("FakeItem", "nodeid")
+
+CHAIN_MODULE = """
+import pytest
+
+class TestFunnel:
+    @pytest.mark.dependency()
+    def test_open(self):
+        pass
+
+    def test_fill(self):
+        pass
+
+@pytest.mark.dependency()
+def test_standalone():
+    pass
+
+@pytest.mark.dependency(depends=["test_standalone"])
+def test_after_standalone():
+    pass
+
+def test_independent():
+    pass
+"""
+
+
+@pytest.fixture
+def scheduler_pytester(request):
+    # pytester stays out of production runs, so it is only loaded when the invocation asks for it
+    if not request.config.pluginmanager.has_plugin("pytester"):
+        pytest.skip("needs the pytester plugin: run with -p pytester")
+    return request.getfixturevalue("pytester")
+
+
+def nodeids(components):
+    return [[item.nodeid for item in component] for component in components]
+
+
+@allure.suite("Test scheduling")
+@allure.feature("Dependency chains")
+class TestBuildComponents:
+
+    @allure.title("Tests of one class stay in one chain; dependencies join chains")
+    def test_components(self, scheduler_pytester):
+        scheduler_pytester.makepyfile(test_chain=CHAIN_MODULE)
+        components = build_components(scheduler_pytester.getitems(scheduler_pytester.path / "test_chain.py"))
+        assert nodeids(components) == [
+            ["test_chain.py::TestFunnel::test_open", "test_chain.py::TestFunnel::test_fill"],
+            ["test_chain.py::test_standalone", "test_chain.py::test_after_standalone"],
+            ["test_chain.py::test_independent"],
+        ]
+
+    @allure.title("A dependency cycle is a usage error")
+    def test_cycle(self, scheduler_pytester):
+        items = scheduler_pytester.getitems("""
+            import pytest
+
+            @pytest.mark.dependency(depends=["test_b"])
+            def test_a():
+                pass
+
+            @pytest.mark.dependency(depends=["test_a"])
+            def test_b():
+                pass
+        """)
+        with pytest.raises(pytest.UsageError, match="Dependency cycle"):
+            build_components(items)
+
+    @allure.title("Dependency names resolve per scope the way pytest-dependency resolves them")
+    def test_cross_module_names(self, scheduler_pytester):
+        scheduler_pytester.makepyfile(
+            test_a="""
+                import pytest
+
+                class TestSetup:
+                    @pytest.mark.dependency()
+                    def test_account(self):
+                        pass
+            """,
+            test_b="""
+                import pytest
+
+                @pytest.mark.dependency(depends=["test_a.py::TestSetup::test_account"], scope="session")
+                def test_session_name():
+                    pass
+
+                @pytest.mark.dependency(depends=["TestSetup::test_account"], scope="module")
+                def test_other_module_name():
+                    pass
+
+                class TestLocal:
+                    @pytest.mark.dependency(name="local")
+                    def test_named(self):
+                        pass
+
+                    @pytest.mark.dependency(depends=["local"], scope="class")
+                    def test_class_name(self):
+                        pass
+            """,
+        )
+        # pytest-dependency itself runs a test whose dependency it resolved and skips the others
+        result = scheduler_pytester.runpytest("-p", "dependency", "-rs")
+        result.assert_outcomes(passed=4, skipped=1)
+        result.stdout.fnmatch_lines(["*test_other_module_name depends on TestSetup::test_account*"])
+
+        items, _ = scheduler_pytester.inline_genitems()
+        components = nodeids(build_components(items))
+        assert ["test_a.py::TestSetup::test_account", "test_b.py::test_session_name"] in components
+        assert ["test_b.py::test_other_module_name"] in components
+        assert ["test_b.py::TestLocal::test_named", "test_b.py::TestLocal::test_class_name"] in components
+
+
+@allure.suite("Test scheduling")
+@allure.feature("Sharding")
+class TestAssignShards:
+
+    @allure.title("Chains go largest first onto the least loaded shard, never split")
+    def test_greedy_balance(self):
+        chains = [[FakeItem(f"{name}::{i}") for i in range(size)]
+                  for name, size in (("a", 1), ("b", 5), ("c", 3), ("d", 2), ("e", 2))]
+        shards = assign_shards(chains, 2)
+        assert [len(shard) for shard in shards] == [7, 6]
+        # b(5) -> 0, c(3) -> 1, d(2) -> 1, e(2) -> 0 on the 5/5 tie, a(1) -> 1
+        assert shards[0] == chains[1] + chains[4]
+        assert shards[1] == chains[2] + chains[3] + chains[0]
+        assert shards == assign_shards(list(reversed(chains)), 2)
+
+    @allure.title("More shards than chains leaves the extra shards empty")
+    def test_more_shards_than_chains(self):
+        assert assign_shards([[FakeItem("a")]], 3) == [[FakeItem("a")], [], []]
+
+    @allure.title("--shard-index/--shard-total select whole chains")
+    def test_shard_options(self, scheduler_pytester):
+        scheduler_pytester.makepyfile(test_chain=CHAIN_MODULE)
+        first = scheduler_pytester.runpytest("-p", "utils.dag_scheduler", "--shard-index=1", "--shard-total=2",
+                                             "--collect-only", "-q")
+        second = scheduler_pytester.runpytest("-p", "utils.dag_scheduler", "--shard-index=2", "--shard-total=2",
+                                              "--collect-only", "-q")
+        first.stdout.fnmatch_lines(["test_chain.py::TestFunnel::test_open", "test_chain.py::TestFunnel::test_fill",
+                                    "test_chain.py::test_independent", "*3/5 tests collected (2 deselected)*"])
+        second.stdout.fnmatch_lines(["test_chain.py::test_standalone", "test_chain.py::test_after_standalone",
+                                     "*2/5 tests collected (3 deselected)*"])
+
+        invalid = scheduler_pytester.runpytest("-p", "utils.dag_scheduler", "--shard-index=3", "--shard-total=2")
+        invalid.stderr.fnmatch_lines(["*--shard-index must be between 1 and --shard-total (2), got 3*"])
+
+
+@allure.suite("Test scheduling")
+@allure.feature("Worker isolation")
+class TestWorkerDataFile:
+
+    @allure.title("Each scheduler worker writes its own FakerAPI test data file")
+    def test_data_file_per_worker(self, monkeypatch):
+        from pages.college_bridge_pages2 import CollegeBridgeLandingPage
+
+        monkeypatch.delenv("DAG_WORKER", raising=False)
+        monkeypatch.delenv("PYTEST_XDIST_WORKER", raising=False)
+        assert CollegeBridgeLandingPage.data_file() == CollegeBridgeLandingPage.TEST_DATA_FILE
+        monkeypatch.setenv("DAG_WORKER", "3")
+        worker_file = CollegeBridgeLandingPage.data_file()
+        assert worker_file.name == "college_bridge_test_data.worker3.json"
+        assert worker_file.parent == CollegeBridgeLandingPage.TEST_DATA_FILE.parent
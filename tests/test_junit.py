@@ -0,0 +1,97 @@
+import xml.etree.ElementTree as ET
+
+import allure
+import pytest
+
+from utils.junit import format_timing_summary, iter_test_cases, merge_junit, timing_summary
+
+# pytest-rerunfailures leaves one <testcase> per attempt; only the last one carries the outcome
+RUN_1 = """<?xml version="1.0" encoding="utf-8"?>
+<testsuites name="pytest tests">
+  <testsuite name="pytest" errors="1" failures="1" skipped="1" tests="5" time="21.500">
+    <testcase classname="tests.test_funnel.TestFunnel" name="test_open" time="4.0"/>
+    <testcase classname="tests.test_funnel.TestFunnel" name="test_apply" time="9.0"/>
+    <testcase classname="tests.test_funnel.TestFunnel" name="test_apply" time="3.0"/>
+    <testcase classname="tests.test_funnel.TestFunnel" name="test_pay" time="1.0"/>
+    <testcase classname="tests.test_funnel.TestFunnel" name="test_pay" time="1.5">
+      <failure message="assert False">AssertionError</failure>
+    </testcase>
+    <testcase classname="tests.test_funnel.TestFunnel" name="test_confirm" time="0.0">
+      <skipped message="depends on test_pay"/>
+    </testcase>
+    <testcase classname="tests.test_funnel.TestFunnel" name="test_receipt" time="2.0">
+      <error message="fixture failed">RuntimeError</error>
+    </testcase>
+  </testsuite>
+</testsuites>
+"""
+# Older pytest versions write a bare <testsuite> root
+RUN_2 = """<?xml version="1.0" encoding="utf-8"?>
+<testsuite name="pytest" errors="0" failures="0" skipped="1" tests="3" time="12.000">
+  <testcase classname="tests.test_funnel.TestFunnel" name="test_open" time="6.0"/>
+  <testcase classname="tests.test_funnel.TestFunnel" name="test_apply" time="5.0"/>
+  <testcase classname="tests.test_funnel.TestFunnel" name="test_confirm" time="0.0">
+    <skipped message="skipped"/>
+  </testcase>
+</testsuite>
+"""
+TEST = "tests.test_funnel.TestFunnel::"
+
+
+@pytest.fixture
+def runs(tmp_path):
+    run_1, run_2 = tmp_path / "run-1.xml", tmp_path / "run-2.xml"
+    run_1.write_text(RUN_1)
+    run_2.write_text(RUN_2)
+    return run_1, run_2
+
+
+@allure.suite("Suite runner")
+@allure.feature("JUnit results")
+class TestJunit:
+
+    @allure.title("Each test yields its last attempt's outcome and time and its rerun count")
+    def test_iter_test_cases(self, runs):
+        cases = {case["test"]: case for case in iter_test_cases(runs[0])}
+        assert list(cases) == [TEST + name for name in ("test_open", "test_apply", "test_pay", "test_confirm",
+                                                         "test_receipt")]
+        assert cases[TEST + "test_open"] == {"test": TEST + "test_open", "outcome": "passed", "time": 4.0,
+                                             "reruns": 0}
+        assert cases[TEST + "test_apply"]["outcome"] == "passed" and cases[TEST + "test_apply"]["reruns"] == 1
+        assert cases[TEST + "test_apply"]["time"] == 3.0
+        assert cases[TEST + "test_pay"]["outcome"] == "failed" and cases[TEST + "test_pay"]["reruns"] == 1
+        assert cases[TEST + "test_confirm"]["outcome"] == "skipped"
+        assert cases[TEST + "test_receipt"]["outcome"] == "error"
+
+    @allure.title("merge_junit labels each run's suites, sums their totals and skips missing files")
+    def test_merge_junit(self, runs, tmp_path):
+        out_path = merge_junit([runs[0], tmp_path / "run-missing.xml", runs[1]], tmp_path / "merged" / "results.xml",
+                               labels=["run 1", "run 2", "run 3"])
+        root = ET.parse(out_path).getroot()
+        assert root.tag == "testsuites"
+        assert [suite.get("name") for suite in root] == ["pytest (run 1)", "pytest (run 3)"]
+        assert {key: root.get(key) for key in ("tests", "failures", "errors", "skipped", "time")} == {
+            "tests": "8", "failures": "1", "errors": "1", "skipped": "2", "time": "33.500"}
+        assert len(list(iter_test_cases(out_path))) == 8
+
+    @allure.title("merge_junit of only missing files writes an empty document")
+    def test_merge_junit_missing(self, tmp_path):
+        root = ET.parse(merge_junit([tmp_path / "run-1.xml"], tmp_path / "results.xml")).getroot()
+        assert len(root) == 0 and root.get("tests") == "0" and root.get("time") == "0.000"
+
+    @allure.title("timing_summary counts outcomes and reruns across runs and times only tests that ran")
+    def test_timing_summary(self, runs, tmp_path):
+        summary = timing_summary(merge_junit(runs, tmp_path / "results.xml"))
+        apply = summary[TEST + "test_apply"]
+        assert apply["outcomes"] == {"passed": 2} and apply["reruns"] == 1
+        assert apply["count"] == 2 and apply["mean"] == pytest.approx(4.0) and apply["max"] == 5.0
+        assert summary[TEST + "test_pay"]["outcomes"] == {"failed": 1}
+        confirm = summary[TEST + "test_confirm"]
+        assert confirm["outcomes"] == {"skipped": 2} and confirm["count"] == 0
+
+        lines = format_timing_summary(summary).splitlines()
+        assert len(lines) == 1 + len(summary)
+        apply_line = next(line for line in lines if line.startswith(TEST + "test_apply"))
+        assert apply_line.split()[1:] == ["2", "0", "1", "4.00", "4.90", "5.00"]
+        confirm_line = next(line for line in lines if line.startswith(TEST + "test_confirm"))
+        assert confirm_line.split()[1:] == ["0", "0", "0", "-", "-", "-"]
@@ -0,0 +1,56 @@
+import subprocess
+import sys
+
+import allure
+
+from utils.generate_random_test_data import get_project_root
+from utils.lead_dataset import CompactHashSet, generate_leads, iter_jsonl
+
+
+@allure.suite("Test data")
+@allure.feature("Offline lead dataset")
+class TestCompactHashSet:
+
+    @allure.title("Inserts and lookups survive every resize")
+    def test_resize(self):
+        values = CompactHashSet(capacity=2)
+        initial_slots = len(values._slots)
+        for i in range(5000):
+            assert values.add(f"lead{i}@example.test")
+            # Each power of two is a resize boundary: everything added so far must still be found
+            if i & (i + 1) == 0:
+                assert all(f"lead{j}@example.test" in values for j in range(i + 1))
+        assert len(values) == 5000
+        assert len(values._slots) > initial_slots
+        assert len(values) * 2 <= len(values._slots)
+        assert not values.add("lead4999@example.test")
+        assert "lead5000@example.test" not in values
+
+    @allure.title("A fingerprint collision makes the generator draw a new email")
+    def test_collision_regenerates(self, monkeypatch):
+        expected = list(generate_leads(2, seed=11))
+        first, second = expected[0]["email"], expected[1]["email"]
+        fingerprint = CompactHashSet._fingerprint
+        # Give the second lead's email the first one's fingerprint
+        monkeypatch.setattr(CompactHashSet, "_fingerprint",
+                            staticmethod(lambda value: fingerprint(first if value == second else value)))
+
+        values = CompactHashSet()
+        assert values.add(first)
+        assert second in values and not values.add(second)
+
+        leads = list(generate_leads(2, seed=11))
+        assert leads[0] == expected[0]
+        assert leads[1]["email"] not in (first, second)
+        assert leads[1]["first_name"] == expected[1]["first_name"]
+
+    @allure.title("A --count dataset has unique emails and phone numbers")
+    def test_generated_dataset_unique(self, tmp_path):
+        output = tmp_path / "leads.jsonl"
+        subprocess.run([sys.executable, "-m", "utils.lead_dataset", "--count", "20000", "--seed", "5",
+                        "--output", str(output)], check=True, cwd=get_project_root(), capture_output=True)
+        leads = list(iter_jsonl(output))
+        assert len(leads) == 20000
+        assert len({lead["email"] for lead in leads}) == 20000
+        assert len({lead["phone_number"] for lead in leads}) == 20000
+        assert all(len(lead["phone_number"]) == 10 and lead["phone_number"][0] not in "01" for lead in leads)
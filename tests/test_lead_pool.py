@@ -0,0 +1,87 @@
+import threading
+
+import allure
+import pytest
+
+from utils import lead_pool
+from utils.lead_pool import LeadPool
+
+
+def make_leads(count):
+    return [{"email": f"lead{i}@example.test", "phone_number": f"555{i:07d}"} for i in range(count)]
+
+
+@pytest.fixture
+def pool_path(tmp_path):
+    return tmp_path / "pool.sqlite3"
+
+
+@allure.suite("Test data")
+@allure.feature("Shared lead pool")
+class TestLeadPool:
+
+    @allure.title("Duplicate emails or phone numbers are not added twice")
+    def test_add_skips_duplicates(self, pool_path):
+        pool = LeadPool(pool_path)
+        assert pool.add(make_leads(3)) == 3
+        assert pool.add(make_leads(4)) == 1
+        assert pool.stats() == {"free": 4}
+
+    @allure.title("Concurrent leases from separate connections never share a lead")
+    def test_concurrent_leases_unique(self, pool_path):
+        LeadPool(pool_path).add(make_leads(60))
+        leased, errors = [], []
+        start = threading.Barrier(6)
+
+        def worker(owner):
+            pool = LeadPool(pool_path)  # every lease opens its own SQLite connection
+            start.wait()
+            while True:
+                try:
+                    leased.append(pool.lease(owner).id)
+                except RuntimeError:
+                    return
+                except Exception as e:
+                    errors.append(e)
+                    return
+
+        threads = [threading.Thread(target=worker, args=(f"worker-{i}",)) for i in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert errors == []
+        assert len(leased) == 60
+        assert len(set(leased)) == 60
+        assert LeadPool(pool_path).stats() == {"leased": 60}
+
+    @allure.title("Expired leases are reclaimed after the TTL; consumed leads never are")
+    def test_expired_lease_reclaimed(self, pool_path, monkeypatch):
+        now = [1_000_000.0]
+        monkeypatch.setattr(lead_pool.time, "time", lambda: now[0])
+        pool = LeadPool(pool_path, lease_ttl=60)
+        pool.add(make_leads(2))
+
+        crashed = pool.lease("crashed-worker")
+        used = pool.lease("finished-worker")
+        pool.consume(used.id)
+        with pytest.raises(RuntimeError, match="no free leads"):
+            pool.lease("late-worker")
+
+        now[0] += 59
+        with pytest.raises(RuntimeError, match="no free leads"):
+            pool.lease("late-worker")
+
+        now[0] += 2
+        reclaimed = pool.lease("late-worker")
+        assert reclaimed.id == crashed.id and reclaimed.data == crashed.data
+        assert pool.stats() == {"leased": 1, "consumed": 1}
+
+    @allure.title("A released lead is leased again")
+    def test_release(self, pool_path):
+        pool = LeadPool(pool_path)
+        pool.add(make_leads(1))
+        lease = pool.lease()
+        pool.release(lease.id)
+        assert pool.lease().id == lease.id
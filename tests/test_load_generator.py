@@ -0,0 +1,138 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import allure
+import pytest
+
+from utils.load_generator import LeadResult, LoadGenerator, build_report
+from utils.stats import percentile, summarize
+
+STUB_LEAD = {"firstname": "Load", "lastname": "Test", "email": "load.test@example.test", "phone": "5550100"}
+
+
+def lead_result(index, started, finished, ok=True, stages=None, failed_stage=None):
+    return LeadResult(index=index, scheduled_at=started, started_at=started, finished_at=finished, ok=ok,
+                      failed_stage=failed_stage, error=None if ok else "boom", stage_durations=stages or {})
+
+
+class StubFunnelHandler(BaseHTTPRequestHandler):
+    """Serves a stub landing page; every second page load drops the connection so that lead fails."""
+
+    requests = 0
+    lock = threading.Lock()
+
+    def do_GET(self):
+        if self.path != "/":
+            self.send_error(404)
+            return
+        with self.lock:
+            type(self).requests += 1
+            drop = type(self).requests % 2 == 0
+        if drop:
+            self.close_connection = True
+            return
+        body = b"<!doctype html><title>College Bridge stub</title><form><input name=email></form>"
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_funnel():
+    StubFunnelHandler.requests = 0
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubFunnelHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/"
+    server.shutdown()
+    server.server_close()
+
+
+@allure.suite("Load generation")
+@allure.feature("Load report maths")
+class TestLoadReport:
+
+    @allure.title("Percentiles interpolate linearly between ranks")
+    def test_percentile(self):
+        assert percentile([], 50) is None
+        assert percentile([7], 99) == 7
+        assert percentile([1, 2, 3, 4], 50) == 2.5
+        assert percentile([4, 1, 3, 2], 100) == 4
+        assert percentile(range(1, 101), 95) == pytest.approx(95.05)
+
+    @allure.title("summarize reports count, mean, max and percentiles")
+    def test_summarize(self):
+        assert summarize([]) == {"count": 0}
+        summary = summarize([1, 2, 3, 4], percentiles=(50, 90))
+        assert summary == {"count": 4, "mean": 2.5, "max": 4, "p50": 2.5, "p90": pytest.approx(3.7)}
+
+    @allure.title("build_report aggregates throughput, errors, windows and stage percentiles")
+    def test_build_report(self):
+        started = 100.0
+        results = [
+            lead_result(0, 100, 110, stages={"open": 1.0, "fill": 2.0}),
+            lead_result(1, 105, 130, stages={"open": 3.0, "fill": 4.0}),
+            lead_result(2, 120, 150, ok=False, stages={"open": 5.0}, failed_stage="fill"),
+            lead_result(3, 140, 160, stages={"open": 7.0, "fill": 6.0}),
+        ]
+        report = build_report(results, started, interval=30)
+
+        assert report["leads"] == 4
+        assert report["errors"] == 1
+        assert report["error_rate"] == 0.25
+        assert report["elapsed_s"] == 60
+        assert report["throughput_per_min"] == 4.0
+        assert report["failed_stages"] == {"fill": 1}
+        assert report["stages"]["open"]["count"] == 4
+        assert report["stages"]["open"]["p50"] == 4.0
+        assert report["stages"]["open"]["p90"] == pytest.approx(6.4)
+        assert report["stages"]["fill"]["max"] == 6.0
+
+        assert [w["start_s"] for w in report["windows"]] == [0, 30, 60]
+        # Leads land in the window they finished in: 10 s, then 30 s and 50 s, then 60 s
+        assert [w["completed"] for w in report["windows"]] == [1, 2, 1]
+        assert [w["errors"] for w in report["windows"]] == [0, 1, 0]
+        assert report["windows"][0]["throughput_per_min"] == 2.0
+        assert report["windows"][1]["error_rate"] == 0.5
+        assert report["windows"][1]["stages"]["open"]["count"] == 2
+
+    @allure.title("An empty run produces an empty report")
+    def test_build_report_empty(self):
+        report = build_report([], 0.0)
+        assert report["leads"] == 0 and report["throughput_per_min"] == 0.0 and report["windows"] == []
+
+
+@allure.suite("Load generation")
+@allure.feature("Offline load run")
+class TestLoadGeneratorOffline:
+
+    @allure.title("LoadGenerator drives leads against a local stub funnel")
+    def test_run_against_stub(self, local_chromium, stub_funnel):
+        generator = LoadGenerator(rate_per_minute=600, concurrency=1, base_url=stub_funnel, total_leads=4,
+                                  lead_source=lambda: dict(STUB_LEAD), stages=("open",))
+        results = generator.run()
+        report = build_report(results, generator.started_at, interval=60)
+
+        assert report["leads"] == 4
+        assert report["errors"] == 2
+        assert report["error_rate"] == 0.5
+        assert report["failed_stages"] == {"open": 2}
+        assert report["stages"]["open"]["count"] == 2
+        assert report["stages"]["open"]["p95"] <= report["stages"]["open"]["max"]
+        assert report["throughput_per_min"] > 0
+
+    @pytest.mark.parametrize("funnel_url", ["https://load.example.test", "https://load.example.test/",
+                                            "https://load.example.test//"])
+    @allure.title("A --funnel-url with or without a trailing slash joins the funnel paths cleanly")
+    def test_funnel_url_normalized(self, funnel_url):
+        from pages.college_bridge_pages2 import CollegeBridgeLandingPage
+
+        landing_page = CollegeBridgeLandingPage(None, test_data=dict(STUB_LEAD), funnel_url=funnel_url)
+        assert landing_page.test_urls["paths"][0] == "https://load.example.test/"
+        assert landing_page.test_urls["base_url"] + landing_page.test_urls["paths"][1] == \
+            "https://load.example.test/mindset-qualify/q1"
@@ -0,0 +1,80 @@
+from types import SimpleNamespace
+
+import allure
+import pytest
+
+from utils.metrics_store import MetricsStore
+from utils.stage_timings import StageTimings
+
+
+def record(store, durations, stage="TestFunnel::test_open", env="qa", outcome="passed"):
+    for duration in durations:
+        store.record_run("2026-01-01T00:00:00", 0, {"env": env},
+                         stages=[{"stage": stage, "duration_s": duration, "outcome": outcome}])
+
+
+@pytest.fixture
+def store(tmp_path):
+    return MetricsStore(tmp_path / "runs.sqlite3")
+
+
+@allure.suite("Run metrics")
+@allure.feature("Regression detection")
+class TestDetectRegressions:
+
+    @allure.title("A flat series is not flagged")
+    def test_flat(self, store):
+        record(store, [10.0] * 8)
+        record(store, [10.1, 9.9, 10.0, 10.05, 9.95, 10.02])
+        assert store.detect_regressions() == []
+
+    @allure.title("A clear step passes both the relative and the z-score threshold")
+    def test_step(self, store):
+        record(store, [10.0, 10.2, 9.9, 10.1, 9.8, 10.0, 15.0])
+        regressions = store.detect_regressions()
+        assert len(regressions) == 1
+        regression = regressions[0]
+        assert regression["kind"] == "stage" and regression["key"] == "TestFunnel::test_open"
+        assert regression["latest"] == 15.0 and regression["runs"] == 6
+        assert regression["baseline_mean"] == pytest.approx(10.0)
+        assert regression["z_score"] > 3
+
+    @allure.title("A significant but small increase stays under the relative threshold")
+    def test_below_min_increase(self, store):
+        record(store, [10.0, 10.01, 9.99, 10.0, 10.01, 9.99, 10.5])
+        assert store.detect_regressions() == []
+        assert len(store.detect_regressions(min_increase=0.01)) == 1
+
+    @allure.title("A large increase within the baseline's noise stays under the z-score threshold")
+    def test_within_noise(self, store):
+        record(store, [5.0, 15.0, 8.0, 12.0, 6.0, 14.0, 13.0])
+        assert store.detect_regressions() == []
+        assert len(store.detect_regressions(z_threshold=0.5)) == 1
+
+    @allure.title("Too few runs, failed stages and other environments are not compared")
+    def test_not_comparable(self, store):
+        record(store, [10.0, 10.1, 30.0])
+        assert store.detect_regressions() == []
+
+        record(store, [9.9, 10.0], env="qa")
+        record(store, [30.0], outcome="failed")
+        assert store.detect_regressions() == []
+
+        record(store, [40.0], env="staging")
+        assert store.detect_regressions(env="qa") == []
+        assert store.detect_regressions(env="staging") == []
+
+
+@allure.suite("Run metrics")
+@allure.feature("Stage timings")
+class TestStageTimings:
+
+    @allure.title("Only tests using the page fixture are recorded as stages")
+    def test_only_funnel_tests(self):
+        items = [SimpleNamespace(nodeid="tests/test_funnel.py::TestFunnel::test_open", fixturenames=["setup", "page"]),
+                 SimpleNamespace(nodeid="tests/test_soak.py::TestSoak::test_flat", fixturenames=[])]
+        timings = StageTimings()
+        timings.select(items)
+        for item in items:
+            timings.record(SimpleNamespace(nodeid=item.nodeid, duration=1.5, outcome="passed"))
+        assert [stage["stage"] for stage in timings.stages] == ["TestFunnel::test_open"]
@@ -0,0 +1,141 @@
+import json
+
+import allure
+import pytest
+
+from utils.payment_stub import PaymentStub, StubHits, load_stub_config, parse_mode
+
+SHOP = "https://shop.example.test/"
+
+
+class FakeRequest:
+    def __init__(self, method, url="https://shop.example.test/api/v1/checkout"):
+        self.method = method
+        self.url = url
+
+
+class FakeRoute:
+    def __init__(self):
+        self.fulfilled = None
+        self.fell_back = False
+
+    def fulfill(self, **kwargs):
+        self.fulfilled = kwargs
+
+    def fallback(self):
+        self.fell_back = True
+
+
+class FakeContext:
+    def __init__(self):
+        self.scripts = []
+        self.routes = []
+
+    def add_init_script(self, script):
+        self.scripts.append(script)
+
+    def route(self, pattern, handler):
+        self.routes.append(pattern)
+
+
+@allure.suite("Payment stub")
+@allure.feature("Stub configuration")
+class TestPaymentStub:
+
+    @pytest.mark.parametrize("mode, expected", [
+        (None, None), ("off", None), (" OFF ", None), ("success", ("success", 0)), ("Decline", ("decline", 0)),
+        ("delay:250", ("success", 250)), ("delay:-5", ("success", 0)),
+    ])
+    @allure.title("Stub modes parse into a response and a delay")
+    def test_parse_mode(self, mode, expected):
+        assert parse_mode(mode) == expected
+
+    @pytest.mark.parametrize("mode", ["delay", "delay:soon", "approve"])
+    @allure.title("Unknown stub modes are rejected")
+    def test_parse_mode_invalid(self, mode):
+        with pytest.raises(ValueError, match="Unsupported payment stub mode"):
+            parse_mode(mode)
+
+    @pytest.mark.parametrize("url, matched", [
+        ("https://shop.example.test/api/v1/checkout", True),
+        ("https://shop.example.test/api/orders/42", True),
+        ("https://shop.example.test/payments?step=1", True),
+        ("https://shop.example.test/charge", True),
+        ("https://api.stripe.com/v1/payment_intents", True),
+        ("https://shop.example.test/checkout-guide.html", False),
+        ("https://shop.example.test/api/programs", False),
+        ("https://cdn.example.test/api.stripe.com/logo.png", False),
+    ])
+    @allure.title("Only payment URLs match the configured patterns")
+    def test_url_patterns(self, url, matched):
+        assert bool(PaymentStub("success").pattern.search(url)) is matched
+
+    @allure.title("Matching methods are fulfilled with the configured response; others fall through")
+    def test_method_matching(self):
+        stub, hits = PaymentStub("decline"), StubHits()
+        route = FakeRoute()
+        stub._handle(route, FakeRequest("GET"), hits)
+        assert route.fell_back and route.fulfilled is None and hits.hits == 0
+
+        route = FakeRoute()
+        stub._handle(route, FakeRequest("put"), hits)
+        decline = load_stub_config()["responses"]["decline"]
+        assert route.fulfilled["status"] == 402
+        assert json.loads(route.fulfilled["body"]) == decline["body"]
+        assert hits.hits == 1 and hits.urls == ["https://shop.example.test/api/v1/checkout"]
+
+    @allure.title("Only a delay mode installs the in-page delay")
+    def test_install(self):
+        context = FakeContext()
+        PaymentStub("success").install(context)
+        assert context.scripts == [] and len(context.routes) == 1
+
+        PaymentStub("delay:300").install(context)
+        assert len(context.scripts) == 1
+        assert '"delayMs": 300' in context.scripts[0] and '"methods": ["POST", "PUT"]' in context.scripts[0]
+
+    @allure.title("run_load builds its stub from --payment-stub-config like the pytest option")
+    def test_run_load_config(self, tmp_path):
+        from run_load import build_parser, payment_stub
+
+        config = load_stub_config()
+        config["url_patterns"] = [r"/custom-pay"]
+        config_path = tmp_path / "stub.json"
+        config_path.write_text(json.dumps(config))
+        args = build_parser().parse_args(["browser", "--rate", "60", "--leads", "1", "--payment-stub", "success",
+                                          "--payment-stub-config", str(config_path)])
+        stub = payment_stub(args)
+        assert stub.pattern.search("https://shop.example.test/custom-pay")
+        assert not stub.pattern.search("https://shop.example.test/api/v1/checkout")
+
+        args = build_parser().parse_args(["browser", "--rate", "60", "--leads", "1"])
+        assert payment_stub(args) is None
+
+    @allure.title("A delayed payment call is held in the page without blocking other requests")
+    def test_delay_in_browser(self, local_chromium):
+        context = local_chromium.new_context()
+        try:
+            context.route(SHOP + "**", lambda route, request: route.fulfill(
+                status=200, content_type="text/html", body="<p>shop</p>"))
+            hits = PaymentStub("delay:600").install(context)
+            page = context.new_page()
+            page.goto(SHOP)
+            timings = page.evaluate("""async () => {
+                const timed = async (promise) => { const t = performance.now(); await promise; return performance.now() - t; };
+                const [payment, other] = await Promise.all([
+                    timed(fetch("/api/v1/checkout", {method: "POST", body: "{}"})),
+                    timed(fetch("/page.html")),
+                ]);
+                const xhr = await timed(new Promise(resolve => {
+                    const request = new XMLHttpRequest();
+                    request.open("POST", "/payments");
+                    request.onload = () => resolve(request.status);
+                    request.send("{}");
+                }));
+                return {payment, other, xhr};
+            }""")
+            assert timings["payment"] >= 550 and timings["xhr"] >= 550
+            assert timings["other"] < 500
+            assert hits.hits == 2
+        finally:
+            context.close()
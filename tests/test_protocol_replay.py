@@ -0,0 +1,114 @@
+import json
+
+import allure
+import pytest
+
+from utils.protocol_replay import capture_file, correlate_calls, render, templatize_call
+
+LEAD = {"email": "ann.lee+1@example.test", "first_name": "Ann", "last_name": "Lee", "phone_number": "5551234567",
+        "zip_code": "12345", "program_of_interest": "Data Science"}
+
+
+def recorded_call(url, body=None, response_json=None):
+    return {"method": "POST", "url": url, "headers": {"content-type": "application/json"}, "body": body,
+            "status": 200, "latency_s": 0.1, "response_json": response_json}
+
+
+@allure.suite("Protocol replay")
+@allure.feature("Capture templating")
+class TestTemplatizeCall:
+
+    @allure.title("Whole JSON values and query parameters become lead placeholders")
+    def test_lead_values(self):
+        body = json.dumps({"first_name": "Ann", "last_name": "Lee", "email": LEAD["email"], "zip": "12345",
+                           "program": "Data Science"})
+        call = templatize_call(recorded_call(
+            "https://api.example.test/leads?email=ann.lee%2B1%40example.test&program=Data+Science", body), LEAD)
+        assert call["url"] == ("https://api.example.test/leads?email={{email|url}}"
+                               "&program={{program_of_interest|form}}")
+        assert json.loads(call["body"]) == {
+            "first_name": "{{first_name}}", "last_name": "{{last_name}}", "email": "{{email}}",
+            "zip": "{{zip_code}}", "program": "{{program_of_interest}}"}
+
+    @allure.title("Lead values inside longer words, numbers or other values are left alone")
+    def test_token_boundaries(self):
+        body = json.dumps({"campaign": "Annual", "order": "A123456", "phone": "15551234567", "tag": "Leeds",
+                           "zip": "12345"})
+        call = templatize_call(recorded_call("https://api.example.test/leads?ref=Anne&page=123450", body), LEAD)
+        assert call["url"] == "https://api.example.test/leads?ref=Anne&page=123450"
+        assert json.loads(call["body"]) == {"campaign": "Annual", "order": "A123456", "phone": "15551234567",
+                                            "tag": "Leeds", "zip": "{{zip_code}}"}
+
+
+@allure.suite("Protocol replay")
+@allure.feature("Capture templating")
+class TestCorrelateCalls:
+
+    @allure.title("Ids from earlier responses become step placeholders in later calls")
+    def test_correlate(self):
+        calls = [
+            recorded_call("https://api.example.test/leads", "{}", {"lead_id": "8f3a2", "status": "new", "id": 7}),
+            recorded_call("https://api.example.test/leads/8f3a2/steps?next=8f3a21", json.dumps({"lead": "8f3a2"})),
+        ]
+        correlate_calls(calls)
+        assert calls[0]["extract"] == ["lead_id"]  # short ids are too likely to appear by chance
+        assert "response_json" not in calls[0] and "response_json" not in calls[1]
+        assert calls[1]["url"] == "https://api.example.test/leads/{{step0.lead_id}}/steps?next=8f3a21"
+        assert json.loads(calls[1]["body"]) == {"lead": "{{step0.lead_id}}"}
+
+    @allure.title("An id never rewrites a query key or an existing placeholder")
+    def test_placeholders_kept(self):
+        calls = [
+            recorded_call("https://api.example.test/start", None, {"session_token": "email"}),
+            recorded_call("https://api.example.test/leads?email={{email|url}}&s=email", None),
+        ]
+        correlate_calls(calls)
+        assert calls[1]["url"] == "https://api.example.test/leads?email={{email|url}}&s={{step0.session_token}}"
+
+    @allure.title("Responses that are not JSON objects extract nothing")
+    def test_no_extract(self):
+        calls = [recorded_call("https://api.example.test/a", None, ["12345"]),
+                 recorded_call("https://api.example.test/a/12345")]
+        correlate_calls(calls)
+        assert "extract" not in calls[0]
+        assert calls[1]["url"] == "https://api.example.test/a/12345"
+
+
+@allure.suite("Protocol replay")
+@allure.feature("Replay rendering")
+class TestRender:
+
+    @pytest.mark.parametrize("template, json_body, expected", [
+        ("/leads?email={{email|url}}", False, "/leads?email=o%27neil%2B2%40example.test"),
+        ("name={{first_name|form}}&ok=1", False, "name=Mary+Jo&ok=1"),
+        ('{"note": "{{note}}"}', True, '{"note": "say \\"hi\\""}'),
+        ('{"step": "{{step0.lead_id}}"}', False, '{"step": "42"}'),
+    ])
+    @allure.title("Placeholders are filled and encoded for URLs, forms and JSON bodies")
+    def test_render(self, template, json_body, expected):
+        variables = {"email": "o'neil+2@example.test", "first_name": "Mary Jo", "note": 'say "hi"',
+                     "step0.lead_id": 42}
+        assert render(template, variables, json_body=json_body) == expected
+
+    @allure.title("A templatized call renders back to the recorded request")
+    def test_round_trip(self):
+        url = "https://api.example.test/leads?email=ann.lee%2B1%40example.test&program=Data+Science"
+        body = json.dumps({"first_name": "Ann", "phone": "5551234567"})
+        call = templatize_call(recorded_call(url, body), LEAD)
+        assert render(call["url"], LEAD) == url
+        assert render(call["body"], LEAD, json_body=True) == body
+
+    @allure.title("Empty text renders as is")
+    def test_empty(self):
+        assert render(None, {}) is None and render("", {}) == ""
+
+
+@allure.suite("Protocol replay")
+@allure.feature("Capture templating")
+class TestCaptureFile:
+
+    @allure.title("Each test class gets its own capture file next to the --capture-api path")
+    def test_per_class(self, tmp_path):
+        assert capture_file(tmp_path / "funnel.json", TestCaptureFile) == \
+            tmp_path / "funnel.test_protocol_replay.TestCaptureFile.json"
+        assert capture_file("captures/funnel", TestRender).name == "funnel.test_protocol_replay.TestRender.json"
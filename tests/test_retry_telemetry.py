@@ -0,0 +1,95 @@
+import sqlite3
+import time
+
+import allure
+import pytest
+
+from utils.metrics_store import SCHEMA, MetricsStore
+from utils.retry_telemetry import AdaptivePolicy, RetryTelemetry
+
+HELPER, LOCATOR = "click_with_retry", "#next"
+
+
+def attempt(waited_ms, number=1, outcome="ok", locator=LOCATOR, overhead_ms=4000):
+    """A recorded attempt that spent waited_ms in its bounded wait and overhead_ms on everything else."""
+    return {"helper": HELPER, "locator": locator, "attempt": number, "duration_ms": waited_ms + overhead_ms,
+            "waited_ms": waited_ms, "timeout_ms": 5000, "wait_ms": 0, "outcome": outcome}
+
+
+def store_runs(db_path, *runs):
+    store = MetricsStore(db_path)
+    for attempts in runs:
+        store.record_run("2026-01-01T00:00:00", 0, {"env": "qa"}, attempts=attempts)
+    return store
+
+
+@allure.suite("Retry telemetry")
+@allure.feature("Adaptive timeouts")
+class TestAdaptivePolicy:
+
+    @allure.title("The timeout is the p99 of the bounded wait, not of the whole attempt")
+    def test_p99_of_wait(self):
+        policy = AdaptivePolicy([attempt(1000 + 10 * i) for i in range(101)])
+        # p99 of 1000..2000 in steps of 10 is 1990, times the 1.5 margin
+        assert policy.params(HELPER, LOCATOR, 5000, 5) == (2985, 2)
+
+    @allure.title("Attempt counts follow the p99 attempt number plus one spare, up to MAX_ATTEMPTS")
+    def test_attempt_percentile(self):
+        attempts = [attempt(1000) for _ in range(95)] + [attempt(1000, number=3) for _ in range(6)]
+        assert AdaptivePolicy(attempts).params(HELPER, LOCATOR, 5000, 5)[1] == 4
+        attempts = [attempt(1000, number=12) for _ in range(5)]
+        assert AdaptivePolicy(attempts).params(HELPER, LOCATOR, 5000, 5)[1] == AdaptivePolicy.MAX_ATTEMPTS
+
+    @pytest.mark.parametrize("waited_ms, expected", [(100, 1000), (30000, 45000), (90000, 60000)])
+    @allure.title("Learned timeouts are clamped between min_timeout_ms and max_timeout_ms")
+    def test_clamped(self, waited_ms, expected):
+        policy = AdaptivePolicy([attempt(waited_ms) for _ in range(5)])
+        assert policy.params(HELPER, LOCATOR, 5000, 5)[0] == expected
+
+    @allure.title("Failed, retried and too few successful attempts keep the caller's defaults")
+    def test_defaults(self):
+        attempts = ([attempt(200) for _ in range(4)] + [attempt(200, outcome="retry") for _ in range(10)]
+                    + [attempt(200, outcome="failed") for _ in range(10)])
+        policy = AdaptivePolicy(attempts)
+        assert policy.params(HELPER, LOCATOR, 5000, 5) == (5000, 5)
+        assert policy.params(HELPER, "#other", 7000, 3) == (7000, 3)
+
+    @allure.title("from_store learns from the last runs in the metrics database")
+    def test_from_store(self, tmp_path):
+        db_path = tmp_path / "runs.sqlite3"
+        store_runs(db_path, [attempt(50000) for _ in range(5)],
+                   [attempt(1000) for _ in range(3)], [attempt(2000) for _ in range(3)])
+        # p99 of the last two runs' 1000 and 2000 ms waits is 2000, times the 1.5 margin
+        assert AdaptivePolicy.from_store(db_path, last_runs=2).params(HELPER, LOCATOR, 5000, 5) == (3000, 2)
+        assert AdaptivePolicy.from_store(db_path, last_runs=3).params(HELPER, LOCATOR, 5000, 5)[0] == 60000
+        assert AdaptivePolicy.from_store(db_path, min_samples=7, last_runs=2).params(
+            HELPER, LOCATOR, 5000, 5) == (5000, 5)
+
+    @allure.title("Attempts stored without waited_ms are not learned from")
+    def test_legacy_rows(self, tmp_path):
+        db_path = tmp_path / "runs.sqlite3"
+        with sqlite3.connect(db_path) as connection:
+            connection.executescript(SCHEMA.replace(",\n    waited_ms REAL", ""))
+            connection.execute("INSERT INTO runs (started_at, finished_at) VALUES ('2026-01-01', '2026-01-01')")
+            connection.executemany("INSERT INTO retry_attempts VALUES (1, ?, ?, 1, 9000, 5000, 0, 'ok')",
+                                   [(HELPER, LOCATOR)] * 5)
+        store_runs(db_path, [attempt(1000) for _ in range(4)])
+        assert AdaptivePolicy.from_store(db_path).params(HELPER, LOCATOR, 5000, 5) == (5000, 5)
+        store_runs(db_path, [attempt(1000)])
+        assert AdaptivePolicy.from_store(db_path).params(HELPER, LOCATOR, 5000, 5) == (1500, 2)
+
+
+@allure.suite("Retry telemetry")
+@allure.feature("Attempt recording")
+class TestRetryTelemetry:
+
+    @allure.title("waited_ms defaults to the whole attempt and is kept apart from it when given")
+    def test_record(self):
+        telemetry = RetryTelemetry()
+        started = time.perf_counter() - 0.5
+        telemetry.record(HELPER, LOCATOR, 1, started, "ok", 5000)
+        telemetry.record(HELPER, LOCATOR, 2, started, "ok", 5000, waited_ms=120.0)
+        first, second = telemetry.attempts
+        assert first["waited_ms"] == first["duration_ms"] >= 500
+        assert second["waited_ms"] == 120.0 and second["duration_ms"] >= 500
+        assert telemetry.retry_counts() == {(HELPER, LOCATOR): 1}
@@ -0,0 +1,106 @@
+import os
+
+import allure
+import pytest
+
+import run_suite
+
+RUN_XML = """<?xml version="1.0" encoding="utf-8"?>
+<testsuite name="pytest" errors="0" failures="{failures}" skipped="0" tests="1" time="2.000">
+  <testcase classname="tests.test_funnel.TestFunnel" name="test_open" time="2.0">{failure}</testcase>
+</testsuite>
+"""
+
+
+def parse(*argv):
+    return run_suite.build_parser().parse_known_args(list(argv))
+
+
+@pytest.fixture
+def clean_environment(monkeypatch):
+    for name in ("ENV", "PREBUY", "DECISION"):
+        monkeypatch.delenv(name, raising=False)
+
+
+@pytest.fixture
+def fake_pytest(monkeypatch, tmp_path, clean_environment):
+    """Replace pytest runs with ones that write a JUnit file per run: exit codes pop from `exit_codes`."""
+    monkeypatch.setattr(run_suite, "JUNIT_DIR", tmp_path / "junit")
+    calls, exit_codes = [], []
+
+    def run_pytest(pytest_args, in_process):
+        calls.append((pytest_args, in_process))
+        exit_code = exit_codes.pop(0)
+        if exit_code != 4:  # a usage error writes no JUnit file
+            junit_path = next(arg for arg in pytest_args if arg.startswith("--junitxml="))[len("--junitxml="):]
+            with open(junit_path, "w") as f:
+                f.write(RUN_XML.format(failures=int(exit_code == 1), failure="<failure/>" if exit_code == 1 else ""))
+        return exit_code
+
+    monkeypatch.setattr(run_suite, "run_pytest", run_pytest)
+    return calls, exit_codes
+
+
+@allure.suite("Suite runner")
+@allure.feature("Command line")
+class TestRunSuite:
+
+    @allure.title("Runner options become pytest options; unknown arguments pass through")
+    def test_pytest_options(self):
+        args, extra = parse("--browser", "firefox", "--headless", "True", "--workers", "3", "--shard-index", "2",
+                            "--shard-total", "4", "--retries", "2", "--retry-delay", "1.5", "-k", "open")
+        assert run_suite.pytest_options(args) == [
+            "--test-browser=firefox", "--headless=True", "--dag-workers=3", "--shard-index=2", "--shard-total=4",
+            "--reruns=2", "--reruns-delay=1.5"]
+        assert extra == ["-k", "open"]
+
+    @allure.title("Defaults add no pytest options")
+    def test_defaults(self):
+        args, extra = parse()
+        assert run_suite.pytest_options(args) == [] and extra == []
+        assert args.repeat == 1 and args.workers == 0 and args.tests is None
+
+    @pytest.mark.parametrize("argv, message", [
+        (["--shard-index", "3", "--shard-total", "2"], "--shard-index must be between 1 and --shard-total"),
+        (["--shard-index", "0"], "--shard-index must be between 1 and --shard-total"),
+        (["--repeat", "0"], "--repeat must be at least 1"),
+        (["--decision", "LATER"], "invalid choice"),
+    ])
+    @allure.title("Invalid runner options are rejected before anything runs")
+    def test_invalid(self, argv, message, fake_pytest, capsys):
+        with pytest.raises(SystemExit) as exc_info:
+            run_suite.main(argv)
+        assert exc_info.value.code == 2
+        assert message in capsys.readouterr().err
+        assert fake_pytest[0] == []
+
+    @allure.title("Branch and environment options are exported for BaseConfig")
+    def test_apply_environment(self, clean_environment):
+        args, _ = parse("--env", "staging", "--decision", "SOON")
+        run_suite.apply_environment(args)
+        assert os.environ["ENV"] == "staging" and os.environ["DECISION"] == "SOON"
+        assert "PREBUY" not in os.environ
+
+    @allure.title("A single run keeps pytest's exit code and runs in process")
+    def test_single_run(self, fake_pytest):
+        calls, exit_codes = fake_pytest
+        exit_codes.append(5)
+        assert run_suite.main(["--tests", "tests/test_x.py"]) == 5
+        (pytest_args, in_process), = calls
+        assert in_process and pytest_args[0] == "tests/test_x.py" and "--clean-alluredir" in pytest_args
+        assert (run_suite.JUNIT_DIR / "results.xml").exists()
+
+    @allure.title("Repeats run in fresh processes, clean Allure once and fail on any failing run")
+    def test_repeat(self, fake_pytest, capsys):
+        calls, exit_codes = fake_pytest
+        exit_codes.extend([0, 1, 4])
+        assert run_suite.main(["--repeat", "3"]) == 4
+        assert [in_process for _, in_process in calls] == [False, False, False]
+        assert ["--clean-alluredir" in pytest_args for pytest_args, _ in calls] == [True, False, False]
+        assert [pytest_args[-1] for pytest_args, _ in calls] == [
+            f"--junitxml={run_suite.JUNIT_DIR / f'run-{run}.xml'}" for run in (1, 2, 3)]
+
+        output = capsys.readouterr().out
+        assert "❌ Run 3: exit code 4" in output
+        summary = next(line for line in output.splitlines() if line.startswith("tests.test_funnel.TestFunnel::"))
+        assert summary.split()[1:4] == ["1", "1", "0"]  # run 3 wrote no JUnit file
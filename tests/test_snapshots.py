@@ -0,0 +1,61 @@
+import os
+
+import allure
+
+from utils.snapshots import RUN_ID_ENV, StepSnapshots, session_run_id
+
+
+class FakePage:
+    def __init__(self, text):
+        self.text = text
+
+    def locator(self, selector):
+        return self
+
+    def aria_snapshot(self):
+        return self.text
+
+
+def snapshots(history_dir, run_id):
+    step_snapshots = StepSnapshots(history_dir)
+    step_snapshots.run_id = run_id
+    return step_snapshots
+
+
+@allure.suite("Step snapshots")
+@allure.feature("Run history")
+class TestStepSnapshots:
+
+    @allure.title("Workers of one run share its directory and diff against the previous session only")
+    def test_workers_share_run(self, tmp_path):
+        snapshots(tmp_path, "2026-01-01_09-00-00_100").capture(FakePage("- heading: Welcome"), "test_open")
+
+        first = snapshots(tmp_path, "2026-01-02_09-00-00_200")
+        first.capture(FakePage("- heading: Hello"), "test_open")
+        second = snapshots(tmp_path, "2026-01-02_09-00-00_200")
+        _, diff = second.capture(FakePage("- heading: Hello"), "test_apply")
+
+        assert first.run_dir == second.run_dir
+        assert first.previous_dir.name == second.previous_dir.name == "2026-01-01_09-00-00_100"
+        assert diff is None
+        assert sorted(p.name for p in first.run_dir.iterdir()) == ["test_apply.txt.gz", "test_open.txt.gz"]
+
+        _, diff = snapshots(tmp_path, "2026-01-03_09-00-00_300").capture(FakePage("- heading: Hi"), "test_open")
+        assert "2026-01-02_09-00-00_200/test_open" in diff and "+- heading: Hi" in diff
+
+    @allure.title("Only keep_runs run directories are kept")
+    def test_prune(self, tmp_path):
+        for day in range(1, 5):
+            step_snapshots = snapshots(tmp_path, f"2026-01-0{day}_09-00-00_1")
+            step_snapshots.keep_runs = 2
+            step_snapshots.capture(FakePage("- text"), "test_open")
+        assert sorted(d.name for d in tmp_path.iterdir()) == ["2026-01-03_09-00-00_1", "2026-01-04_09-00-00_1"]
+
+    @allure.title("The session run id is inherited from the environment")
+    def test_session_run_id(self, monkeypatch):
+        monkeypatch.setenv(RUN_ID_ENV, "2026-01-02_09-00-00_200")
+        assert session_run_id() == "2026-01-02_09-00-00_200"
+        monkeypatch.delenv(RUN_ID_ENV)
+        run_id = session_run_id()
+        assert run_id == session_run_id()
+        assert run_id.endswith(f"_{os.getpid()}")
@@ -0,0 +1,88 @@
+import allure
+import pytest
+
+from utils.soak import drift_report
+from utils.stats import linear_trend
+
+HOURS = list(range(8))
+NOISY = [10, 22, 8, 21, 9, 20, 12, 22]  # upward fit of ~37% but the slope is under one standard error
+
+
+def soak_series(durations, error_rates=None, memory_available=None):
+    """Hourly soak iteration points shaped like SoakRunner's series."""
+    return [{"elapsed_s": hour * 3600, "exit_code": 0, "duration_s": duration,
+             "error_rate": error_rates[hour] if error_rates else 0.0,
+             "host_memory_available_mb": memory_available[hour] if memory_available else None,
+             "stages": {"TestFunnel::test_open": duration / 2}, "memory": {}}
+            for hour, duration in zip(HOURS, durations)]
+
+
+@allure.suite("Soak testing")
+@allure.feature("Linear trend")
+class TestLinearTrend:
+
+    @allure.title("An exact line has its slope, intercept and zero standard error")
+    def test_exact_line(self):
+        trend = linear_trend(HOURS, [3 + 2 * x for x in HOURS])
+        assert trend["slope"] == pytest.approx(2) and trend["intercept"] == pytest.approx(3)
+        assert trend["r2"] == pytest.approx(1) and trend["stderr"] == pytest.approx(0)
+
+    @allure.title("The slope's standard error follows the residual scatter")
+    def test_stderr(self):
+        trend = linear_trend([0, 1, 2, 3], [0, 2, 1, 3])
+        assert trend["slope"] == pytest.approx(0.8)
+        # residual sum of squares 1.8 over n - 2 = 2 degrees of freedom and sxx = 5
+        assert trend["stderr"] == pytest.approx((1.8 / 2 / 5) ** 0.5)
+
+    @allure.title("Fewer than three points or constant x give no trend")
+    def test_insufficient(self):
+        assert linear_trend([0, 1], [1, 2]) is None
+        assert linear_trend([1, 1, 1], [1, 2, 3]) is None
+
+
+@allure.suite("Soak testing")
+@allure.feature("Drift report")
+class TestDriftReport:
+
+    @allure.title("A flat soak is stable")
+    def test_flat(self):
+        report = drift_report(soak_series([60.0] * 8))
+        assert report["drifting"] == []
+        assert report["metrics"]["iteration_s"]["status"] == "stable"
+        assert report["metrics"]["iteration_s"]["drift"] == pytest.approx(0)
+        assert report["iterations"] == 8 and report["hours"] == 7
+
+    @allure.title("A clear upward trend beyond the threshold and two standard errors is drift")
+    def test_clear_rise(self):
+        report = drift_report(soak_series([60 + 3 * hour + (0.5 if hour % 2 else -0.5) for hour in HOURS]))
+        entry = report["metrics"]["iteration_s"]
+        assert entry["status"] == "rising"
+        assert entry["drift"] > 0.2 and entry["t"] > 2
+        assert {"iteration_s", "stage TestFunnel::test_open"} <= set(report["drifting"])
+
+    @allure.title("A noisy slope within two standard errors is not reported as drift")
+    def test_noisy_slope(self):
+        trend = linear_trend(HOURS, NOISY)
+        assert trend["slope"] * 7 / trend["intercept"] > 0.2  # past the relative threshold on its own
+        report = drift_report(soak_series(NOISY))
+        entry = report["metrics"]["iteration_s"]
+        assert abs(entry["t"]) < 2
+        assert entry["status"] == "stable"
+        assert report["drifting"] == []
+
+    @allure.title("Error rate drifts in absolute points; falling available memory is the bad direction")
+    def test_error_rate_and_memory(self):
+        report = drift_report(soak_series(
+            [60.0] * 8,
+            error_rates=[0.0, 0.05, 0.1, 0.15, 0.2, 0.25, 0.3, 0.36],
+            memory_available=[8000 - 700 * hour for hour in HOURS],
+        ))
+        assert report["metrics"]["error_rate"]["drift"] == pytest.approx(0.35, abs=0.02)
+        assert report["metrics"]["host_memory_available_mb"]["status"] == "falling"
+        assert set(report["drifting"]) == {"error_rate", "host_memory_available_mb"}
+
+    @allure.title("Too few iterations are insufficient data, not drift")
+    def test_insufficient(self):
+        report = drift_report(soak_series([60.0, 120.0]))
+        assert report["metrics"]["iteration_s"]["status"] == "insufficient data"
+        assert report["drifting"] == []
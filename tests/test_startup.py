@@ -0,0 +1,67 @@
+import os
+import re
+import subprocess
+import sys
+
+import allure
+import pytest
+
+from config.base_config import BaseConfig
+
+# Cumulative import time allowed for the project's own modules, on top of pytest and allure
+IMPORT_TIME_BUDGET_MS = float(os.getenv("IMPORT_TIME_BUDGET_MS", "500"))
+PROJECT_MODULES = ("conftest", "pages.college_bridge_pages", "pages.college_bridge_pages2", "run_suite")
+# Heavy or side-effecting modules that must only load once a test actually needs them
+LAZY_MODULES = ("playwright", "requests", "yaml")
+IMPORT_TIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def run_python(*args):
+    return subprocess.run(
+        [sys.executable, *args], cwd=BaseConfig.BASE_DIR, capture_output=True, text=True, timeout=120
+    )
+
+
+@allure.suite("Startup")
+@allure.feature("Fast import and startup")
+class TestStartup:
+
+    @allure.title("Project imports stay within the cold-start budget")
+    def test_import_time_budget(self):
+        preloaded = "import pytest, allure, allure_pytest.plugin"
+        result = run_python("-X", "importtime", "-c",
+                            f"{preloaded}; " + "; ".join(f"import {m}" for m in PROJECT_MODULES))
+        assert result.returncode == 0, result.stderr
+
+        top_level_us = 0
+        imported = set()
+        for line in result.stderr.splitlines():
+            match = IMPORT_TIME_LINE.match(line)
+            if not match:
+                continue
+            _, cumulative_us, indent, module = match.groups()
+            imported.add(module.split(".")[0])
+            if len(indent) == 1 and module in PROJECT_MODULES:
+                top_level_us += int(cumulative_us)
+
+        assert top_level_us > 0, "No import timings found for the project modules"
+        eager = sorted(imported.intersection(LAZY_MODULES))
+        assert not eager, f"Modules imported eagerly at startup: {eager}"
+        assert top_level_us / 1000 <= IMPORT_TIME_BUDGET_MS, \
+            f"Import time {top_level_us / 1000:.1f} ms exceeds budget of {IMPORT_TIME_BUDGET_MS:.0f} ms"
+
+    @allure.title("run_suite.py --help neither runs tests nor touches the file system")
+    def test_run_suite_help(self):
+        result = run_python("run_suite.py", "--help")
+        assert result.returncode == 0, result.stderr
+        assert "usage" in result.stdout
+
+    @pytest.mark.parametrize("module", PROJECT_MODULES)
+    @allure.title("Importing a project module does no I/O")
+    def test_import_has_no_side_effects(self, module):
+        test_data_file = BaseConfig.BASE_DIR / "test_data" / "college_bridge_test_data.json"
+        before = test_data_file.stat().st_mtime_ns
+        result = run_python("-c", f"import {module}")
+        assert result.returncode == 0, result.stderr
+        assert result.stdout == "", f"Import of {module} printed: {result.stdout}"
+        assert test_data_file.stat().st_mtime_ns == before, f"Import of {module} rewrote the test data"
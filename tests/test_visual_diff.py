@@ -0,0 +1,98 @@
+import json
+
+import allure
+import numpy as np
+import pytest
+from PIL import Image
+
+from utils.visual_diff import approve, compare_images, hash_distance, thumbnail_dhash
+
+SCREENSHOT = "landing_page_opened_2026-01-01_12-00-00.png"
+
+
+def save_png(path, pixels):
+    Image.fromarray(pixels.astype(np.uint8)).save(path)
+    return path
+
+
+@pytest.fixture
+def screens(tmp_path):
+    """An approved baseline plus a near-identical and a visibly changed screenshot of the same step."""
+    rng = np.random.default_rng(7)
+    blocks = rng.integers(0, 256, size=(8, 9, 3))
+    base = np.kron(blocks, np.ones((80, 80, 1)))  # 640x720 RGB of large flat blocks
+
+    near = base.copy()
+    near[::37, ::41] = np.clip(near[::37, ::41] + 3, 0, 255)  # sub-threshold noise on a few pixels
+    changed = base.copy()
+    changed[:320, :360] = 255 - changed[:320, :360]
+
+    screenshot_dir, baseline_dir = tmp_path / "screenshots", tmp_path / "baselines"
+    screenshot_dir.mkdir()
+    save_png(screenshot_dir / SCREENSHOT, base)
+    approve(screenshot_dir, baseline_dir)
+    return {
+        "baseline": baseline_dir / "landing_page_opened.png",
+        "identical": screenshot_dir / SCREENSHOT,
+        "near": save_png(tmp_path / "near.png", near),
+        "changed": save_png(tmp_path / "changed.png", changed),
+        "resized": save_png(tmp_path / "resized.png", base[:600]),
+        "diff_dir": tmp_path / "diff",
+    }
+
+
+@allure.suite("Visual regression")
+@allure.feature("Screenshot comparison")
+class TestCompareImages:
+
+    @allure.title("approve stores the digest, reduced-decode dHash and size next to the baseline")
+    def test_approve_meta(self, screens):
+        meta = json.loads(screens["baseline"].with_suffix(".json").read_text())
+        assert meta["size"] == [720, 640]
+        with Image.open(screens["baseline"]) as image:
+            assert meta["dhash"] == thumbnail_dhash(image)
+
+    @allure.title("Identical bytes match on the digest alone")
+    def test_identical(self, screens):
+        result = compare_images("step", screens["baseline"], screens["identical"])
+        assert result["status"] == "identical"
+
+    @allure.title("A near-identical screenshot has the baseline's dHash and passes the pixel diff")
+    def test_near_identical(self, screens):
+        result = compare_images("step", screens["baseline"], screens["near"], screens["diff_dir"])
+        assert result["status"] == "match"
+        assert result["hash_distance"] == 0
+        assert result["diff_ratio"] == 0.0
+
+    @allure.title("With trust_phash an equal dHash matches without decoding the baseline")
+    def test_trust_phash_skips_baseline(self, screens):
+        # Only the stored meta is consulted: a corrupt baseline image would fail any decode
+        screens["baseline"].write_bytes(b"not a png")
+        result = compare_images("step", screens["baseline"], screens["near"], trust_phash=True)
+        assert result["status"] == "match"
+        assert result["diff_ratio"] is None
+
+    @allure.title("A changed screenshot moves the dHash and fails the pixel diff with a diff image")
+    def test_changed(self, screens):
+        result = compare_images("step", screens["baseline"], screens["changed"], screens["diff_dir"],
+                                trust_phash=True)
+        assert result["status"] == "changed"
+        assert result["hash_distance"] > 0
+        assert result["diff_ratio"] == pytest.approx(0.25)
+        assert (screens["diff_dir"] / "step_diff.png").exists()
+
+    @allure.title("A size change is reported from the stored baseline size")
+    def test_size_changed(self, screens):
+        result = compare_images("step", screens["baseline"], screens["resized"])
+        assert result["status"] == "size_changed"
+        assert result["baseline_size"] == (720, 640) and result["actual_size"] == (720, 600)
+
+    @allure.title("Baselines without stored meta fall back to decoding the baseline")
+    def test_without_meta(self, screens):
+        screens["baseline"].with_suffix(".json").unlink()
+        assert compare_images("step", screens["baseline"], screens["near"])["status"] == "match"
+        assert compare_images("step", screens["baseline"], screens["changed"])["status"] == "changed"
+
+    @allure.title("Hash distance counts differing bits")
+    def test_hash_distance(self):
+        assert hash_distance(0b1011, 0b0001) == 2
@@ -0,0 +1,165 @@
+import hashlib
+import json
+import os
+import re
+import tempfile
+import time
+from dataclasses import dataclass, asdict
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from urllib.parse import urlparse
+
+from utils.logger import setup_logger
+
+# Static assets worth sharing between contexts; everything else goes to the network untouched
+STATIC_ASSET_PATTERN = re.compile(r"\.(js|mjs|css|woff2?|ttf|otf|png|jpe?g|gif|svg|webp|ico)(\?.*)?$", re.IGNORECASE)
+# The stored body is already decoded, so these no longer describe it
+DROPPED_HEADERS = ("content-encoding", "content-length", "transfer-encoding")
+DEFAULT_MAX_AGE = 7 * 24 * 3600  # seconds
+# A hex content hash in the file name (main.3f9a1c2b.js, chunk-0a1b2c3d4e.css) changes with the content
+HASHED_ASSET_PATTERN = re.compile(r"[.\-_][0-9a-f]{8,}\.\w+$", re.IGNORECASE)
+MAX_AGE_PATTERN = re.compile(r"(?:^|,)\s*max-age\s*=\s*\"?(\d+)")
+
+
+def freshness_lifetime(url, headers, now, max_age=DEFAULT_MAX_AGE):
+    """Seconds a stored response may be served without revalidation, capped at max_age.
+
+    Follows Cache-Control max-age/no-cache and Expires; a response without either is fresh
+    only when its URL is content-hashed, and must otherwise be revalidated on every use.
+    """
+    headers = {k.lower(): v for k, v in headers.items()}
+    cache_control = headers.get("cache-control", "").lower()
+    if "no-cache" in cache_control:
+        return 0
+    match = MAX_AGE_PATTERN.search(cache_control)
+    if match:
+        return min(int(match.group(1)), max_age)
+    if "expires" in headers:
+        try:
+            expires = parsedate_to_datetime(headers["expires"]).timestamp()
+        except (TypeError, ValueError):
+            return 0  # an invalid Expires means already expired
+        return min(max(expires - now, 0), max_age)
+    if "immutable" in cache_control or HASHED_ASSET_PATTERN.search(urlparse(url).path):
+        return max_age
+    return 0
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    revalidated: int = 0
+    misses: int = 0
+    bytes_from_cache: int = 0
+    bytes_downloaded: int = 0
+    time_saved_ms: float = 0.0
+    download_ms: float = 0.0
+
+    def as_dict(self):
+        return asdict(self)
+
+
+class StaticAssetCache:
+    """On-disk cache for static JS/CSS/font/image responses, shared by every context and run.
+
+    Playwright contexts start with an empty HTTP cache, and request routing disables the
+    browser cache altogether, so static bundles are served from disk through context.route.
+    A stored response is served while fresh by its caching headers (see freshness_lifetime);
+    once stale it is revalidated with its ETag/Last-Modified and served again on a 304.
+    """
+
+    def __init__(self, cache_dir, max_age=DEFAULT_MAX_AGE):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_age = max_age
+        self.logger = setup_logger(self.__class__.__name__)
+
+    def install(self, context):
+        """Route static assets of the context through the cache and return its CacheStats."""
+        stats = CacheStats()
+        context.route(STATIC_ASSET_PATTERN, lambda route, request: self._handle(route, request, stats))
+        return stats
+
+    def _paths(self, url):
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return self.cache_dir / f"{key}.body", self.cache_dir / f"{key}.json"
+
+    def _read(self, url):
+        body_path, meta_path = self._paths(url)
+        try:
+            with open(meta_path, "r") as f:
+                meta = json.load(f)
+            return meta, body_path.read_bytes()
+        except (OSError, ValueError):
+            return None, None
+
+    def _write(self, url, meta, body):
+        body_path, meta_path = self._paths(url)
+        meta = {**meta, "url": url, "size": len(body),
+                "expires_at": meta["stored_at"] + freshness_lifetime(url, meta["headers"], meta["stored_at"],
+                                                                       self.max_age)}
+        # Unique temp files, as several threads of one worker may store the same asset at once
+        with tempfile.NamedTemporaryFile(dir=self.cache_dir, suffix=".tmp", delete=False) as body_tmp:
+            body_tmp.write(body)
+        with tempfile.NamedTemporaryFile("w", dir=self.cache_dir, suffix=".tmp", delete=False) as meta_tmp:
+            json.dump(meta, meta_tmp)
+        # Body first, so a reader never sees metadata without its body
+        os.replace(body_tmp.name, body_path)
+        os.replace(meta_tmp.name, meta_path)
+
+    def _store(self, url, meta, body):
+        try:
+            self._write(url, meta, body)
+        except OSError as e:
+            self.logger.warning(f"Could not cache {url}: {e}")
+
+    @staticmethod
+    def _validators(meta):
+        """Conditional request headers for a stored response, or {} if it has no ETag/Last-Modified."""
+        headers = {k.lower(): v for k, v in meta["headers"].items()}
+        validators = {}
+        if "etag" in headers:
+            validators["if-none-match"] = headers["etag"]
+        if "last-modified" in headers:
+            validators["if-modified-since"] = headers["last-modified"]
+        return validators
+
+    def _handle(self, route, request, stats):
+        if request.method != "GET":
+            route.fallback()
+            return
+
+        meta, body = self._read(request.url)
+        if meta is not None and time.time() < meta.get("expires_at", 0):
+            route.fulfill(status=meta["status"], headers=meta["headers"], body=body)
+            stats.hits += 1
+            stats.bytes_from_cache += len(body)
+            stats.time_saved_ms += meta["fetch_ms"]
+            return
+
+        validators = self._validators(meta) if meta is not None else {}
+        start = time.perf_counter()
+        response = route.fetch(headers={**request.headers, **validators}) if validators else route.fetch()
+        fetch_ms = (time.perf_counter() - start) * 1000
+
+        if validators and response.status == 304:
+            # Not modified: the stored body is fresh again, with the 304's caching headers applied
+            headers = {**meta["headers"], **{k: v for k, v in response.headers.items()
+                                             if k.lower() not in DROPPED_HEADERS}}
+            self._store(request.url, {**meta, "headers": headers, "stored_at": time.time()}, body)
+            route.fulfill(status=meta["status"], headers=headers, body=body)
+            stats.revalidated += 1
+            stats.bytes_from_cache += len(body)
+            stats.time_saved_ms += max(meta["fetch_ms"] - fetch_ms, 0)
+            return
+
+        body = response.body()
+        stats.misses += 1
+        stats.bytes_downloaded += len(body)
+        stats.download_ms += fetch_ms
+
+        headers = {k: v for k, v in response.headers.items() if k.lower() not in DROPPED_HEADERS}
+        if response.status == 200 and "no-store" not in response.headers.get("cache-control", ""):
+            self._store(request.url, {"status": response.status, "headers": headers, "fetch_ms": fetch_ms,
+                                      "stored_at": time.time()}, body)
+        route.fulfill(status=response.status, headers=headers, body=body)
@@ -0,0 +1,97 @@
+import errno
+import hashlib
+import os
+import shutil
+from pathlib import Path
+
+from allure_commons import hookimpl
+from allure_commons.logger import AllureFileLogger
+
+from config.base_config import BaseConfig
+
+try:
+    import fcntl
+except ImportError:  # Windows has no reflink support
+    fcntl = None
+
+# ioctl request number for FICLONE (copy-on-write clone on btrfs/xfs)
+FICLONE = 0x40049409
+CHUNK_SIZE = 1024 * 1024
+
+
+def content_digest(file_path, chunk_size=CHUNK_SIZE):
+    """Return the sha256 hex digest of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as file:
+        for chunk in iter(lambda: file.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _reflink(source, destination):
+    if fcntl is None:
+        raise OSError(errno.EOPNOTSUPP, "reflink is not supported on this platform")
+    with open(source, "rb") as src, open(destination, "wb") as dst:
+        fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+
+
+def link_or_copy(source, destination):
+    """Place source at destination without copying data when the filesystem allows it.
+
+    Tries a hard link first, then a reflink, and finally falls back to a plain copy.
+    Returns the method that was used.
+    """
+    source, destination = str(source), str(destination)
+    try:
+        os.link(source, destination)
+        return "hardlink"
+    except OSError as e:
+        if e.errno == errno.EEXIST:
+            raise
+    try:
+        _reflink(source, destination)
+        return "reflink"
+    except OSError:
+        if os.path.exists(destination):
+            os.unlink(destination)
+    shutil.copy2(source, destination)
+    return "copy"
+
+
+def store_artifact(source, store_dir=None):
+    """Put a file into the content-addressed store and return the stored path.
+
+    Identical files map to the same entry, so repeated screenshots are kept only once.
+    """
+    source = Path(source)
+    store_dir = Path(store_dir or BaseConfig.ATTACHMENT_STORE_DIR)
+    store_dir.mkdir(parents=True, exist_ok=True)
+    stored_path = store_dir / f"{content_digest(source)}{source.suffix}"
+    if stored_path.exists():
+        return stored_path
+
+    tmp_path = stored_path.with_name(f"{stored_path.name}.{os.getpid()}.tmp")
+    link_or_copy(source, tmp_path)
+    os.replace(tmp_path, stored_path)
+    return stored_path
+
+
+class LinkingFileLogger(AllureFileLogger):
+    """Allure results writer that links attachments instead of copying them."""
+
+    @hookimpl
+    def report_attached_file(self, source, file_name):
+        stored_path = store_artifact(source)
+        tmp_destination = self._report_dir / f"{file_name}.tmp"
+        final_destination = self._report_dir / file_name
+        link_or_copy(stored_path, tmp_destination)
+        os.replace(tmp_destination, final_destination)
+
+
+def install_linking_file_logger():
+    """Make allure-pytest write its results through LinkingFileLogger.
+
+    Must run before allure-pytest's own pytest_configure creates its file logger.
+    """
+    import allure_pytest.plugin
+    allure_pytest.plugin.AllureFileLogger = LinkingFileLogger
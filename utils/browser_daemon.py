@@ -0,0 +1,156 @@
+"""Keeps a warm Chromium running between pytest invocations.
+
+`python -m utils.browser_daemon start` launches Chromium with a DevTools port and records it in
+a state file; the browser fixture then attaches with connect_over_cdp() in milliseconds instead
+of launching a browser, and falls back to launching when no matching daemon is running.
+"""
+import argparse
+import json
+import os
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+from config.base_config import BaseConfig
+from config.launch_profiles import LAUNCH_PROFILES, launch_options
+
+STATE_FILE = BaseConfig.BROWSER_DAEMON_DIR / "state.json"
+PROFILE_DIR = BaseConfig.BROWSER_DAEMON_DIR / "profile"
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _port_open(port, host="127.0.0.1"):
+    try:
+        with socket.create_connection((host, port), timeout=0.5):
+            return True
+    except OSError:
+        return False
+
+
+def read_state():
+    """Return the running daemon's state, or None (removing a stale state file)."""
+    try:
+        with open(STATE_FILE, "r") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if _pid_alive(state["pid"]) and _port_open(state["port"]):
+        return state
+    STATE_FILE.unlink(missing_ok=True)
+    return None
+
+
+def daemon_for(browser_name, headless, launch_profile):
+    """Return the daemon's state if one is running with the same browser, headless mode and profile."""
+    state = read_state()
+    if state and (state["browser"], state["headless"], state["launch_profile"]) == (browser_name, headless, launch_profile):
+        return state
+    return None
+
+
+def start(headless=True, launch_profile="default", start_timeout=30):
+    state = read_state()
+    if state:
+        return state
+
+    from playwright.sync_api import sync_playwright
+
+    with sync_playwright() as p:
+        executable = p.chromium.executable_path
+    options = launch_options(launch_profile, "chromium", headless)
+    shutil.rmtree(PROFILE_DIR, ignore_errors=True)
+    PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+    command = [
+        executable,
+        f"--user-data-dir={PROFILE_DIR}",
+        "--remote-debugging-address=127.0.0.1",
+        "--remote-debugging-port=0",
+        "--no-first-run",
+        "--no-default-browser-check",
+        # Playwright launches Chromium without its sandbox by default as well
+        "--no-sandbox",
+        *(["--headless=new", "--hide-scrollbars", "--mute-audio"] if headless else []),
+        *options.get("args", []),
+        "about:blank",
+    ]
+    with open(BaseConfig.BROWSER_DAEMON_DIR / "chromium.log", "w") as log:
+        process = subprocess.Popen(command, stdout=log, stderr=subprocess.STDOUT, stdin=subprocess.DEVNULL,
+                                   start_new_session=True)
+
+    # Chromium writes the port it picked to DevToolsActivePort once DevTools is listening
+    port_file = PROFILE_DIR / "DevToolsActivePort"
+    deadline = time.monotonic() + start_timeout
+    while not port_file.exists() or not port_file.read_text().strip():
+        if process.poll() is not None or time.monotonic() > deadline:
+            process.kill()
+            raise RuntimeError(f"Browser daemon did not start, see {BaseConfig.BROWSER_DAEMON_DIR / 'chromium.log'}")
+        time.sleep(0.05)
+    port = int(port_file.read_text().split()[0])
+    state = {
+        "pid": process.pid,
+        "port": port,
+        "endpoint": f"http://127.0.0.1:{port}",
+        "browser": "chromium",
+        "headless": headless,
+        "launch_profile": launch_profile,
+        "started_at": datetime.now().isoformat(timespec="seconds"),
+    }
+    with open(STATE_FILE, "w") as f:
+        json.dump(state, f, indent=4)
+    return state
+
+
+def stop():
+    state = read_state()
+    STATE_FILE.unlink(missing_ok=True)
+    if not state:
+        return False
+    os.kill(state["pid"], signal.SIGTERM)
+    deadline = time.monotonic() + 10
+    while _pid_alive(state["pid"]) and time.monotonic() < deadline:
+        time.sleep(0.1)
+    if _pid_alive(state["pid"]):
+        os.kill(state["pid"], signal.SIGKILL)
+    return True
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Keep a warm Chromium for the browser fixture between runs.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    start_parser = subparsers.add_parser("start", help="Launch the daemon browser (no-op if one is running).")
+    start_parser.add_argument("--headless", default="False",
+                              help="Run the browser headless: True or False (must match pytest --headless).")
+    start_parser.add_argument("--launch-profile", default=BaseConfig.LAUNCH_PROFILE, choices=sorted(LAUNCH_PROFILES),
+                              help="Launch profile (must match pytest --launch-profile).")
+    subparsers.add_parser("stop", help="Stop the daemon browser.")
+    subparsers.add_parser("status", help="Show the daemon browser's state.")
+    args = parser.parse_args(argv)
+
+    BaseConfig.BROWSER_DAEMON_DIR.mkdir(parents=True, exist_ok=True)
+    if args.command == "start":
+        state = start(args.headless.lower() == "true", args.launch_profile)
+        print(f"🔥 Browser daemon running: pid {state['pid']}, {state['endpoint']}")
+    elif args.command == "stop":
+        print("🛑 Browser daemon stopped" if stop() else "No browser daemon running")
+    else:
+        state = read_state()
+        print(json.dumps(state, indent=4) if state else "No browser daemon running")
+        return 0 if state else 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,188 @@
+import json
+import os
+import threading
+from pathlib import Path
+
+from utils.logger import setup_logger
+
+MB = 1024 * 1024
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+# Performance.getMetrics values kept per sample
+CDP_METRICS = ("JSHeapUsedSize", "JSHeapTotalSize", "Nodes", "Documents", "JSEventListeners", "Frames")
+
+
+def process_table():
+    """Return {pid: (ppid, rss_bytes)} for every visible process, from /proc or psutil."""
+    table = {}
+    if os.path.isdir("/proc"):
+        for entry in os.listdir("/proc"):
+            if not entry.isdigit():
+                continue
+            try:
+                with open(f"/proc/{entry}/stat", "rb") as f:
+                    # The command name may contain spaces, so split after its closing parenthesis
+                    fields = f.read().rsplit(b")", 1)[1].split()
+                with open(f"/proc/{entry}/statm", "rb") as f:
+                    rss_pages = int(f.read().split()[1])
+            except (OSError, IndexError, ValueError):
+                continue
+            table[int(entry)] = (int(fields[1]), rss_pages * PAGE_SIZE)
+        return table
+    try:
+        import psutil
+    except ImportError:
+        return table
+    for process in psutil.process_iter(["pid", "ppid", "memory_info"]):
+        info = process.info
+        if info["memory_info"] is not None:
+            table[info["pid"]] = (info["ppid"], info["memory_info"].rss)
+    return table
+
+
+def descendants(table, roots):
+    children = {}
+    for pid, (ppid, _) in table.items():
+        children.setdefault(ppid, []).append(pid)
+    found, stack = set(), list(roots)
+    while stack:
+        pid = stack.pop()
+        if pid in found or pid not in table:
+            continue
+        found.add(pid)
+        stack.extend(children.get(pid, ()))
+    return found
+
+
+def tree_rss_mb(roots, table=None):
+    table = table if table is not None else process_table()
+    return sum(table[pid][1] for pid in descendants(table, roots)) / MB
+
+
+def cdp_metrics(page):
+    """Return the page's CDP Performance.getMetrics values (Chromium only), or {}."""
+    try:
+        cdp = page.context.new_cdp_session(page)
+    except Exception:
+        return {}
+    try:
+        cdp.send("Performance.enable")
+        metrics = {m["name"]: m["value"] for m in cdp.send("Performance.getMetrics")["metrics"]}
+    except Exception:
+        return {}
+    finally:
+        try:
+            cdp.detach()
+        except Exception:
+            pass
+    return {name: metrics[name] for name in CDP_METRICS if name in metrics}
+
+
+class RecyclingBrowser:
+    """Browser proxy that transparently relaunches the browser after `max_contexts` contexts or
+    once its process tree uses more than `max_rss_mb`.
+
+    Recycling only happens in new_context() while no context is open, so pages in use are never
+    closed. Everything else is delegated to the current Browser. With a `launcher` (e.g. a
+    connection to a browser server or the warm daemon) that callable provides each browser
+    instead, as a (browser, root_pids) pair; remote browsers have no local pids.
+    """
+
+    _launch_lock = threading.Lock()
+    _known_roots = set()
+
+    def __init__(self, browser_type, launch_kwargs, max_contexts=0, max_rss_mb=0, launcher=None):
+        self.browser_type = browser_type
+        self.launch_kwargs = launch_kwargs
+        self.launcher = launcher
+        self.max_contexts = max_contexts
+        self.max_rss_mb = max_rss_mb
+        self.launches = 0
+        self.logger = setup_logger(self.__class__.__name__)
+        self._launch()
+
+    def _launch(self):
+        self.contexts_created = 0
+        self.launches += 1
+        if self.launcher:
+            self._browser, root_pids = self.launcher()
+            self.root_pids = set(root_pids)
+            return
+        # Launches are serialized so the processes that appear can be attributed to this browser
+        with self._launch_lock:
+            before = set(process_table())
+            self._browser = self.browser_type.launch(**self.launch_kwargs)
+            table = process_table()
+            new = set(table) - before
+            known = descendants(table, self._known_roots)
+            self.root_pids = {pid for pid in new if table[pid][0] not in new and pid not in known}
+            self._known_roots.update(self.root_pids)
+
+    def rss_mb(self):
+        """Resident memory of this browser's process tree in MB (0 when it cannot be attributed)."""
+        return tree_rss_mb(self.root_pids)
+
+    def _recycle_reason(self):
+        if self.max_contexts and self.contexts_created >= self.max_contexts:
+            return f"{self.contexts_created} contexts"
+        if self.max_rss_mb:
+            rss = self.rss_mb()
+            if rss > self.max_rss_mb:
+                return f"{rss:.0f} MB RSS"
+        return None
+
+    def new_context(self, **kwargs):
+        if not self._browser.contexts:
+            reason = self._recycle_reason()
+            if reason:
+                self.logger.info(f"Relaunching browser after {reason}")
+                self.close()
+                self._launch()
+        self.contexts_created += 1
+        return self._browser.new_context(**kwargs)
+
+    def close(self):
+        self._known_roots.difference_update(self.root_pids)
+        self._browser.close()
+
+    def __getattr__(self, name):
+        if name == "_browser":
+            raise AttributeError(name)
+        return getattr(self._browser, name)
+
+
+class MemorySampler:
+    """Per-test memory samples: browser process RSS plus the page's CDP heap and DOM counters."""
+
+    def __init__(self):
+        self.enabled = True
+        self.samples = []
+
+    def sample(self, name, page=None, browser=None):
+        if not self.enabled:
+            return None
+        sample = {"test": name}
+        if isinstance(browser, RecyclingBrowser):
+            sample["browser_rss_mb"] = browser.rss_mb()
+            sample["browser_launches"] = browser.launches
+            sample["open_contexts"] = len(browser.contexts)
+        else:
+            sample["browser_rss_mb"] = tree_rss_mb([os.getpid()])
+        if page is not None and not page.is_closed():
+            metrics = cdp_metrics(page)
+            if "JSHeapUsedSize" in metrics:
+                sample["js_heap_used_mb"] = metrics.pop("JSHeapUsedSize") / MB
+                sample["js_heap_total_mb"] = metrics.pop("JSHeapTotalSize", 0) / MB
+            sample.update({name.lower(): value for name, value in metrics.items()})
+        self.samples.append(sample)
+        return sample
+
+    def save(self, file_path):
+        file_path = Path(file_path)
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(file_path, "w") as f:
+            json.dump(self.samples, f, indent=4)
+        return file_path
+
+
+MEMORY = MemorySampler()
@@ -0,0 +1,158 @@
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import threading
+import time
+
+from utils.logger import setup_logger
+
+LISTENING = re.compile(r"Listening on (ws://\S+)")
+
+
+def parse_endpoints(value):
+    """Split a comma/whitespace separated list of ws:// endpoints."""
+    endpoints = [endpoint for endpoint in re.split(r"[,\s]+", value or "") if endpoint]
+    for endpoint in endpoints:
+        if not endpoint.startswith(("ws://", "wss://")):
+            raise ValueError(f"Invalid browser server endpoint '{endpoint}', expected ws://host:port/")
+    return endpoints
+
+
+def worker_index(worker_id=None):
+    """Numeric index of this worker: the DAG scheduler's worker id, or pytest-xdist's gwN, else 0."""
+    worker_id = worker_id if worker_id is not None else os.getenv("PYTEST_XDIST_WORKER", "")
+    digits = re.search(r"\d+", str(worker_id))
+    return int(digits.group()) if digits else 0
+
+
+class BrowserServerPool:
+    """Connects workers to a pool of Playwright browser servers.
+
+    Worker N starts at endpoint N modulo the pool size, which spreads workers evenly; an
+    endpoint that refuses the connection is skipped in favour of the next one.
+    """
+
+    def __init__(self, endpoints, connect_timeout_ms=30000):
+        if not endpoints:
+            raise ValueError("A browser server pool needs at least one endpoint")
+        self.endpoints = list(endpoints)
+        self.connect_timeout_ms = connect_timeout_ms
+        self.logger = setup_logger(self.__class__.__name__)
+
+    def order(self, index):
+        start = index % len(self.endpoints)
+        return self.endpoints[start:] + self.endpoints[:start]
+
+    def connect(self, browser_type, index=0, launch_kwargs=None):
+        """Connect to the first reachable endpoint for this worker and return (browser, endpoint).
+
+        launch_kwargs are sent in the x-playwright-launch-options header, which `playwright
+        run-server` applies to the browser it launches for the connection (options such as
+        args need a server started with --unsafe).
+        """
+        headers = {"x-playwright-launch-options": json.dumps(launch_kwargs)} if launch_kwargs else None
+        errors = []
+        for endpoint in self.order(index):
+            try:
+                browser = browser_type.connect(endpoint, timeout=self.connect_timeout_ms, headers=headers)
+            except Exception as e:
+                self.logger.warning(f"Browser server {endpoint} unavailable: {e}")
+                errors.append(f"{endpoint}: {e}")
+                continue
+            self.logger.info(f"Worker {index} connected to browser server {endpoint}")
+            return browser, endpoint
+        raise ConnectionError("No browser server reachable:\n" + "\n".join(errors))
+
+
+class LocalBrowserServers:
+    """Stand-in pool of `playwright run-server` processes on this machine.
+
+    The Python API has no BrowserType.launch_server(), so each server is the Playwright driver's
+    run-server command; clients pick the browser engine when they connect.
+    """
+
+    def __init__(self, count=1, host="127.0.0.1", ports=None, unsafe=False, start_timeout=30):
+        self.count = count
+        self.host = host
+        self.ports = list(ports or [0] * count)
+        self.unsafe = unsafe
+        self.start_timeout = start_timeout
+        self.processes = []
+        self.endpoints = []
+
+    def start(self):
+        for port in self.ports:
+            command = [sys.executable, "-m", "playwright", "run-server", "--host", self.host, "--port", str(port)]
+            if self.unsafe:
+                command.append("--unsafe")
+            process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+            self.processes.append(process)
+            self.endpoints.append(self._wait_for_endpoint(process))
+        return self.endpoints
+
+    def _wait_for_endpoint(self, process):
+        found = {}
+
+        def read():
+            for line in process.stdout:
+                match = LISTENING.search(line)
+                if match:
+                    found["endpoint"] = match.group(1)
+                    break
+            # Keep draining so a chatty server never blocks on a full pipe
+            for _ in process.stdout:
+                pass
+
+        threading.Thread(target=read, daemon=True).start()
+        deadline = time.monotonic() + self.start_timeout
+        while "endpoint" not in found:
+            if process.poll() is not None or time.monotonic() > deadline:
+                self.stop()
+                raise RuntimeError("playwright run-server did not start")
+            time.sleep(0.05)
+        return found["endpoint"]
+
+    def stop(self):
+        for process in self.processes:
+            if process.poll() is None:
+                process.terminate()
+        for process in self.processes:
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        self.processes = []
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run local Playwright browser servers for --browser-servers.")
+    parser.add_argument("--count", type=int, default=1, help="Number of servers.")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to listen on (0.0.0.0 for other nodes).")
+    parser.add_argument("--port", type=int, action="append", help="Port of each server (repeatable; default: any).")
+    parser.add_argument("--unsafe", action="store_true",
+                        help="Let clients pass launch args, needed for --launch-profile performance.")
+    args = parser.parse_args(argv)
+
+    servers = LocalBrowserServers(len(args.port) if args.port else args.count, args.host, args.port, args.unsafe)
+    with servers:
+        print(f"🛰️ Browser servers: --browser-servers {','.join(servers.endpoints)}", flush=True)
+        try:
+            while all(process.poll() is None for process in servers.processes):
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,144 @@
+import _thread
+import re
+import sys
+import threading
+import time
+import traceback
+from datetime import datetime
+from pathlib import Path
+
+from config.base_config import BaseConfig
+
+
+class BudgetExceeded(Exception):
+    """Raised by the BasePage retry helpers when the current test's time or retry budget is spent."""
+
+
+class Budget:
+    """Wall-clock and retry allowance of one test (funnel stage)."""
+
+    def __init__(self, name, seconds, retries):
+        self.name = name
+        self.seconds = seconds
+        self.retries = retries
+        self.started = time.monotonic()
+        self.deadline = self.started + seconds
+        self.retries_used = 0
+        self.last_state = {}
+
+    def remaining_ms(self):
+        return (self.deadline - time.monotonic()) * 1000
+
+    def describe(self):
+        elapsed = time.monotonic() - self.started
+        return (f"budget '{self.name}': {elapsed:.1f}/{self.seconds} s, {self.retries_used}/{self.retries} retries; "
+                f"last state: {self.last_state}")
+
+
+class BudgetManager:
+    """Tracks the active budget per thread and clamps the retry helpers' timeouts and attempts to it."""
+
+    def __init__(self):
+        self._local = threading.local()
+
+    @property
+    def current(self):
+        return getattr(self._local, "budget", None)
+
+    def start(self, name, seconds, retries):
+        self._local.budget = Budget(name, seconds, retries)
+        return self._local.budget
+
+    def stop(self):
+        self._local.budget = None
+
+    def clamp(self, helper, locator, timeout, retries, url=None):
+        """Return (timeout, retries) limited to what is left of the budget, noting the page state."""
+        budget = self.current
+        if budget is None:
+            return timeout, retries
+        budget.last_state = {"helper": helper, "locator": locator, "url": url,
+                             "at": datetime.now().isoformat(timespec="seconds")}
+        remaining_ms = budget.remaining_ms()
+        if remaining_ms <= 0:
+            raise BudgetExceeded(f"Time budget exhausted before {helper}({locator}) - {budget.describe()}")
+        remaining_retries = budget.retries - budget.retries_used
+        return int(min(timeout, remaining_ms)), max(min(retries, remaining_retries + 1), 1)
+
+    def charge_retry(self, helper, locator):
+        budget = self.current
+        if budget is None:
+            return
+        budget.retries_used += 1
+        if budget.retries_used > budget.retries:
+            raise BudgetExceeded(f"Retry budget exhausted in {helper}({locator}) - {budget.describe()}")
+        if budget.remaining_ms() <= 0:
+            raise BudgetExceeded(f"Time budget exhausted in {helper}({locator}) - {budget.describe()}")
+
+
+BUDGETS = BudgetManager()
+
+
+def load_test_budgets(file_path):
+    import yaml
+
+    with open(file_path, "r") as file:
+        return yaml.safe_load(file) or {}
+
+
+def budget_for(budgets, stage):
+    """Return (seconds, retries) for a stage (test name), with per-stage overrides on the defaults."""
+    limits = {**budgets.get("default", {}), **budgets.get("stages", {}).get(stage, {})}
+    return limits.get("seconds", 300), limits.get("retries", 20)
+
+
+class Watchdog:
+    """Daemon thread that aborts the run when a test overruns its budget by more than `grace` seconds.
+
+    It is opt-in (--watchdog-grace): interrupting the main thread ends the whole session, not
+    just the hung test, so it is meant for unattended runs that would otherwise hang forever.
+    Before interrupting the main thread it writes every thread's stack and the budget's last
+    known page state (recorded by the BasePage helpers, so no Playwright call is needed from
+    this thread) to reports/watchdog/.
+    """
+
+    def __init__(self, grace, dump_dir=None, poll_interval=1.0):
+        self.grace = grace
+        self.dump_dir = Path(dump_dir or BaseConfig.WATCHDOG_DIR)
+        self.poll_interval = poll_interval
+        self._armed = None
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="budget-watchdog", daemon=True)
+        self._thread.start()
+
+    def arm(self, budget):
+        with self._lock:
+            self._armed = budget
+
+    def disarm(self):
+        with self._lock:
+            self._armed = None
+
+    def _run(self):
+        while True:
+            time.sleep(self.poll_interval)
+            with self._lock:
+                budget = self._armed
+                if budget is None or time.monotonic() < budget.deadline + self.grace:
+                    continue
+                self._armed = None
+            dump_path = self.dump(budget)
+            print(f"\n⏰ Watchdog: '{budget.name}' overran its budget by more than {self.grace} s, "
+                  f"aborting. Dump: {dump_path}", file=sys.stderr)
+            _thread.interrupt_main()
+
+    def dump(self, budget):
+        self.dump_dir.mkdir(parents=True, exist_ok=True)
+        dump_path = self.dump_dir / f"{re.sub(r'[^A-Za-z0-9_.-]+', '_', budget.name)}.txt"
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        with open(dump_path, "w") as f:
+            f.write(budget.describe() + "\n")
+            for ident, frame in sys._current_frames().items():
+                f.write(f"\n--- Thread {names.get(ident, ident)} ---\n")
+                f.write("".join(traceback.format_stack(frame)))
+        return dump_path
@@ -0,0 +1,191 @@
+import threading
+import time
+from contextlib import contextmanager
+
+from utils.logger import setup_logger
+from utils.stats import percentile
+
+
+class HostSampler:
+    """Host-wide CPU and memory utilisation from /proc (Linux), falling back to psutil."""
+
+    def __init__(self):
+        self._last_cpu = self._cpu_times()
+
+    @staticmethod
+    def _cpu_times():
+        try:
+            with open("/proc/stat", "r") as f:
+                values = [int(v) for v in f.readline().split()[1:]]
+        except (OSError, ValueError):
+            return None
+        idle = values[3] + (values[4] if len(values) > 4 else 0)  # idle + iowait
+        return sum(values), idle
+
+    def cpu_percent(self):
+        """Busy CPU share since the previous call."""
+        current = self._cpu_times()
+        if current is None:
+            try:
+                import psutil
+            except ImportError:
+                return None
+            return psutil.cpu_percent()
+        previous, self._last_cpu = self._last_cpu, current
+        total, idle = current[0] - previous[0], current[1] - previous[1]
+        return 100.0 * (total - idle) / total if total else 0.0
+
+    @staticmethod
+    def memory_percent():
+        try:
+            with open("/proc/meminfo", "r") as f:
+                meminfo = {line.split(":")[0]: int(line.split()[1]) for line in f}
+            return 100.0 * (1 - meminfo["MemAvailable"] / meminfo["MemTotal"])
+        except (OSError, KeyError, ValueError, IndexError):
+            try:
+                import psutil
+            except ImportError:
+                return None
+            return psutil.virtual_memory().percent
+
+
+class AdaptiveConcurrency:
+    """AIMD controller for the number of funnels that may run at once.
+
+    Every `interval` seconds it looks at host CPU and memory and at the p95 of the stage
+    latencies finished in that window. Any of them over its limit halves the limit
+    (multiplicative decrease); otherwise, if the limit was actually in use, it grows by one
+    (additive increase). An increase that did not raise throughput is undone and not retried
+    for `probe_cooldown` windows, so the limit settles where completed funnels per minute peak.
+    Throughput is compared as finished stages per minute: a funnel takes minutes, so whole
+    funnels per window are too coarse a signal.
+    """
+
+    def __init__(self, min_limit=1, max_limit=8, initial=None, max_stage_latency_s=30.0, max_cpu_percent=85.0,
+                 max_memory_percent=85.0, interval=15.0, decrease_factor=0.5, probe_cooldown=4, sampler=None):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.limit = max(min_limit, min(initial or min_limit, max_limit))
+        self.max_stage_latency_s = max_stage_latency_s
+        self.max_cpu_percent = max_cpu_percent
+        self.max_memory_percent = max_memory_percent
+        self.interval = interval
+        self.decrease_factor = decrease_factor
+        self.probe_cooldown = probe_cooldown
+        self.sampler = sampler or HostSampler()
+        self.history = []
+        self.logger = setup_logger(self.__class__.__name__)
+        self._active = 0
+        self._peak_active = 0
+        self._latencies = []
+        self._completed = 0
+        self._last_action = None
+        self._last_stage_rate = None
+        self._cooldown = 0
+        self._started = self._window_start = time.monotonic()
+        self._condition = threading.Condition()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @contextmanager
+    def slot(self):
+        """Block until fewer funnels than the current limit are running, then hold a slot."""
+        with self._condition:
+            self._condition.wait_for(lambda: self._active < self.limit)
+            self._active += 1
+            self._peak_active = max(self._peak_active, self._active)
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._active -= 1
+                self._completed += 1
+                self._condition.notify_all()
+
+    def observe(self, stage, seconds):
+        with self._condition:
+            self._latencies.append(seconds)
+
+    def start(self):
+        self._started = time.monotonic()
+        self._window_start = self._started
+        self._thread = threading.Thread(target=self._run, name="adaptive-concurrency", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.adjust()
+            except Exception as e:
+                # A failed decision must not end the control loop and leave the limit frozen
+                self.logger.error(f"Concurrency adjustment failed: {e}")
+
+    def adjust(self):
+        """Evaluate the last window and move the limit; returns the decision record."""
+        cpu, memory = self.sampler.cpu_percent(), self.sampler.memory_percent()
+        now = time.monotonic()
+        with self._condition:
+            latencies, self._latencies = self._latencies, []
+            completed, self._completed = self._completed, 0
+            peak_active, self._peak_active = self._peak_active, self._active
+            window_s, self._window_start = now - self._window_start, now
+            p95 = percentile(latencies, 95)
+            throughput = completed * 60.0 / window_s if window_s else 0.0
+            stage_rate = len(latencies) * 60.0 / window_s if window_s else 0.0
+
+            # Any signal may be missing: no stage finished in the window, or no /proc and no psutil
+            overloaded = []
+            if cpu is not None and cpu > self.max_cpu_percent:
+                overloaded.append(f"cpu {cpu:.0f}%")
+            if memory is not None and memory > self.max_memory_percent:
+                overloaded.append(f"memory {memory:.0f}%")
+            if p95 is not None and p95 > self.max_stage_latency_s:
+                overloaded.append(f"stage p95 {p95:.1f}s")
+            previous = self.limit
+            if overloaded:
+                self.limit = max(self.min_limit, int(self.limit * self.decrease_factor))
+                action = "decrease"
+            elif (self._last_action == "increase" and self._last_stage_rate
+                  and stage_rate < self._last_stage_rate * 1.05):
+                self.limit = max(self.min_limit, self.limit - 1)
+                self._cooldown = self.probe_cooldown
+                action = "revert"
+            elif self._cooldown:
+                self._cooldown -= 1
+                action = "hold"
+            elif peak_active >= self.limit and self.limit < self.max_limit:
+                self.limit += 1
+                action = "increase"
+            else:
+                action = "hold"
+            self._last_action, self._last_stage_rate = action, stage_rate
+            self._condition.notify_all()
+
+        decision = {
+            "elapsed_s": now - self._started, "limit": self.limit, "previous_limit": previous, "action": action,
+            "reason": ", ".join(overloaded), "cpu_percent": cpu, "memory_percent": memory,
+            "stage_p95_s": p95, "stages_per_min": stage_rate, "completed_per_min": throughput,
+            "peak_active": peak_active,
+        }
+        self.history.append(decision)
+        if self.limit != previous:
+            self.logger.info(f"Concurrency {previous} -> {self.limit} ({action}"
+                             f"{': ' + decision['reason'] if overloaded else ''})")
+        return decision
+
+
+def format_history(history):
+    lines = [f"{'Time':>7} {'Limit':>6} {'Action':>9} {'CPU %':>6} {'Mem %':>6} {'p95 s':>7} {'Stages/min':>11} "
+             f"{'Done/min':>9}"]
+    for d in history:
+        cpu = f"{d['cpu_percent']:.0f}" if d["cpu_percent"] is not None else "-"
+        memory = f"{d['memory_percent']:.0f}" if d["memory_percent"] is not None else "-"
+        p95 = f"{d['stage_p95_s']:.1f}" if d["stage_p95_s"] is not None else "-"
+        lines.append(f"{d['elapsed_s']:>6.0f}s {d['limit']:>6} {d['action']:>9} {cpu:>6} {memory:>6} {p95:>7} "
+                     f"{d['stages_per_min']:>11.1f} {d['completed_per_min']:>9.1f}")
+    return "\n".join(lines)
@@ -0,0 +1,263 @@
+"""Runs independent test chains in parallel pytest worker processes.
+
+The dependency DAG is built from the pytest-dependency markers; tests of one class are kept
+together because they share the class-scoped page. Each connected component is a chain that
+runs, in order, in its own worker process (and so its own browser), at most --dag-workers at a
+time. Workers hand their stage timings and metrics back to the controller, which reports and
+stores them as one run.
+
+The same chains are the unit of --shard-index/--shard-total, which splits a run across machines
+without separating a test from the tests it depends on.
+"""
+import json
+import os
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from config.base_config import BaseConfig
+from utils.browser_memory import MEMORY
+from utils.junit import merge_junit
+from utils.page_metrics import PAGE_METRICS
+from utils.retry_telemetry import RETRY_TELEMETRY
+from utils.stage_timings import STAGE_TIMINGS
+from utils.transitions import TRANSITIONS
+
+WORKER_DIR = BaseConfig.BASE_DIR / "reports" / "dag-workers"
+
+# Controller options that must not reach the workers, with whether they take a value
+CONTROLLER_ONLY_OPTIONS = {"--dag-workers": True, "--clean-alluredir": False, "--shard-index": True,
+                           "--shard-total": True, "--junitxml": True, "--junit-xml": True}
+
+WORKER_JUNIT = pytest.StashKey[list]()
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--dag-workers", action="store", type=int, default=BaseConfig.DAG_WORKERS,
+        help="Run independent dependency chains (test classes) in up to N parallel worker processes"
+    )
+    parser.addoption(
+        "--dag-worker", action="store", default=None,
+        help="Internal: run as worker N of the dependency scheduler"
+    )
+    parser.addoption(
+        "--shard-index", action="store", type=int, default=1,
+        help="Run only shard N (1..--shard-total) of the dependency chains"
+    )
+    parser.addoption(
+        "--shard-total", action="store", type=int, default=1,
+        help="Split the dependency chains into this many shards, e.g. one per machine"
+    )
+
+
+def _default_name(item, scope):
+    nodeid = item.nodeid.replace("::()::", "::")
+    if scope in ("session", "package"):
+        return nodeid
+    if scope == "module":
+        return nodeid.split("::", 1)[1]
+    return nodeid.split("::", 2)[2]
+
+
+def _scope_key(item, scope):
+    if scope in ("session", "package"):
+        return "session"
+    if scope == "module":
+        return item.module.__name__
+    return f"{item.module.__name__}::{item.cls.__qualname__}"
+
+
+def build_components(items):
+    """Group items into independent chains; return a list of item lists in collection order."""
+    parent = list(range(len(items)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def union(a, b):
+        parent[find(a)] = find(b)
+
+    names, first_in_class = {}, {}
+    for index, item in enumerate(items):
+        if item.cls is not None:
+            class_key = (item.module.__name__, item.cls.__qualname__)
+            union(index, first_in_class.setdefault(class_key, index))
+        marker = item.get_closest_marker("dependency")
+        for scope in ("session", "module", "class"):
+            if scope == "class" and item.cls is None:
+                continue
+            name = marker.kwargs.get("name") if marker else None
+            names[(scope, _scope_key(item, scope), name or _default_name(item, scope))] = index
+
+    edges = {index: set() for index in range(len(items))}
+    for index, item in enumerate(items):
+        marker = item.get_closest_marker("dependency")
+        if not marker:
+            continue
+        scope = marker.kwargs.get("scope", "module")
+        scope = "session" if scope == "package" else scope
+        for dependency in marker.kwargs.get("depends", []):
+            if scope == "class" and item.cls is None:
+                continue
+            target = names.get((scope, _scope_key(item, scope), dependency))
+            if target is not None:
+                edges[index].add(target)
+                union(index, target)
+    _check_acyclic(items, edges)
+
+    components = {}
+    for index, item in enumerate(items):
+        components.setdefault(find(index), []).append(item)
+    return list(components.values())
+
+
+def _check_acyclic(items, edges):
+    done, visiting = set(), set()
+    for start in edges:
+        if start in done:
+            continue
+        visiting.add(start)
+        stack = [(start, iter(edges[start]))]
+        while stack:
+            node, children = stack[-1]
+            child = next(children, None)
+            if child is None:
+                visiting.discard(node)
+                done.add(node)
+                stack.pop()
+            elif child in visiting:
+                raise pytest.UsageError(f"Dependency cycle through {items[child].nodeid}")
+            elif child not in done:
+                visiting.add(child)
+                stack.append((child, iter(edges[child])))
+
+
+def assign_shards(components, total):
+    """Spread chains over `total` shards, largest first onto the least loaded shard (deterministic)."""
+    shards = [[] for _ in range(total)]
+    loads = [0] * total
+    for component in sorted(components, key=lambda c: (-len(c), c[0].nodeid)):
+        target = loads.index(min(loads))
+        shards[target].extend(component)
+        loads[target] += len(component)
+    return shards
+
+
+@pytest.hookimpl(trylast=True)
+def pytest_collection_modifyitems(config, items):
+    total = config.getoption("--shard-total")
+    if total <= 1 or is_worker(config):
+        return
+    index = config.getoption("--shard-index")
+    if not 1 <= index <= total:
+        raise pytest.UsageError(f"--shard-index must be between 1 and --shard-total ({total}), got {index}")
+    selected = {id(item) for item in assign_shards(build_components(items), total)[index - 1]}
+    deselected = [item for item in items if id(item) not in selected]
+    if deselected:
+        config.hook.pytest_deselected(items=deselected)
+        items[:] = [item for item in items if id(item) in selected]
+
+
+def _worker_args(config, worker_id, nodeids):
+    """The controller's command line with its test selection replaced by the chain's node ids."""
+    file_args = set(config.args)
+    args, skip_next = [], False
+    for arg in config.invocation_params.args:
+        option = arg.split("=", 1)[0]
+        if skip_next or arg in file_args:
+            skip_next = False
+        elif option in CONTROLLER_ONLY_OPTIONS:
+            skip_next = CONTROLLER_ONLY_OPTIONS[option] and "=" not in arg
+        else:
+            args.append(arg)
+    if config.option.xmlpath:
+        # Each worker writes its own JUnit file, merged into the controller's at unconfigure
+        args.append(f"--junitxml={WORKER_DIR / f'{worker_id}.xml'}")
+    return [sys.executable, "-m", "pytest", *nodeids, *args, f"--dag-worker={worker_id}", "-p", "no:cacheprovider"]
+
+
+def _run_worker(config, worker_id, items):
+    WORKER_DIR.mkdir(parents=True, exist_ok=True)
+    log_path = WORKER_DIR / f"{worker_id}.log"
+    (WORKER_DIR / f"{worker_id}.json").unlink(missing_ok=True)
+    (WORKER_DIR / f"{worker_id}.xml").unlink(missing_ok=True)
+    with open(log_path, "w") as log:
+        # DAG_WORKER gives each worker its own run files, such as the shared FakerAPI lead
+        returncode = subprocess.call(_worker_args(config, worker_id, [item.nodeid for item in items]),
+                                     stdout=log, stderr=subprocess.STDOUT, cwd=config.invocation_params.dir,
+                                     env={**os.environ, "DAG_WORKER": worker_id})
+    return worker_id, items, returncode, log_path
+
+
+def _merge_worker_state(worker_id):
+    state_path = WORKER_DIR / f"{worker_id}.json"
+    if not state_path.exists():
+        return 0
+    with open(state_path, "r") as f:
+        state = json.load(f)
+    STAGE_TIMINGS.stages.extend(state["stages"])
+    TRANSITIONS.samples.extend(state["transitions"])
+    PAGE_METRICS.records.extend(state["page_metrics"])
+    RETRY_TELEMETRY.attempts.extend(state["retry_attempts"])
+    MEMORY.samples.extend(state["memory"])
+    return state["failed"]
+
+
+def pytest_runtestloop(session):
+    config = session.config
+    workers = config.getoption("--dag-workers")
+    if config.getoption("--dag-worker") is not None or workers < 2 or config.option.collectonly:
+        return None
+    components = build_components(session.items)
+    if len(components) < 2:
+        return None
+
+    config.stash[WORKER_JUNIT] = [WORKER_DIR / f"{index}.xml" for index in range(len(components))]
+    reporter = config.pluginmanager.get_plugin("terminalreporter")
+    reporter.write_line(f"🔀 Running {len(components)} independent chains on {min(workers, len(components))} workers")
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(_run_worker, config, str(index), items)
+                   for index, items in enumerate(components)]
+        for future in futures:
+            worker_id, items, returncode, log_path = future.result()
+            failed = _merge_worker_state(worker_id)
+            session.testsfailed += failed or (1 if returncode not in (0, 5) else 0)
+            status = "✅" if returncode == 0 else "❌"
+            summary = [line for line in log_path.read_text(errors="replace").splitlines() if line.strip()]
+            reporter.write_line(f"{status} worker {worker_id}: {items[0].nodeid.split('::')[0]} "
+                                f"({len(items)} tests) {summary[-1] if summary else ''} - log: {log_path}")
+    return True
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_sessionfinish(session):
+    worker_id = session.config.getoption("--dag-worker")
+    if worker_id is None:
+        return
+    WORKER_DIR.mkdir(parents=True, exist_ok=True)
+    with open(WORKER_DIR / f"{worker_id}.json", "w") as f:
+        json.dump({
+            "failed": session.testsfailed,
+            "stages": STAGE_TIMINGS.stages,
+            "transitions": TRANSITIONS.samples,
+            "page_metrics": PAGE_METRICS.records,
+            "retry_attempts": RETRY_TELEMETRY.attempts,
+            "memory": MEMORY.samples,
+        }, f)
+
+
+def pytest_unconfigure(config):
+    # Runs after the junitxml plugin wrote the controller's (empty) report in sessionfinish
+    worker_junit = config.stash.get(WORKER_JUNIT, None)
+    if worker_junit and config.option.xmlpath:
+        merge_junit(worker_junit, config.option.xmlpath)
+
+
+def is_worker(config):
+    return config.getoption("--dag-worker") is not None
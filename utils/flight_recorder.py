@@ -0,0 +1,58 @@
+import json
+import re
+import time
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+
+from config.base_config import BaseConfig
+
+
+class FlightRecorder:
+    """Bounded ring buffer of a page's console messages, page errors, failed requests, 4xx/5xx
+    responses and main-frame navigations.
+
+    Events are kept as small tuples and only formatted when dump() is called, which the
+    conftest does for failed tests.
+    """
+
+    def __init__(self, page, capacity=500):
+        self.page = page
+        self.events = deque(maxlen=capacity)
+        page.on("console", self._on_console)
+        page.on("pageerror", self._on_page_error)
+        page.on("requestfailed", self._on_request_failed)
+        page.on("response", self._on_response)
+        page.on("framenavigated", self._on_frame_navigated)
+
+    def _on_console(self, message):
+        self.events.append((time.time(), "console", message.type, message.text))
+
+    def _on_page_error(self, error):
+        self.events.append((time.time(), "pageerror", None, str(error)))
+
+    def _on_request_failed(self, request):
+        self.events.append((time.time(), "requestfailed", request.method, f"{request.url} {request.failure}"))
+
+    def _on_response(self, response):
+        if response.status >= 400:
+            self.events.append((time.time(), "response", response.status,
+                                f"{response.request.method} {response.url}"))
+
+    def _on_frame_navigated(self, frame):
+        if frame == self.page.main_frame:
+            self.events.append((time.time(), "navigated", None, frame.url))
+
+    def records(self):
+        return [{"time": datetime.fromtimestamp(at).isoformat(timespec="milliseconds"), "event": event,
+                 "detail": detail, "message": message} for at, event, detail, message in self.events]
+
+    def dump(self, name, dump_dir=None):
+        """Write the buffered events as JSON lines and return the file path."""
+        dump_dir = Path(dump_dir or BaseConfig.FLIGHT_RECORDER_DIR)
+        dump_dir.mkdir(parents=True, exist_ok=True)
+        file_path = dump_dir / f"{re.sub(r'[^A-Za-z0-9_.-]+', '_', name)}.jsonl"
+        with open(file_path, "w") as f:
+            for record in self.records():
+                f.write(json.dumps(record) + "\n")
+        return file_path
@@ -2,7 +2,6 @@ import json
 import os
 import re
 
-import requests
 import random
 from pathlib import Path
 
@@ -20,6 +19,8 @@ def get_project_root():
 
 # Function to fetch fake user data from FakerAPI
 def fetch_fake_users(quantity=1):
+    import requests  # imported lazily to keep page-object imports cheap
+
     response = requests.get(f"{FAKER_API_URL}?_quantity={quantity}")
     if response.status_code != 200:
         raise Exception(f"Failed to fetch data from FakerAPI: {response.status_code}")
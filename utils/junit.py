@@ -0,0 +1,79 @@
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+from utils.stats import summarize
+
+
+def _suites(path):
+    root = ET.parse(path).getroot()
+    return [root] if root.tag == "testsuite" else list(root.iter("testsuite"))
+
+
+def merge_junit(paths, out_path, labels=None):
+    """Combine JUnit XML files into one <testsuites> document, optionally labelling each file's suites."""
+    merged = ET.Element("testsuites")
+    totals = dict.fromkeys(("tests", "failures", "errors", "skipped"), 0)
+    total_time = 0.0
+    for index, path in enumerate(paths):
+        if not Path(path).exists():
+            continue
+        for suite in _suites(path):
+            if labels:
+                suite.set("name", f"{suite.get('name', 'pytest')} ({labels[index]})")
+            for key in totals:
+                totals[key] += int(suite.get(key, 0))
+            total_time += float(suite.get("time", 0))
+            merged.append(suite)
+    for key, value in totals.items():
+        merged.set(key, str(value))
+    merged.set("time", f"{total_time:.3f}")
+    out_path = Path(out_path)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    ET.ElementTree(merged).write(out_path, encoding="utf-8", xml_declaration=True)
+    return out_path
+
+
+def iter_test_cases(path):
+    """Yield {"test", "outcome", "time", "reruns"} for every test of every suite in a JUnit XML file.
+
+    pytest-rerunfailures leaves a <testcase> per attempt; the last one is the test's outcome.
+    """
+    for suite in _suites(path):
+        cases = {}
+        for case in suite.iter("testcase"):
+            outcome = "passed"
+            for child, name in (("failure", "failed"), ("error", "error"), ("skipped", "skipped")):
+                if case.find(child) is not None:
+                    outcome = name
+                    break
+            test = f"{case.get('classname')}::{case.get('name')}"
+            reruns = cases[test]["reruns"] + 1 if test in cases else 0
+            cases[test] = {"test": test, "outcome": outcome, "time": float(case.get("time", 0)), "reruns": reruns}
+        yield from cases.values()
+
+
+def timing_summary(path):
+    """Per test: outcome and rerun counts and duration statistics over every run in a (merged) JUnit file."""
+    tests = {}
+    for case in iter_test_cases(path):
+        entry = tests.setdefault(case["test"], {"outcomes": {}, "reruns": 0, "times": []})
+        entry["outcomes"][case["outcome"]] = entry["outcomes"].get(case["outcome"], 0) + 1
+        entry["reruns"] += case["reruns"]
+        if case["outcome"] != "skipped":
+            entry["times"].append(case["time"])
+    return {test: {"outcomes": entry["outcomes"], "reruns": entry["reruns"],
+                   **summarize(entry["times"], percentiles=(50, 95))}
+            for test, entry in tests.items()}
+
+
+def format_timing_summary(summary):
+    lines = [f"{'Test':<80} {'Pass':>5} {'Fail':>5} {'Rerun':>5} {'Mean s':>8} {'p95 s':>8} {'Max s':>8}"]
+    for test, entry in summary.items():
+        outcomes = entry["outcomes"]
+        failed = outcomes.get("failed", 0) + outcomes.get("error", 0)
+        if entry["count"]:
+            timing = f"{entry['mean']:>8.2f} {entry['p95']:>8.2f} {entry['max']:>8.2f}"
+        else:
+            timing = f"{'-':>8} {'-':>8} {'-':>8}"
+        lines.append(f"{test:<80} {outcomes.get('passed', 0):>5} {failed:>5} {entry['reruns']:>5} {timing}")
+    return "\n".join(lines)
@@ -0,0 +1,167 @@
+import argparse
+import hashlib
+import json
+import random
+import threading
+from array import array
+from pathlib import Path
+
+from utils.generate_random_test_data import PROGRAM_OPTIONS, get_project_root
+
+DEFAULT_DATASET_FILE = "test_data/leads.jsonl"
+DEFAULT_EMAIL_DOMAIN = "noemail.com"
+
+FIRST_NAMES = (
+    "James", "Mary", "Robert", "Patricia", "John", "Jennifer", "Michael", "Linda", "David", "Elizabeth",
+    "William", "Barbara", "Richard", "Susan", "Joseph", "Jessica", "Thomas", "Sarah", "Charles", "Karen",
+    "Christopher", "Lisa", "Daniel", "Nancy", "Matthew", "Betty", "Anthony", "Sandra", "Mark", "Margaret",
+    "Donald", "Ashley", "Steven", "Kimberly", "Andrew", "Emily", "Paul", "Donna", "Joshua", "Michelle",
+    "Kenneth", "Carol", "Kevin", "Amanda", "Brian", "Melissa", "Timothy", "Deborah", "Ronald", "Stephanie",
+)
+LAST_NAMES = (
+    "Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis", "Rodriguez", "Martinez",
+    "Hernandez", "Lopez", "Gonzalez", "Wilson", "Anderson", "Thomas", "Taylor", "Moore", "Jackson", "Martin",
+    "Lee", "Perez", "Thompson", "White", "Harris", "Sanchez", "Clark", "Ramirez", "Lewis", "Robinson",
+    "Walker", "Young", "Allen", "King", "Wright", "Scott", "Torres", "Nguyen", "Hill", "Flores",
+    "Green", "Adams", "Nelson", "Baker", "Hall", "Rivera", "Campbell", "Mitchell", "Carter", "Roberts",
+)
+
+
+class CompactHashSet:
+    """Set of strings stored as 64-bit fingerprints in one open-addressing array (8 bytes per slot).
+
+    A fingerprint collision makes a new string look like a duplicate, which only costs the
+    generator a retry; a real duplicate is never accepted.
+    """
+
+    def __init__(self, capacity=1024):
+        size = 1
+        while size < capacity * 2:
+            size <<= 1
+        self._slots = array("Q", bytes(8 * size))
+        self._mask = size - 1
+        self._count = 0
+
+    @staticmethod
+    def _fingerprint(value):
+        fingerprint = int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), "little")
+        return fingerprint or 1  # 0 marks an empty slot
+
+    def add(self, value):
+        """Add value; return False when it (or its fingerprint) is already present."""
+        if (self._count + 1) * 2 > len(self._slots):
+            self._grow()
+        return self._insert(self._fingerprint(value))
+
+    def __contains__(self, value):
+        fingerprint = self._fingerprint(value)
+        index = fingerprint & self._mask
+        while self._slots[index]:
+            if self._slots[index] == fingerprint:
+                return True
+            index = (index + 1) & self._mask
+        return False
+
+    def __len__(self):
+        return self._count
+
+    def _insert(self, fingerprint):
+        index = fingerprint & self._mask
+        while self._slots[index]:
+            if self._slots[index] == fingerprint:
+                return False
+            index = (index + 1) & self._mask
+        self._slots[index] = fingerprint
+        self._count += 1
+        return True
+
+    def _grow(self):
+        old_slots = self._slots
+        self._slots = array("Q", bytes(16 * len(old_slots)))
+        self._mask = len(self._slots) - 1
+        self._count = 0
+        for fingerprint in old_slots:
+            if fingerprint:
+                self._insert(fingerprint)
+
+
+def random_phone_number(rng):
+    """Return a 10-digit NANP-shaped number (area code and exchange do not start with 0 or 1)."""
+    return f"{rng.randint(2, 9)}{rng.randint(0, 8)}{rng.randint(0, 9)}{rng.randint(200, 999)}{rng.randint(0, 9999):04d}"
+
+
+def generate_leads(count, seed=None, domain=DEFAULT_EMAIL_DOMAIN):
+    """Yield `count` leads shaped like fetch_fake_users() output, unique by email and phone.
+
+    Generated offline and one at a time, so memory only grows with the two fingerprint sets.
+    """
+    rng = random.Random(seed)
+    emails, phones = CompactHashSet(min(count, 1 << 20)), CompactHashSet(min(count, 1 << 20))
+    for _ in range(count):
+        first_name, last_name = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        email = f"{first_name.lower()}.{last_name.lower()}{rng.randint(1, 999999)}@{domain}"
+        while not emails.add(email):
+            email = f"{first_name.lower()}.{last_name.lower()}{rng.randint(1, 999999999)}@{domain}"
+        phone = random_phone_number(rng)
+        while not phones.add(phone):
+            phone = random_phone_number(rng)
+        yield {
+            "first_name": first_name,
+            "last_name": last_name,
+            "email": email,
+            "phone_number": phone,
+            "zip_code": f"{rng.randint(1001, 99950):05d}",
+            "program_of_interest": rng.choice(PROGRAM_OPTIONS),
+        }
+
+
+def write_jsonl(leads, filename=DEFAULT_DATASET_FILE):
+    """Stream leads to a JSONL file, one record per line, and return (path, count)."""
+    full_path = Path(filename)
+    if not full_path.is_absolute():
+        full_path = get_project_root() / full_path
+    full_path.parent.mkdir(parents=True, exist_ok=True)
+    count = 0
+    with open(full_path, "w") as f:
+        for lead in leads:
+            f.write(json.dumps(lead) + "\n")
+            count += 1
+    return full_path, count
+
+
+def iter_jsonl(filename=DEFAULT_DATASET_FILE):
+    """Lazily yield the records of a JSONL file."""
+    full_path = Path(filename)
+    if not full_path.is_absolute():
+        full_path = get_project_root() / full_path
+    with open(full_path, "r") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+class JsonlLeadSource:
+    """Lead source for the load generators that hands out the records of a JSONL dataset in order."""
+
+    def __init__(self, filename=DEFAULT_DATASET_FILE):
+        self._records = iter_jsonl(filename)
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        with self._lock:
+            try:
+                return next(self._records)
+            except StopIteration:
+                raise RuntimeError("Lead dataset exhausted") from None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a JSONL dataset of unique synthetic leads.")
+    parser.add_argument("--count", type=int, required=True, help="Number of leads to generate.")
+    parser.add_argument("--output", default=DEFAULT_DATASET_FILE, help="JSONL file to write.")
+    parser.add_argument("--seed", type=int, help="Random seed for a reproducible dataset.")
+    parser.add_argument("--domain", default=DEFAULT_EMAIL_DOMAIN, help="Email domain.")
+    args = parser.parse_args()
+
+    path, count = write_jsonl(generate_leads(args.count, seed=args.seed, domain=args.domain), args.output)
+    print(f"✅ {count} leads saved to: {path}")
@@ -0,0 +1,148 @@
+import argparse
+import json
+import os
+import socket
+import sqlite3
+import time
+from contextlib import closing
+from dataclasses import dataclass
+from pathlib import Path
+
+from config.base_config import BaseConfig
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS leads (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    email TEXT NOT NULL UNIQUE,
+    phone_number TEXT NOT NULL UNIQUE,
+    data TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'free',
+    leased_by TEXT,
+    leased_at REAL,
+    consumed_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_leads_status ON leads(status, id);
+"""
+
+DEFAULT_LEASE_TTL = 3600
+
+
+@dataclass
+class Lease:
+    id: int
+    data: dict
+
+
+def default_owner(suffix=""):
+    owner = f"{socket.gethostname()}:{os.getpid()}"
+    return f"{owner}:{suffix}" if suffix else owner
+
+
+class LeadPool:
+    """Shared SQLite pool of unique leads that parallel funnels lease from.
+
+    A lease is taken inside a BEGIN IMMEDIATE transaction, so concurrent processes never
+    receive the same lead. Leases older than lease_ttl seconds (a crashed worker) are
+    returned to the pool on the next lease.
+    """
+
+    def __init__(self, db_path=None, lease_ttl=DEFAULT_LEASE_TTL):
+        self.db_path = Path(db_path or BaseConfig.LEAD_POOL_DB)
+        self.lease_ttl = lease_ttl
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as connection:
+            connection.executescript(SCHEMA)
+
+    def _connect(self):
+        # Autocommit mode so transactions are started explicitly with BEGIN IMMEDIATE
+        connection = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        connection.execute("PRAGMA journal_mode=WAL")
+        return connection
+
+    def add(self, leads):
+        """Add leads, skipping any whose email or phone number is already in the pool."""
+        added = 0
+        with closing(self._connect()) as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            for lead in leads:
+                cursor = connection.execute(
+                    "INSERT OR IGNORE INTO leads (email, phone_number, data) VALUES (?, ?, ?)",
+                    (lead["email"], lead["phone_number"], json.dumps(lead)))
+                added += cursor.rowcount
+            connection.execute("COMMIT")
+        return added
+
+    def lease(self, owner=None):
+        """Atomically lease the oldest free lead; raise RuntimeError when the pool is empty."""
+        now = time.time()
+        with closing(self._connect()) as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                connection.execute(
+                    "UPDATE leads SET status = 'free', leased_by = NULL, leased_at = NULL"
+                    " WHERE status = 'leased' AND leased_at < ?", (now - self.lease_ttl,))
+                row = connection.execute(
+                    "SELECT id, data FROM leads WHERE status = 'free' ORDER BY id LIMIT 1").fetchone()
+                if row is None:
+                    raise RuntimeError(
+                        f"Lead pool {self.db_path} has no free leads; fill it with python -m utils.lead_pool fill")
+                connection.execute(
+                    "UPDATE leads SET status = 'leased', leased_by = ?, leased_at = ? WHERE id = ?",
+                    (owner or default_owner(), now, row[0]))
+                connection.execute("COMMIT")
+            except Exception:
+                connection.execute("ROLLBACK")
+                raise
+        return Lease(row[0], json.loads(row[1]))
+
+    def consume(self, lead_id):
+        """Mark a leased lead as used so it is never handed out again."""
+        self._set_status(lead_id, "UPDATE leads SET status = 'consumed', consumed_at = ? WHERE id = ?",
+                         time.time())
+
+    def release(self, lead_id):
+        """Return an unused lead to the pool."""
+        self._set_status(lead_id, "UPDATE leads SET status = 'free', leased_by = NULL, leased_at = ?"
+                                  " WHERE id = ? AND status = 'leased'", None)
+
+    def _set_status(self, lead_id, query, value):
+        with closing(self._connect()) as connection:
+            connection.execute(query, (value, lead_id))
+
+    def stats(self):
+        with closing(self._connect()) as connection:
+            return dict(connection.execute("SELECT status, COUNT(*) FROM leads GROUP BY status").fetchall())
+
+
+class LeadPoolSource:
+    """Lead source for the load generators: every lead handed out is consumed immediately."""
+
+    def __init__(self, pool):
+        self.pool = pool
+
+    def __call__(self):
+        lease = self.pool.lease(default_owner("load"))
+        self.pool.consume(lease.id)
+        return lease.data
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Manage the shared lead pool.")
+    parser.add_argument("--db", default=str(BaseConfig.LEAD_POOL_DB))
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    fill = subparsers.add_parser("fill", help="Add unique leads to the pool.")
+    fill.add_argument("--count", type=int, help="Generate this many leads offline.")
+    fill.add_argument("--from-jsonl", help="Add the leads of a JSONL dataset instead.")
+    fill.add_argument("--seed", type=int, help="Random seed for generated leads.")
+    subparsers.add_parser("stats", help="Show lead counts per status.")
+    args = parser.parse_args()
+
+    pool = LeadPool(args.db)
+    if args.command == "fill":
+        from utils.lead_dataset import generate_leads, iter_jsonl
+
+        if not (args.count or args.from_jsonl):
+            parser.error("fill needs --count or --from-jsonl")
+        leads = iter_jsonl(args.from_jsonl) if args.from_jsonl else generate_leads(args.count, seed=args.seed)
+        print(f"✅ Added {pool.add(leads)} leads to {pool.db_path}")
+    print(pool.stats())
@@ -0,0 +1,277 @@
+import contextlib
+import json
+import queue
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field, asdict
+from datetime import datetime
+from pathlib import Path
+
+from config.base_config import BaseConfig
+from config.launch_profiles import launch_options
+from utils.browser_memory import RecyclingBrowser
+from utils.browser_servers import BrowserServerPool
+from utils.generate_random_test_data import fetch_fake_users
+from utils.logger import setup_logger
+from utils.stats import summarize
+
+# Funnel stages in the same order as TestCollegeBridge
+FUNNEL_STAGES = (
+    "open",
+    "fill_form_and_submit",
+    "click_start_qualify_button",
+    "mindset_qualify_process",
+    "bridge_start_process",
+    "general_education_process",
+    "entrance_exam_process",
+    "core_nursing_process",
+    "exit_exam_process",
+    "confirm_contact_page_process",
+    "result_page_process",
+    "college_plan_process",
+    "decision_PreBuy_or_NoPreBuy",
+)
+
+LOAD_REPORT_DIR = BaseConfig.BASE_DIR / "reports" / "load"
+FAKER_BATCH_SIZE = 100
+
+
+@dataclass
+class LeadResult:
+    index: int
+    scheduled_at: float
+    started_at: float = 0.0
+    finished_at: float = 0.0
+    ok: bool = False
+    failed_stage: str = None
+    error: str = None
+    stage_durations: dict = field(default_factory=dict)
+
+
+class FakerLeadSource:
+    """Hands out synthetic leads fetched from FakerAPI in batches, one per call."""
+
+    def __init__(self, batch_size=FAKER_BATCH_SIZE):
+        self.batch_size = batch_size
+        self.run_tag = uuid.uuid4().hex[:6]
+        self._buffer = []
+        self._counter = 0
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        with self._lock:
+            if not self._buffer:
+                self._buffer = fetch_fake_users(quantity=self.batch_size)
+            lead = dict(self._buffer.pop())
+            self._counter += 1
+            # FakerAPI names repeat at volume, so tag the email to keep every lead unique
+            local_part, domain = lead["email"].split("@", 1)
+            lead["email"] = f"{local_part}.{self.run_tag}{self._counter}@{domain}"
+            return lead
+
+
+class LoadGenerator:
+    """Drives CollegeBridgeLandingPage funnels at a target rate of leads per minute.
+
+    Each worker thread owns its own Playwright instance and browser; the number of
+    workers is the concurrency cap. Leads that cannot start on time because every
+    worker is busy are queued, and the delay is reported as schedule lag.
+    """
+
+    def __init__(self, rate_per_minute, concurrency, base_url=None, funnel_url=None,
+                 duration=None, total_leads=None, browser_name="chromium", headless=True,
+                 lead_source=None, stages=FUNNEL_STAGES, launch_profile="default", asset_cache=None,
+                 payment_stub=None, recycle_after_contexts=0, recycle_above_mb=0, browser_servers=None,
+                 controller=None):
+        if not duration and not total_leads:
+            raise ValueError("Either duration or total_leads must be set.")
+        self.rate_per_minute = rate_per_minute
+        self.concurrency = concurrency
+        self.base_url = base_url
+        self.funnel_url = funnel_url
+        self.duration = duration
+        self.total_leads = total_leads
+        self.browser_name = browser_name
+        self.headless = headless
+        self.lead_source = lead_source or FakerLeadSource()
+        self.stages = stages
+        self.launch_profile = launch_profile
+        self.asset_cache = asset_cache
+        self.payment_stub = payment_stub
+        self.recycle_after_contexts = recycle_after_contexts
+        self.recycle_above_mb = recycle_above_mb
+        self.server_pool = BrowserServerPool(browser_servers) if browser_servers else None
+        # An AdaptiveConcurrency controller caps the running funnels below `concurrency` workers
+        self.controller = controller
+        self.logger = setup_logger(self.__class__.__name__)
+        self.results = []
+        self._results_lock = threading.Lock()
+        self._tickets = queue.Queue()
+        self.started_at = None
+
+    def run(self):
+        """Schedule leads at the target rate and block until every lead has finished."""
+        workers = [threading.Thread(target=self._worker, args=(i,), daemon=True)
+                   for i in range(self.concurrency)]
+        for worker in workers:
+            worker.start()
+
+        self.started_at = time.monotonic()
+        if self.controller:
+            self.controller.start()
+        interval = 60.0 / self.rate_per_minute
+        index = 0
+        while True:
+            scheduled_at = self.started_at + index * interval
+            if self.total_leads and index >= self.total_leads:
+                break
+            if self.duration and scheduled_at - self.started_at >= self.duration:
+                break
+            delay = scheduled_at - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            self._tickets.put(LeadResult(index=index, scheduled_at=scheduled_at))
+            index += 1
+
+        for _ in workers:
+            self._tickets.put(None)
+        for worker in workers:
+            worker.join()
+        if self.controller:
+            self.controller.stop()
+        self.logger.info(f"Load run finished: {len(self.results)} leads in "
+                         f"{time.monotonic() - self.started_at:.1f}s")
+        return self.results
+
+    def _worker(self, worker_id):
+        from playwright.sync_api import sync_playwright
+
+        with sync_playwright() as p:
+            browser_type = getattr(p, self.browser_name)
+            launch_kwargs = launch_options(self.launch_profile, self.browser_name, self.headless)
+            launcher = None
+            if self.server_pool:
+                launcher = lambda: (self.server_pool.connect(browser_type, worker_id, launch_kwargs)[0], ())
+            # Under the adaptive controller a worker may never get a slot, so it launches on first use
+            browser = None
+            try:
+                while True:
+                    result = self._tickets.get()
+                    if result is None:
+                        break
+                    with self._slot():
+                        if browser is None:
+                            browser = RecyclingBrowser(browser_type, launch_kwargs,
+                                                       max_contexts=self.recycle_after_contexts,
+                                                       max_rss_mb=self.recycle_above_mb, launcher=launcher)
+                        self._run_lead(browser, result)
+                    with self._results_lock:
+                        self.results.append(result)
+            finally:
+                if browser is not None:
+                    browser.close()
+
+    def _slot(self):
+        return self.controller.slot() if self.controller else contextlib.nullcontext()
+
+    def _run_lead(self, browser, result):
+        from pages.college_bridge_pages2 import CollegeBridgeLandingPage
+
+        result.started_at = time.monotonic()
+        stage = None
+        context = browser.new_context()
+        if self.asset_cache:
+            self.asset_cache.install(context)
+        if self.payment_stub:
+            self.payment_stub.install(context)
+        try:
+            lead = self.lead_source()
+            page = context.new_page()
+            landing_page = CollegeBridgeLandingPage(page, test_data=lead, base_url=self.base_url,
+                                                    funnel_url=self.funnel_url)
+            for stage in self.stages:
+                stage_start = time.perf_counter()
+                getattr(landing_page, stage)()
+                result.stage_durations[stage] = time.perf_counter() - stage_start
+                if self.controller:
+                    self.controller.observe(stage, result.stage_durations[stage])
+            result.ok = True
+        except Exception as e:
+            result.failed_stage = stage
+            result.error = f"{type(e).__name__}: {e}"
+            self.logger.error(f"Lead {result.index} failed at stage {stage}: {e}")
+        finally:
+            context.close()
+            result.finished_at = time.monotonic()
+
+
+def build_report(results, started_at, interval=60):
+    """Aggregate lead results into overall and per-interval throughput, errors and stage latencies."""
+    def stage_summary(items):
+        durations = {}
+        for result in items:
+            for stage, seconds in result.stage_durations.items():
+                durations.setdefault(stage, []).append(seconds)
+        return {stage: summarize(values) for stage, values in durations.items()}
+
+    finished = sorted(results, key=lambda r: r.finished_at)
+    elapsed = (finished[-1].finished_at - started_at) if finished else 0.0
+    errors = [r for r in finished if not r.ok]
+
+    windows = []
+    window_start = 0.0
+    while finished and window_start <= elapsed:
+        items = [r for r in finished
+                 if window_start <= r.finished_at - started_at < window_start + interval]
+        window_errors = sum(1 for r in items if not r.ok)
+        windows.append({
+            "start_s": window_start,
+            "completed": len(items),
+            "errors": window_errors,
+            "error_rate": window_errors / len(items) if items else 0.0,
+            "throughput_per_min": len(items) * 60.0 / interval,
+            "stages": stage_summary(items),
+        })
+        window_start += interval
+
+    return {
+        "leads": len(finished),
+        "errors": len(errors),
+        "error_rate": len(errors) / len(finished) if finished else 0.0,
+        "elapsed_s": elapsed,
+        "throughput_per_min": len(finished) * 60.0 / elapsed if elapsed else 0.0,
+        "schedule_lag_s": summarize(r.started_at - r.scheduled_at for r in finished),
+        "failed_stages": {stage: sum(1 for r in errors if r.failed_stage == stage)
+                          for stage in {r.failed_stage for r in errors}},
+        "stages": stage_summary(finished),
+        "windows": windows,
+    }
+
+
+def format_report(report):
+    """Render a load report as a plain-text table."""
+    lines = [
+        f"Leads: {report['leads']}  Errors: {report['errors']} ({report['error_rate']:.1%})  "
+        f"Throughput: {report['throughput_per_min']:.1f} leads/min  Elapsed: {report['elapsed_s']:.1f}s",
+        "",
+        f"{'Window':>8} {'Done':>6} {'Errors':>7} {'Leads/min':>10}",
+    ]
+    for window in report["windows"]:
+        lines.append(f"{window['start_s']:>7.0f}s {window['completed']:>6} {window['errors']:>7} "
+                     f"{window['throughput_per_min']:>10.1f}")
+    lines += ["", f"{'Stage':<32} {'Count':>6} {'p50':>8} {'p90':>8} {'p95':>8} {'p99':>8} {'Max':>8}"]
+    for stage, stats in report["stages"].items():
+        lines.append(f"{stage:<32} {stats['count']:>6} {stats['p50']:>8.2f} {stats['p90']:>8.2f} "
+                     f"{stats['p95']:>8.2f} {stats['p99']:>8.2f} {stats['max']:>8.2f}")
+    return "\n".join(lines)
+
+
+def save_report(report, results, output_dir=LOAD_REPORT_DIR):
+    """Write the aggregated report and the raw lead results to a timestamped JSON file."""
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    file_path = output_dir / f"load_{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}.json"
+    with open(file_path, "w") as f:
+        json.dump({"report": report, "results": [asdict(r) for r in results]}, f, indent=4)
+    return file_path
@@ -0,0 +1,276 @@
+import argparse
+import os
+import platform
+import sqlite3
+import statistics
+import sys
+from contextlib import closing
+from datetime import datetime
+from pathlib import Path
+
+from config.base_config import BaseConfig
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    started_at TEXT NOT NULL,
+    finished_at TEXT NOT NULL,
+    exit_status INTEGER,
+    env TEXT,
+    browser TEXT,
+    headless INTEGER,
+    launch_profile TEXT,
+    emulation TEXT,
+    prebuy INTEGER,
+    decision TEXT,
+    host TEXT,
+    python TEXT
+);
+CREATE TABLE IF NOT EXISTS stage_timings (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    stage TEXT NOT NULL,
+    duration_s REAL NOT NULL,
+    outcome TEXT
+);
+CREATE TABLE IF NOT EXISTS url_metrics (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    url_key TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    value REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS retries (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    helper TEXT NOT NULL,
+    locator TEXT NOT NULL,
+    retries INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS retry_attempts (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    helper TEXT NOT NULL,
+    locator TEXT NOT NULL,
+    attempt INTEGER NOT NULL,
+    duration_ms REAL NOT NULL,
+    timeout_ms REAL,
+    wait_ms REAL,
+    outcome TEXT NOT NULL,
+    waited_ms REAL
+);
+CREATE TABLE IF NOT EXISTS memory_samples (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    test TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    value REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS artifacts (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    kind TEXT NOT NULL,
+    files INTEGER NOT NULL,
+    bytes INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_stage_timings_stage ON stage_timings(stage, run_id);
+CREATE INDEX IF NOT EXISTS idx_url_metrics_key ON url_metrics(url_key, metric, run_id);
+CREATE INDEX IF NOT EXISTS idx_retry_attempts_run ON retry_attempts(run_id);
+"""
+
+# Series compared by the regression check: (label, SQL returning run_id, key, value)
+SERIES_QUERIES = {
+    "stage": "SELECT run_id, stage, duration_s FROM stage_timings WHERE outcome = 'passed'",
+    "url": "SELECT run_id, url_key || ' ' || metric, value FROM url_metrics",
+    "memory": "SELECT run_id, test || ' ' || metric, value FROM memory_samples",
+}
+
+
+def directory_usage(directory):
+    """Return (files, bytes) under directory, counting hard-linked files once."""
+    seen, files, total = set(), 0, 0
+    for root, _, names in os.walk(directory):
+        for name in names:
+            stat = os.stat(os.path.join(root, name))
+            if (stat.st_dev, stat.st_ino) in seen:
+                continue
+            seen.add((stat.st_dev, stat.st_ino))
+            files += 1
+            total += stat.st_size
+    return files, total
+
+
+class MetricsStore:
+    """Append-only SQLite history of runs: stage timings, URL metrics, retries and artifact sizes."""
+
+    def __init__(self, db_path=None):
+        self.db_path = Path(db_path or BaseConfig.METRICS_DB)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as connection, connection:
+            connection.executescript(SCHEMA)
+            # Databases created before retry_attempts.waited_ms existed
+            columns = {row[1] for row in connection.execute("PRAGMA table_info(retry_attempts)")}
+            if "waited_ms" not in columns:
+                connection.execute("ALTER TABLE retry_attempts ADD COLUMN waited_ms REAL")
+
+    def _connect(self):
+        # Parallel workers may finish at the same time; wait for the write lock instead of failing
+        connection = sqlite3.connect(self.db_path, timeout=30)
+        connection.execute("PRAGMA journal_mode=WAL")
+        return connection
+
+    def record_run(self, started_at, exit_status, environment, stages=(), url_metrics=(),
+                   retries=(), artifacts=(), attempts=(), memory=()):
+        """Store one run and return its id.
+
+        stages: dicts with stage, duration_s and outcome; url_metrics: (url_key, metric, value);
+        retries: (helper, locator, count); artifacts: (kind, files, bytes);
+        attempts: RetryTelemetry attempt dicts; memory: MemorySampler samples.
+        """
+        with closing(self._connect()) as connection, connection:
+            cursor = connection.execute(
+                "INSERT INTO runs (started_at, finished_at, exit_status, env, browser, headless, launch_profile,"
+                " emulation, prebuy, decision, host, python) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (started_at, datetime.now().isoformat(timespec="seconds"), int(exit_status),
+                 environment.get("env"), environment.get("browser"), environment.get("headless"),
+                 environment.get("launch_profile"), environment.get("emulation"), environment.get("prebuy"),
+                 environment.get("decision"), platform.node(), platform.python_version()),
+            )
+            run_id = cursor.lastrowid
+            connection.executemany(
+                "INSERT INTO stage_timings (run_id, stage, duration_s, outcome) VALUES (?, ?, ?, ?)",
+                [(run_id, s["stage"], s["duration_s"], s["outcome"]) for s in stages])
+            connection.executemany(
+                "INSERT INTO url_metrics (run_id, url_key, metric, value) VALUES (?, ?, ?, ?)",
+                [(run_id, *row) for row in url_metrics if row[2] is not None])
+            connection.executemany(
+                "INSERT INTO retries (run_id, helper, locator, retries) VALUES (?, ?, ?, ?)",
+                [(run_id, *row) for row in retries])
+            connection.executemany(
+                "INSERT INTO artifacts (run_id, kind, files, bytes) VALUES (?, ?, ?, ?)",
+                [(run_id, *row) for row in artifacts])
+            connection.executemany(
+                "INSERT INTO retry_attempts (run_id, helper, locator, attempt, duration_ms, timeout_ms, wait_ms,"
+                " outcome, waited_ms) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(run_id, a["helper"], a["locator"], a["attempt"], a["duration_ms"], a["timeout_ms"],
+                  a["wait_ms"], a["outcome"], a.get("waited_ms")) for a in attempts])
+            connection.executemany(
+                "INSERT INTO memory_samples (run_id, test, metric, value) VALUES (?, ?, ?, ?)",
+                [(run_id, sample["test"], metric, value) for sample in memory
+                 for metric, value in sample.items() if metric != "test" and value is not None])
+        return run_id
+
+    def retry_attempts(self, last_runs=20):
+        """Return the retry-helper attempts of the most recent runs as dicts."""
+        with closing(self._connect()) as connection:
+            connection.row_factory = sqlite3.Row
+            rows = connection.execute(
+                "SELECT helper, locator, attempt, duration_ms, waited_ms, timeout_ms, wait_ms, outcome"
+                " FROM retry_attempts"
+                " WHERE run_id IN (SELECT id FROM runs ORDER BY id DESC LIMIT ?)", (last_runs,))
+            return [dict(row) for row in rows]
+
+    def recent_runs(self, last, env=None, emulation=None):
+        query = "SELECT id, started_at, env, browser, emulation, exit_status FROM runs"
+        conditions, params = [], []
+        if env:
+            conditions.append("env = ?")
+            params.append(env)
+        if emulation:
+            conditions.append("emulation = ?")
+            params.append(emulation)
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY id DESC LIMIT ?"
+        with closing(self._connect()) as connection:
+            return list(reversed(connection.execute(query, (*params, last)).fetchall()))
+
+    def series(self, run_ids, kind="stage"):
+        """Return {key: {run_id: value}} for the given runs; repeated samples in a run are averaged."""
+        if not run_ids:
+            return {}
+        placeholders = ",".join("?" * len(run_ids))
+        query = f"SELECT * FROM ({SERIES_QUERIES[kind]}) WHERE run_id IN ({placeholders})"
+        samples = {}
+        with closing(self._connect()) as connection:
+            for run_id, key, value in connection.execute(query, run_ids):
+                samples.setdefault(key, {}).setdefault(run_id, []).append(value)
+        return {key: {run_id: sum(values) / len(values) for run_id, values in runs.items()}
+                for key, runs in samples.items()}
+
+    def detect_regressions(self, window=10, z_threshold=3.0, min_increase=0.10, env=None, emulation=None):
+        """Flag stages and URL metrics whose latest value is significantly above the previous runs.
+
+        The latest run is compared with up to `window` earlier comparable runs. A value is flagged
+        when it is at least `min_increase` above the baseline mean and more than `z_threshold`
+        standard deviations above it (needs at least three baseline runs).
+        """
+        runs = self.recent_runs(window + 1, env=env, emulation=emulation)
+        if len(runs) < 4:
+            return []
+        latest_id, baseline_ids = runs[-1][0], [run[0] for run in runs[:-1]]
+        regressions = []
+        for kind in SERIES_QUERIES:
+            for key, values in self.series([run[0] for run in runs], kind).items():
+                if latest_id not in values:
+                    continue
+                baseline = [values[run_id] for run_id in baseline_ids if run_id in values]
+                if len(baseline) < 3:
+                    continue
+                mean = statistics.fmean(baseline)
+                stdev = statistics.stdev(baseline)
+                latest = values[latest_id]
+                if mean <= 0 or latest < mean * (1 + min_increase):
+                    continue
+                z_score = (latest - mean) / stdev if stdev else float("inf")
+                if z_score > z_threshold:
+                    regressions.append({"kind": kind, "key": key, "latest": latest, "baseline_mean": mean,
+                                        "baseline_stdev": stdev, "z_score": z_score, "runs": len(baseline)})
+        return sorted(regressions, key=lambda r: -r["z_score"])
+
+
+def print_trends(store, args):
+    runs = store.recent_runs(args.last, env=args.env, emulation=args.emulation)
+    run_ids = [run[0] for run in runs]
+    series = store.series(run_ids, args.kind)
+    print(f"{'Key':<70} " + " ".join(f"{'#' + str(run_id):>8}" for run_id in run_ids))
+    for key, values in sorted(series.items()):
+        if args.match and args.match not in key:
+            continue
+        print(f"{key[:70]:<70} " + " ".join(
+            f"{values[run_id]:>8.2f}" if run_id in values else f"{'-':>8}" for run_id in run_ids))
+
+
+def print_regressions(store, args):
+    regressions = store.detect_regressions(args.window, args.z, args.min_increase,
+                                           env=args.env, emulation=args.emulation)
+    if not regressions:
+        print("No significant slowdowns.")
+        return 0
+    for r in regressions:
+        print(f"⚠️  {r['kind']} {r['key']}: {r['latest']:.2f} vs mean {r['baseline_mean']:.2f} "
+              f"± {r['baseline_stdev']:.2f} over {r['runs']} runs (z={r['z_score']:.1f})")
+    return 1
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Query the run-metrics history.")
+    parser.add_argument("--db", default=str(BaseConfig.METRICS_DB))
+    parser.add_argument("--env", help="Only compare runs against this environment.")
+    parser.add_argument("--emulation", help="Only compare runs with this emulation label.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    trends = subparsers.add_parser("trends", help="Show per-run values for each stage or URL metric.")
+    trends.add_argument("--kind", choices=sorted(SERIES_QUERIES), default="stage")
+    trends.add_argument("--last", type=int, default=10, help="Number of most recent runs.")
+    trends.add_argument("--match", help="Only show keys containing this text.")
+
+    regressions = subparsers.add_parser("regressions", help="Flag significant slowdowns in the latest run.")
+    regressions.add_argument("--window", type=int, default=10, help="Number of earlier runs to compare with.")
+    regressions.add_argument("--z", type=float, default=3.0, help="z-score threshold.")
+    regressions.add_argument("--min-increase", type=float, default=0.10, help="Minimum relative slowdown.")
+
+    args = parser.parse_args(argv)
+    store = MetricsStore(args.db)
+    if args.command == "trends":
+        print_trends(store, args)
+        return 0
+    return print_regressions(store, args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
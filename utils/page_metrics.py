@@ -0,0 +1,132 @@
+import json
+from pathlib import Path
+from urllib.parse import urlparse
+
+from utils.logger import setup_logger
+from utils.stats import percentile
+
+# Installed on the context before any page loads, so LCP and CLS are observed from the start
+VITALS_INIT_SCRIPT = """
+(() => {
+    window.__cbVitals = {lcp: null, cls: 0};
+    try { performance.setResourceTimingBufferSize(10000); } catch (e) {}
+    try {
+        new PerformanceObserver((list) => {
+            for (const entry of list.getEntries()) window.__cbVitals.lcp = entry.startTime;
+        }).observe({type: "largest-contentful-paint", buffered: true});
+        new PerformanceObserver((list) => {
+            for (const entry of list.getEntries()) {
+                if (!entry.hadRecentInput) window.__cbVitals.cls += entry.value;
+            }
+        }).observe({type: "layout-shift", buffered: true});
+    } catch (e) {}
+})();
+"""
+
+# The first collection in a document is a hard navigation; later ones are SPA transitions,
+# for which navigation timing and LCP would only repeat the document's values.
+COLLECT_SCRIPT = """
+() => {
+    const state = window.__cbPerfState || (window.__cbPerfState = {collected: false, resourceIndex: 0, cls: 0});
+    const vitals = window.__cbVitals || {lcp: null, cls: 0};
+    const hard = !state.collected;
+    const nav = performance.getEntriesByType("navigation")[0];
+    const resources = performance.getEntriesByType("resource");
+    const fresh = resources.slice(state.resourceIndex);
+    const result = {
+        navigation_type: hard ? "hard" : "soft",
+        ttfb_ms: hard && nav ? nav.responseStart - nav.startTime : null,
+        dom_content_loaded_ms: hard && nav ? nav.domContentLoadedEventEnd - nav.startTime : null,
+        load_ms: hard && nav && nav.loadEventEnd > 0 ? nav.loadEventEnd - nav.startTime : null,
+        lcp_ms: hard ? vitals.lcp : null,
+        cls: vitals.cls - state.cls,
+        js_heap_mb: performance.memory ? performance.memory.usedJSHeapSize / 1048576 : null,
+        resource_count: fresh.length,
+        resource_bytes: fresh.reduce((sum, entry) => sum + (entry.transferSize || 0), 0),
+    };
+    state.collected = true;
+    state.resourceIndex = resources.length;
+    state.cls = vitals.cls;
+    return result;
+}
+"""
+
+METRIC_NAMES = ("ttfb_ms", "dom_content_loaded_ms", "load_ms", "lcp_ms", "cls",
+                "js_heap_mb", "resource_count", "resource_bytes")
+
+
+def url_key(url):
+    """Key a URL by its path (e.g. 'bridge/gen-ed/q1'), or by host for a site root."""
+    parsed = urlparse(url)
+    return parsed.path.strip("/") or parsed.hostname or url
+
+
+class PageMetricsStore:
+    """Collects navigation timing, Web Vitals, JS heap and resource usage per funnel URL."""
+
+    def __init__(self):
+        self.enabled = False
+        self.records = []
+        self._last_key = {}
+
+    def record(self, page):
+        """Collect metrics for the page's current URL once per arrival."""
+        if not self.enabled:
+            return None
+        key = url_key(page.url)
+        if self._last_key.get(id(page)) == key:
+            return None
+        try:
+            metrics = page.evaluate(COLLECT_SCRIPT)
+        except Exception as e:
+            setup_logger(self.__class__.__name__).warning(f"Could not collect page metrics for {key}: {e}")
+            return None
+        self._last_key[id(page)] = key
+        record = {"url_key": key, "url": page.url, **metrics}
+        self.records.append(record)
+        return record
+
+    def by_key(self):
+        grouped = {}
+        for record in self.records:
+            grouped.setdefault(record["url_key"], []).append(record)
+        return grouped
+
+    def summary(self):
+        """Return the median of every metric per URL key."""
+        summary = {}
+        for key, records in self.by_key().items():
+            summary[key] = {"samples": len(records)}
+            for name in METRIC_NAMES:
+                values = [r[name] for r in records if r.get(name) is not None]
+                summary[key][name] = percentile(values, 50)
+        return summary
+
+    def check_budgets(self, budgets):
+        """Return a list of budget violations; a page's worst sample is checked against its limits."""
+        defaults = budgets.get("default", {})
+        violations = []
+        for key, records in self.by_key().items():
+            limits = {**defaults, **budgets.get("pages", {}).get(key, {})}
+            for name, limit in limits.items():
+                values = [r[name] for r in records if r.get(name) is not None]
+                if values and max(values) > limit:
+                    violations.append(f"{key}: {name} {max(values):.2f} exceeds budget {limit}")
+        return violations
+
+    def save(self, file_path):
+        file_path = Path(file_path)
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(file_path, "w") as f:
+            json.dump({"summary": self.summary(), "records": self.records}, f, indent=4)
+        return file_path
+
+
+def load_budgets(file_path):
+    import yaml
+
+    with open(file_path, "r") as file:
+        return yaml.safe_load(file) or {}
+
+
+PAGE_METRICS = PageMetricsStore()
@@ -0,0 +1,107 @@
+import json
+import re
+from dataclasses import dataclass, field
+
+from config.base_config import BaseConfig
+
+PAYMENT_STUB_MODES = ("off", "success", "decline", "delay:<ms>")
+
+# Holds matching fetch/XHR calls in the page before they are sent. Sleeping in the route handler
+# instead would block Playwright's dispatcher, and with it every other page of the process.
+DELAY_INIT_SCRIPT = """
+((config) => {
+    const pattern = new RegExp(config.pattern);
+    const delayed = (method, url) => config.methods.includes(String(method || "GET").toUpperCase())
+        && pattern.test(new URL(url, location.href).href);
+    const sleep = () => new Promise(resolve => setTimeout(resolve, config.delayMs));
+
+    const originalFetch = window.fetch;
+    window.fetch = async function (input, init) {
+        const request = input instanceof Request ? input : null;
+        const method = (init && init.method) || (request ? request.method : "GET");
+        if (delayed(method, request ? request.url : String(input))) {
+            await sleep();
+        }
+        return originalFetch.call(this, input, init);
+    };
+
+    const open = XMLHttpRequest.prototype.open;
+    const send = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.open = function (method, url, ...rest) {
+        // Synchronous requests cannot be held back without blocking the page
+        this.__cbPaymentDelayed = rest[0] !== false && delayed(method, url);
+        return open.call(this, method, url, ...rest);
+    };
+    XMLHttpRequest.prototype.send = function (...args) {
+        if (!this.__cbPaymentDelayed) {
+            return send.apply(this, args);
+        }
+        setTimeout(() => send.apply(this, args), config.delayMs);
+    };
+})(%s);
+"""
+
+
+def parse_mode(mode):
+    """Split a --payment-stub value into (response name, delay in ms); None when the stub is off."""
+    mode = (mode or "off").strip().lower()
+    if mode == "off":
+        return None
+    if mode in ("success", "decline"):
+        return mode, 0
+    if mode.startswith("delay:"):
+        try:
+            return "success", max(int(mode.split(":", 1)[1]), 0)
+        except ValueError:
+            pass
+    raise ValueError(f"Unsupported payment stub mode '{mode}'. Use one of: {', '.join(PAYMENT_STUB_MODES)}")
+
+
+def load_stub_config(file_path=None):
+    with open(file_path or BaseConfig.PAYMENT_STUB_CONFIG, "r") as f:
+        return json.load(f)
+
+
+@dataclass
+class StubHits:
+    hits: int = 0
+    urls: list = field(default_factory=list)
+
+
+class PaymentStub:
+    """Answers the checkout's payment submissions locally instead of the real gateway.
+
+    Requests whose URL matches one of the configured patterns and whose method is listed are
+    fulfilled with the configured success or decline response; everything else falls through.
+    A delay holds matching fetch/XHR calls in the page before they are sent, which stands in for
+    a slow gateway; plain form posts are answered without it.
+    """
+
+    def __init__(self, mode, config=None):
+        self.response, self.delay_ms = parse_mode(mode) or ("success", 0)
+        config = config or load_stub_config()
+        self.methods = {method.upper() for method in config.get("methods", ["POST"])}
+        self.pattern = re.compile("|".join(f"(?:{p})" for p in config["url_patterns"]))
+        self.fulfillment = config["responses"][self.response]
+
+    def install(self, context):
+        """Route the context's payment calls through the stub and return its StubHits."""
+        hits = StubHits()
+        if self.delay_ms:
+            context.add_init_script(DELAY_INIT_SCRIPT % json.dumps(
+                {"pattern": self.pattern.pattern, "methods": sorted(self.methods), "delayMs": self.delay_ms}))
+        context.route(self.pattern, lambda route, request: self._handle(route, request, hits))
+        return hits
+
+    def _handle(self, route, request, hits):
+        if request.method.upper() not in self.methods:
+            route.fallback()
+            return
+        hits.hits += 1
+        hits.urls.append(request.url)
+        body = self.fulfillment.get("body", "")
+        route.fulfill(
+            status=self.fulfillment.get("status", 200),
+            headers=self.fulfillment.get("headers", {}),
+            body=body if isinstance(body, str) else json.dumps(body),
+        )
@@ -0,0 +1,261 @@
+import itertools
+import json
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from urllib.parse import quote, quote_plus, urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from utils.load_generator import FakerLeadSource, LeadResult
+from utils.logger import setup_logger
+
+API_RESOURCE_TYPES = ("xhr", "fetch")
+LEAD_FIELDS = ("email", "first_name", "last_name", "phone_number", "zip_code", "program_of_interest")
+# Headers that the HTTP client must compute itself or that tie a request to the captured session
+DROPPED_HEADERS = ("host", "content-length", "cookie", "connection", "accept-encoding")
+# JSON response keys whose values later requests typically echo back
+CORRELATION_KEY_PATTERN = re.compile(r"(^id$|_id$|Id$|token$|Token$|uuid$)")
+PLACEHOLDER_PATTERN = re.compile(r"\{\{([\w.]+)(?:\|(url|form))?\}\}")
+PLACEHOLDER_SPLIT_PATTERN = re.compile(r"(\{\{[\w.]+(?:\|(?:url|form))?\}\})")
+
+
+def default_host_suffixes(*urls):
+    """Return the registrable domains (last two labels) of the given URLs."""
+    suffixes = set()
+    for url in urls:
+        host = urlparse(url or "").hostname
+        if host:
+            suffixes.add(".".join(host.split(".")[-2:]))
+    return tuple(suffixes)
+
+
+class ApiRecorder:
+    """Records the API calls a page makes so the funnel can be replayed without a browser."""
+
+    def __init__(self, page, host_suffixes):
+        self.page = page
+        self.host_suffixes = tuple(host_suffixes)
+        self.calls = []
+        self.logger = setup_logger(self.__class__.__name__)
+        page.on("request", self._on_request)
+        page.on("response", self._on_response)
+
+    def _is_api_call(self, request):
+        host = urlparse(request.url).hostname or ""
+        if not any(host == s or host.endswith("." + s) for s in self.host_suffixes):
+            return False
+        if request.resource_type in API_RESOURCE_TYPES:
+            return True
+        # Classic form posts navigate the document instead of using fetch/XHR
+        return request.resource_type == "document" and request.method != "GET"
+
+    def _on_request(self, request):
+        if self._is_api_call(request):
+            self.calls.append({
+                "request": request,
+                "method": request.method,
+                "url": request.url,
+                "headers": {k: v for k, v in request.headers.items()
+                            if k.lower() not in DROPPED_HEADERS and not k.startswith(":")},
+                "body": request.post_data,
+                "started": time.perf_counter(),
+            })
+
+    def _on_response(self, response):
+        for call in reversed(self.calls):
+            if call.get("request") is response.request:
+                call["status"] = response.status
+                call["latency_s"] = time.perf_counter() - call["started"]
+                try:
+                    call["response_json"] = response.json()
+                except Exception:
+                    call["response_json"] = None
+                break
+
+    def save(self, file_path, lead):
+        """Templatize the recorded calls with lead placeholders and write them to file_path."""
+        calls = [templatize_call(call, lead) for call in self.calls]
+        correlate_calls(calls)
+        file_path = Path(file_path)
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(file_path, "w") as f:
+            json.dump({"captured_at": datetime.now().isoformat(), "calls": calls}, f, indent=4)
+        self.logger.info(f"Captured {len(calls)} API calls to {file_path}")
+        return file_path
+
+
+def _replace_token(text, value, placeholder):
+    """Replace value where it is a whole token: not part of a longer word or number, not a query, form or
+    JSON key, and not inside a placeholder."""
+    # A percent-escape before the value (e.g. %22 around a URL-encoded JSON string) is a boundary too
+    pattern = re.compile(rf"(?:(?<![A-Za-z0-9])|(?<=%[0-9A-Fa-f]{{2}})){re.escape(value)}"
+                         r'(?![A-Za-z0-9]|=|"\s*:)')
+    parts = PLACEHOLDER_SPLIT_PATTERN.split(text)
+    # Odd indexes are the placeholders already in the text
+    return "".join(part if i % 2 else pattern.sub(lambda _: placeholder, part) for i, part in enumerate(parts))
+
+
+def _replace_lead_values(text, lead):
+    if not text:
+        return text
+    # Longest values first so e.g. a name inside the email is not replaced on its own
+    for key in sorted(LEAD_FIELDS, key=lambda k: -len(str(lead.get(k) or ""))):
+        value = str(lead.get(key) or "")
+        if not value:
+            continue
+        if quote(value, safe="") != value:
+            text = _replace_token(text, quote(value, safe=""), f"{{{{{key}|url}}}}")
+        if quote_plus(value) != value:
+            text = _replace_token(text, quote_plus(value), f"{{{{{key}|form}}}}")
+        text = _replace_token(text, value, f"{{{{{key}}}}}")
+    return text
+
+
+def templatize_call(call, lead):
+    return {
+        "method": call["method"],
+        "url": _replace_lead_values(call["url"], lead),
+        "headers": call["headers"],
+        "body": _replace_lead_values(call["body"], lead),
+        "status": call.get("status"),
+        "latency_s": call.get("latency_s"),
+        "response_json": call.get("response_json"),
+    }
+
+
+def correlate_calls(calls):
+    """Replace ids returned by earlier responses with {{step<N>.<key>}} placeholders in later calls."""
+    for index, call in enumerate(calls):
+        response_json = call.pop("response_json", None)
+        if not isinstance(response_json, dict):
+            continue
+        extract = {key: str(value) for key, value in response_json.items()
+                   if CORRELATION_KEY_PATTERN.search(key) and isinstance(value, (str, int)) and len(str(value)) > 3}
+        if not extract:
+            continue
+        call["extract"] = sorted(extract)
+        for later in calls[index + 1:]:
+            for key, value in extract.items():
+                for part in ("url", "body"):
+                    if later[part]:
+                        later[part] = _replace_token(later[part], value, f"{{{{step{index}.{key}}}}}")
+
+
+def render(text, variables, json_body=False):
+    """Fill {{name}}, {{name|url}} and {{name|form}} placeholders from variables."""
+    if not text:
+        return text
+
+    def substitute(match):
+        value = str(variables[match.group(1)])
+        if match.group(2) == "url":
+            return quote(value, safe="")
+        if match.group(2) == "form":
+            return quote_plus(value)
+        return json.dumps(value)[1:-1] if json_body else value
+
+    return PLACEHOLDER_PATTERN.sub(substitute, text)
+
+
+def capture_file(file_path, test_class):
+    """Per-class capture file next to file_path, so each test class keeps its own recorded funnel."""
+    file_path = Path(file_path)
+    name = f"{test_class.__module__.rsplit('.', 1)[-1]}.{test_class.__name__}"
+    return file_path.with_name(f"{file_path.stem}.{name}{file_path.suffix or '.json'}")
+
+
+def load_capture(file_path):
+    with open(file_path, "r") as f:
+        capture = json.load(f)
+    if not capture.get("calls"):
+        raise ValueError(f"Capture {file_path} contains no API calls.")
+    return capture
+
+
+def step_name(index, call):
+    return f"{index:02d} {call['method']} {urlparse(call['url']).path}"
+
+
+class ReplayEngine:
+    """Re-issues captured API call sequences with fresh leads over pooled HTTP connections."""
+
+    def __init__(self, capture, concurrency, total_sequences=None, duration=None,
+                 lead_source=None, timeout=30):
+        if not total_sequences and not duration:
+            raise ValueError("Either total_sequences or duration must be set.")
+        self.calls = capture["calls"]
+        self.concurrency = concurrency
+        self.total_sequences = total_sequences
+        self.duration = duration
+        self.lead_source = lead_source or FakerLeadSource()
+        self.timeout = timeout
+        self.logger = setup_logger(self.__class__.__name__)
+        self._local = threading.local()
+        self.started_at = None
+
+    def _session(self):
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=self.concurrency, pool_maxsize=self.concurrency)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            self._local.session = session
+        return session
+
+    def run(self):
+        """Replay sequences on every worker until the sequence count or duration is reached."""
+        self.started_at = time.monotonic()
+        self._deadline = self.started_at + self.duration if self.duration else None
+        self._next_index = itertools.count()
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            batches = list(executor.map(lambda _: self._worker(), range(self.concurrency)))
+        results = sorted((r for batch in batches for r in batch), key=lambda r: r.index)
+        self.logger.info(f"Replayed {len(results)} sequences in {time.monotonic() - self.started_at:.1f}s")
+        return results
+
+    def _worker(self):
+        results = []
+        while True:
+            index = next(self._next_index)
+            if self.total_sequences and index >= self.total_sequences:
+                break
+            if self._deadline and time.monotonic() >= self._deadline:
+                break
+            results.append(self._replay_sequence(index))
+        return results
+
+    def _replay_sequence(self, index):
+        now = time.monotonic()
+        result = LeadResult(index=index, scheduled_at=now, started_at=now)
+        session = self._session()
+        session.cookies.clear()
+        name = None
+        try:
+            variables = dict(self.lead_source())
+            for step_index, call in enumerate(self.calls):
+                name = step_name(step_index, call)
+                headers = dict(call["headers"])
+                json_body = "json" in headers.get("content-type", "")
+                step_start = time.perf_counter()
+                response = session.request(
+                    call["method"], render(call["url"], variables),
+                    headers=headers, data=render(call["body"], variables, json_body=json_body),
+                    timeout=self.timeout,
+                )
+                result.stage_durations[name] = time.perf_counter() - step_start
+                if response.status_code >= 400:
+                    raise ValueError(f"HTTP {response.status_code} (captured {call['status']})")
+                for key in call.get("extract", ()):
+                    variables[f"step{step_index}.{key}"] = response.json()[key]
+            result.ok = True
+        except Exception as e:
+            result.failed_stage = name
+            result.error = f"{type(e).__name__}: {e}"
+        result.finished_at = time.monotonic()
+        return result
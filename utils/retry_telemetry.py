@@ -0,0 +1,86 @@
+import math
+import time
+from collections import Counter
+
+from utils.stats import percentile
+
+
+class AdaptivePolicy:
+    """Per-locator timeouts and attempt counts derived from the attempts of earlier runs.
+
+    A step's timeout is the p99 time its successful attempts spent in the wait that the timeout
+    bounds, times `margin`; scrolling, clicking and the other work around that wait is not
+    counted. Its attempt count is the p99 attempt number it succeeded on plus one spare. Steps
+    without `min_samples` successes keep the caller's defaults.
+    """
+
+    MAX_ATTEMPTS = 10
+
+    def __init__(self, attempts, margin=1.5, min_timeout_ms=1000, max_timeout_ms=60000, min_samples=5):
+        self.margin = margin
+        self.min_timeout_ms = min_timeout_ms
+        self.max_timeout_ms = max_timeout_ms
+        self.min_samples = min_samples
+        self._durations, self._attempts = {}, {}
+        for attempt in attempts:
+            if attempt["outcome"] != "ok":
+                continue
+            key = (attempt["helper"], attempt["locator"])
+            self._attempts.setdefault(key, []).append(attempt["attempt"])
+            # Attempts stored before waited_ms was recorded only have the whole attempt's duration
+            if attempt.get("waited_ms") is not None:
+                self._durations.setdefault(key, []).append(attempt["waited_ms"])
+
+    @classmethod
+    def from_store(cls, db_path, last_runs=20, **kwargs):
+        from utils.metrics_store import MetricsStore
+
+        return cls(MetricsStore(db_path).retry_attempts(last_runs), **kwargs)
+
+    def params(self, helper, locator, timeout, retries):
+        durations = self._durations.get((helper, locator), [])
+        if len(durations) < self.min_samples:
+            return timeout, retries
+        learned_timeout = percentile(durations, 99) * self.margin
+        timeout = int(min(max(learned_timeout, self.min_timeout_ms), self.max_timeout_ms))
+        needed = math.ceil(percentile(self._attempts[(helper, locator)], 99))
+        return timeout, min(max(needed + 1, 2), self.MAX_ATTEMPTS)
+
+
+class RetryTelemetry:
+    """Every attempt made by the BasePage retry helpers, plus the optional adaptive policy."""
+
+    def __init__(self):
+        self.attempts = []
+        self.policy = None
+
+    def params(self, helper, locator, timeout, retries):
+        """Return the (timeout, retries) a helper should use for this locator."""
+        if self.policy is None:
+            return timeout, retries
+        return self.policy.params(helper, locator, timeout, retries)
+
+    def record(self, helper, locator, attempt, started, outcome, timeout, wait_ms=0, waited_ms=None):
+        """Record one attempt; started is its time.perf_counter() value, outcome ok/retry/failed.
+
+        waited_ms is the time spent in the wait that timeout bounds; it defaults to the whole
+        attempt, for helpers whose attempt is just that wait.
+        """
+        duration_ms = (time.perf_counter() - started) * 1000
+        self.attempts.append({
+            "helper": helper,
+            "locator": locator,
+            "attempt": attempt,
+            "duration_ms": duration_ms,
+            "waited_ms": duration_ms if waited_ms is None else waited_ms,
+            "timeout_ms": timeout,
+            "wait_ms": wait_ms,
+            "outcome": outcome,
+        })
+
+    def retry_counts(self):
+        """Return {(helper, locator): retries} for attempts after the first."""
+        return Counter((a["helper"], a["locator"]) for a in self.attempts if a["attempt"] > 1)
+
+
+RETRY_TELEMETRY = RetryTelemetry()
@@ -0,0 +1,113 @@
+import argparse
+import difflib
+import gzip
+import os
+import shutil
+from datetime import datetime
+from pathlib import Path
+
+from config.base_config import BaseConfig
+
+CAPTURE_MODES = ("png", "snapshot")
+SNAPSHOT_SUFFIX = ".txt.gz"
+RUN_ID_ENV = "SNAPSHOT_RUN_ID"
+
+
+def page_snapshot(page):
+    """Return the page's ARIA snapshot as YAML text, or its visible text on older Playwright versions."""
+    body = page.locator("body")
+    try:
+        return body.aria_snapshot()
+    except AttributeError:
+        return body.inner_text()
+
+
+def read_snapshot(file_path):
+    with gzip.open(file_path, "rt", encoding="utf-8") as f:
+        return f.read()
+
+
+def diff_snapshots(previous, current, from_name="previous", to_name="current"):
+    return "".join(difflib.unified_diff(
+        previous.splitlines(keepends=True), current.splitlines(keepends=True), from_name, to_name))
+
+
+def run_dirs(history_dir=None):
+    history_dir = Path(history_dir or BaseConfig.SNAPSHOT_HISTORY_DIR)
+    if not history_dir.exists():
+        return []
+    return sorted(d for d in history_dir.iterdir() if d.is_dir())
+
+
+def session_run_id():
+    """Id of this test run's snapshot directory; DAG worker processes inherit it through the environment."""
+    return os.environ.setdefault(RUN_ID_ENV, f"{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}_{os.getpid()}")
+
+
+class StepSnapshots:
+    """Gzip-compressed ARIA/text snapshots of each funnel step, kept per run for cross-run diffs."""
+
+    def __init__(self, history_dir=None, keep_runs=20):
+        self.mode = "png"
+        self.history_dir = Path(history_dir or BaseConfig.SNAPSHOT_HISTORY_DIR)
+        self.keep_runs = keep_runs
+        self.run_id = None
+        self.run_dir = None
+        self.previous_dir = None
+
+    def _start_run(self):
+        run_id = self.run_id or session_run_id()
+        # Only earlier sessions: sibling DAG workers of this run share its directory
+        previous = [d for d in run_dirs(self.history_dir) if d.name < run_id]
+        self.previous_dir = previous[-1] if previous else None
+        self.run_dir = self.history_dir / run_id
+        self.run_dir.mkdir(parents=True, exist_ok=True)
+        for old_dir in previous[:max(len(previous) + 1 - self.keep_runs, 0)]:
+            shutil.rmtree(old_dir, ignore_errors=True)
+
+    def capture(self, page, name):
+        """Store the step's snapshot and return (text, diff against the previous run or None)."""
+        if self.run_dir is None:
+            self._start_run()
+        text = page_snapshot(page)
+        with gzip.open(self.run_dir / f"{name}{SNAPSHOT_SUFFIX}", "wt", encoding="utf-8") as f:
+            f.write(text)
+        previous_file = self.previous_dir / f"{name}{SNAPSHOT_SUFFIX}" if self.previous_dir else None
+        if previous_file is None or not previous_file.exists():
+            return text, None
+        diff = diff_snapshots(read_snapshot(previous_file), text,
+                              f"{self.previous_dir.name}/{name}", f"{self.run_dir.name}/{name}")
+        return text, diff
+
+
+STEP_SNAPSHOTS = StepSnapshots()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Diff step snapshots between two runs.")
+    parser.add_argument("--history", default=str(BaseConfig.SNAPSHOT_HISTORY_DIR))
+    parser.add_argument("--run", help="Run directory name (defaults to the latest run).")
+    parser.add_argument("--against", help="Run directory name to compare with (defaults to the run before).")
+    parser.add_argument("--step", help="Only diff this step.")
+    args = parser.parse_args()
+
+    runs = run_dirs(args.history)
+    names = [run.name for run in runs]
+    current = runs[names.index(args.run)] if args.run else (runs[-1] if runs else None)
+    if current is None:
+        parser.error(f"No snapshot runs in {args.history}")
+    earlier = [run for run in runs if run.name < current.name]
+    against = runs[names.index(args.against)] if args.against else (earlier[-1] if earlier else None)
+    if against is None:
+        parser.error(f"No earlier run to compare {current.name} with")
+
+    for snapshot in sorted(current.glob(f"*{SNAPSHOT_SUFFIX}")):
+        step = snapshot.name[:-len(SNAPSHOT_SUFFIX)]
+        if args.step and step != args.step:
+            continue
+        previous = against / snapshot.name
+        if not previous.exists():
+            print(f"+++ {step}: new step")
+            continue
+        print(diff_snapshots(read_snapshot(previous), read_snapshot(snapshot),
+                             f"{against.name}/{step}", f"{current.name}/{step}"), end="")
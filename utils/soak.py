@@ -0,0 +1,220 @@
+import json
+import re
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+from config.base_config import BaseConfig
+from utils.stats import linear_trend
+
+DRIFT_THRESHOLD = 0.2  # relative change over the soak (or absolute, for error rate) flagged as drift
+MIN_T_STAT = 2.0  # slope must be about two standard errors from zero to count as a trend
+
+# Memory sample fields tracked per iteration (max over the iteration's tests)
+MEMORY_FIELDS = ("browser_rss_mb", "js_heap_used_mb", "nodes", "jseventlisteners", "documents")
+
+
+def parse_duration(value):
+    """Parse '90', '90s', '45m' or '8h' into seconds."""
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([smh]?)\s*", str(value))
+    if not match:
+        raise ValueError(f"Invalid duration '{value}', expected e.g. 3600, 90m or 8h")
+    return float(match.group(1)) * {"": 1, "s": 1, "m": 60, "h": 3600}[match.group(2)]
+
+
+def host_memory_available_mb():
+    try:
+        with open("/proc/meminfo", "r") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def _read_json(file_path):
+    try:
+        with open(file_path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+class SoakRunner:
+    """Repeats the funnel in fresh pytest processes for a duration and/or iteration count.
+
+    Every iteration is a new process, so it gets a new lead (FakerAPI, or a new lease with
+    --lead-pool) and a new browser. Its stage latencies, test outcomes and peak memory samples
+    are appended to series.jsonl as they come in, so a killed soak still leaves its data behind.
+    """
+
+    def __init__(self, pytest_args, duration=None, iterations=None, output_dir=None, pause=0):
+        if not duration and not iterations:
+            raise ValueError("A soak needs a duration or an iteration count")
+        self.pytest_args = list(pytest_args)
+        self.duration = duration
+        self.iterations = iterations
+        self.pause = pause
+        self.output_dir = Path(output_dir or BaseConfig.SOAK_DIR / datetime.now().strftime("%Y-%m-%d_%H-%M-%S"))
+        self.series = []
+
+    def _done(self, started):
+        if self.iterations and len(self.series) >= self.iterations:
+            return True
+        return bool(self.duration) and time.monotonic() - started >= self.duration
+
+    def run(self):
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        series_path = self.output_dir / "series.jsonl"
+        started = time.monotonic()
+        try:
+            while not self._done(started):
+                point = self.run_iteration(len(self.series) + 1, time.monotonic() - started)
+                self.series.append(point)
+                with open(series_path, "a") as f:
+                    f.write(json.dumps(point) + "\n")
+                status = "✅" if point["exit_code"] == 0 else "❌"
+                print(f"{status} Soak iteration {point['iteration']}: {point['duration_s']:.0f} s, "
+                      f"{point['failed']}/{point['tests']} failed, "
+                      f"browser RSS {point['memory'].get('browser_rss_mb') or 0:.0f} MB")
+                if self.pause and not self._done(started):
+                    time.sleep(self.pause)
+        except KeyboardInterrupt:
+            print("⏹️ Soak interrupted, reporting the completed iterations")
+        return self.series
+
+    def run_iteration(self, iteration, elapsed_s):
+        for file_path in (BaseConfig.STAGE_TIMINGS_FILE, BaseConfig.MEMORY_FILE):
+            Path(file_path).unlink(missing_ok=True)
+        command = [sys.executable, "-m", "pytest", *self.pytest_args, "-p", "no:cacheprovider"]
+        started_at = datetime.now().isoformat(timespec="seconds")
+        iteration_start = time.monotonic()
+        with open(self.output_dir / f"iteration-{iteration:04d}.log", "w") as log:
+            exit_code = subprocess.call(command, stdout=log, stderr=subprocess.STDOUT, cwd=BaseConfig.BASE_DIR)
+
+        stages = (_read_json(BaseConfig.STAGE_TIMINGS_FILE) or {}).get("stages", [])
+        memory_samples = _read_json(BaseConfig.MEMORY_FILE) or []
+        memory = {}
+        for field in MEMORY_FIELDS:
+            values = [sample[field] for sample in memory_samples if sample.get(field) is not None]
+            if values:
+                memory[field] = max(values)
+        failed = sum(1 for stage in stages if stage["outcome"] == "failed")
+        return {
+            "iteration": iteration,
+            "started_at": started_at,
+            "elapsed_s": elapsed_s,
+            "duration_s": time.monotonic() - iteration_start,
+            "exit_code": exit_code,
+            "tests": len(stages),
+            "failed": failed,
+            "error_rate": failed / len(stages) if stages else (0.0 if exit_code == 0 else 1.0),
+            # Failed stages stop at a timeout, so only passed stages say anything about latency
+            "stages": {stage["stage"]: stage["duration_s"] for stage in stages if stage["outcome"] == "passed"},
+            "memory": memory,
+            "host_memory_available_mb": host_memory_available_mb(),
+        }
+
+
+def _metric_series(series):
+    """Return {metric: [(elapsed_hours, value), ...]} from the soak's iteration points."""
+    metrics = {}
+
+    def add(name, point, value):
+        if value is not None:
+            metrics.setdefault(name, []).append((point["elapsed_s"] / 3600, value))
+
+    for point in series:
+        add("iteration_s", point, point["duration_s"])
+        add("error_rate", point, point["error_rate"])
+        add("host_memory_available_mb", point, point.get("host_memory_available_mb"))
+        for stage, seconds in point["stages"].items():
+            add(f"stage {stage}", point, seconds)
+        for field, value in point["memory"].items():
+            add(f"memory {field}", point, value)
+    return metrics
+
+
+def drift_report(series, threshold=DRIFT_THRESHOLD, min_t=MIN_T_STAT):
+    """Fit a linear trend to every metric over the soak and flag the ones that drift.
+
+    drift is the fitted change from the first to the last iteration, relative to the fitted
+    start value (absolute for error_rate). A metric is 'rising' or 'falling' when that change
+    exceeds the threshold and the slope is at least min_t standard errors from zero.
+    """
+    report = {"iterations": len(series), "failed_iterations": sum(1 for p in series if p["exit_code"] != 0),
+              "hours": series[-1]["elapsed_s"] / 3600 if series else 0, "metrics": {}}
+    for name, points in sorted(_metric_series(series).items()):
+        xs, ys = [x for x, _ in points], [y for _, y in points]
+        trend = linear_trend(xs, ys)
+        entry = {"count": len(ys), "mean": sum(ys) / len(ys), "first": ys[0], "last": ys[-1], "status": "stable"}
+        if trend is None:
+            entry["status"] = "insufficient data"
+            report["metrics"][name] = entry
+            continue
+        start = trend["intercept"] + trend["slope"] * xs[0]
+        change = trend["slope"] * (xs[-1] - xs[0])
+        if name == "error_rate":
+            drift = change
+        else:
+            drift = change / abs(start) if start else (float("inf") if change else 0.0)
+        t_stat = trend["slope"] / trend["stderr"] if trend["stderr"] else (float("inf") if trend["slope"] else 0.0)
+        entry.update({"slope_per_hour": trend["slope"], "r2": trend["r2"], "t": t_stat, "drift": drift})
+        if abs(drift) >= threshold and abs(t_stat) >= min_t:
+            entry["status"] = "rising" if drift > 0 else "falling"
+        report["metrics"][name] = entry
+    # Less available host memory is the worrying direction for that one
+    report["drifting"] = [name for name, entry in report["metrics"].items()
+                          if entry["status"] == ("falling" if name == "host_memory_available_mb" else "rising")]
+    return report
+
+
+def format_drift(report):
+    lines = [
+        f"Soak: {report['iterations']} iterations over {report['hours']:.2f} h, "
+        f"{report['failed_iterations']} with failures",
+        "",
+        f"{'Metric':<70} {'First':>9} {'Last':>9} {'Slope/h':>9} {'Drift':>8} {'R²':>5}  Status",
+    ]
+    for name, entry in report["metrics"].items():
+        if "drift" not in entry:
+            lines.append(f"{name:<70} {entry['first']:>9.2f} {entry['last']:>9.2f} {'':>9} {'':>8} {'':>5}  "
+                         f"{entry['status']}")
+            continue
+        drift = f"{entry['drift'] * 100:+.0f}{'pp' if name == 'error_rate' else '%'}"
+        flag = "⚠️ " if name in report["drifting"] else ""
+        lines.append(f"{name:<70} {entry['first']:>9.2f} {entry['last']:>9.2f} {entry['slope_per_hour']:>9.2f} "
+                     f"{drift:>8} {entry['r2']:>5.2f}  {flag}{entry['status']}")
+    return "\n".join(lines)
+
+
+def save_drift(report, output_dir):
+    file_path = Path(output_dir) / "drift.json"
+    with open(file_path, "w") as f:
+        json.dump(report, f, indent=4)
+    return file_path
+
+
+def load_series(output_dir):
+    with open(Path(output_dir) / "series.jsonl", "r") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def main(argv=None):
+    """Re-run the drift analysis of an earlier soak: python -m utils.soak <soak dir>."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Report latency and memory drift of a soak run.")
+    parser.add_argument("soak_dir", help=f"Soak output directory (under {BaseConfig.SOAK_DIR}).")
+    parser.add_argument("--threshold", type=float, default=DRIFT_THRESHOLD)
+    args = parser.parse_args(argv)
+    report = drift_report(load_series(args.soak_dir), threshold=args.threshold)
+    print(format_drift(report))
+    return 1 if report["drifting"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,46 @@
+import json
+from pathlib import Path
+
+
+class StageTimings:
+    """Wall-clock duration and outcome of every funnel stage (test) in the current run.
+
+    Only tests that drive a browser page are stages; unit tests would pollute the run history.
+    """
+
+    def __init__(self):
+        self.label = "no emulation"
+        self.stages = []
+        self.stage_nodeids = set()
+
+    def select(self, items):
+        """Remember which collected tests are funnel stages: the ones using the `page` fixture."""
+        self.stage_nodeids = {item.nodeid for item in items if "page" in getattr(item, "fixturenames", ())}
+
+    def record(self, report):
+        """Record the call phase of a pytest test report; reports of non-stage tests are ignored."""
+        if report.nodeid not in self.stage_nodeids:
+            return
+        self.stages.append({
+            "nodeid": report.nodeid,
+            "stage": "::".join(report.nodeid.split("::")[1:]) or report.nodeid,
+            "duration_s": report.duration,
+            "outcome": report.outcome,
+        })
+
+    def save(self, file_path):
+        file_path = Path(file_path)
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(file_path, "w") as f:
+            json.dump({"emulation": self.label, "stages": self.stages}, f, indent=4)
+        return file_path
+
+    def format(self):
+        lines = [f"{'Stage':<70} {'Outcome':>8} {'Seconds':>9}"]
+        for stage in self.stages:
+            lines.append(f"{stage['stage']:<70} {stage['outcome']:>8} {stage['duration_s']:>9.2f}")
+        lines.append(f"{'Total':<70} {'':>8} {sum(s['duration_s'] for s in self.stages):>9.2f}")
+        return "\n".join(lines)
+
+
+STAGE_TIMINGS = StageTimings()
@@ -0,0 +1,57 @@
+import math
+
+
+def percentile(values, pct):
+    """Return the pct-th percentile (0-100) of values using linear interpolation."""
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    if len(ordered) == 1:
+        return ordered[0]
+    rank = (len(ordered) - 1) * pct / 100.0
+    lower = math.floor(rank)
+    upper = math.ceil(rank)
+    if lower == upper:
+        return ordered[int(rank)]
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+
+def summarize(values, percentiles=(50, 90, 95, 99)):
+    """Return count, mean, max and the requested percentiles of values."""
+    values = list(values)
+    if not values:
+        return {"count": 0}
+    summary = {
+        "count": len(values),
+        "mean": sum(values) / len(values),
+        "max": max(values),
+    }
+    for pct in percentiles:
+        summary[f"p{pct}"] = percentile(values, pct)
+    return summary
+
+
+def linear_trend(xs, ys):
+    """Least-squares fit ys = slope * xs + intercept.
+
+    Returns slope, intercept, r2 and the slope's standard error, or None for fewer than three
+    points or constant xs.
+    """
+    n = len(xs)
+    if n < 3:
+        return None
+    mean_x, mean_y = sum(xs) / n, sum(ys) / n
+    sxx = sum((x - mean_x) ** 2 for x in xs)
+    if sxx == 0:
+        return None
+    sxy = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys))
+    syy = sum((y - mean_y) ** 2 for y in ys)
+    slope = sxy / sxx
+    intercept = mean_y - slope * mean_x
+    residual = max(syy - slope * sxy, 0.0)
+    return {
+        "slope": slope,
+        "intercept": intercept,
+        "r2": 1 - residual / syy if syy else 1.0,
+        "stderr": math.sqrt(residual / (n - 2) / sxx),
+    }
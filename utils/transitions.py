@@ -0,0 +1,145 @@
+import argparse
+import json
+import time
+from datetime import datetime
+from pathlib import Path
+
+from config.base_config import BaseConfig
+from utils.page_metrics import url_key
+from utils.stats import summarize
+
+# Timestamps the click dispatch, history-API URL changes and the last DOM change + frame,
+# all on the page's own clock so Python round-trips do not distort the measurement.
+# Attribute mutations are ignored because highlight_element restores borders after a delay.
+TRANSITION_INIT_SCRIPT = """
+(() => {
+    const now = () => performance.now();
+    const t = window.__cbTransition = {clickAt: null, urlChangedAt: null, lastMutationAt: now(), lastRenderAt: now()};
+    window.addEventListener("click", () => { t.clickAt = now(); }, true);
+    const markUrlChange = () => { t.urlChangedAt = now(); };
+    for (const name of ["pushState", "replaceState"]) {
+        const original = history[name];
+        history[name] = function (...args) {
+            const result = original.apply(this, args);
+            markUrlChange();
+            return result;
+        };
+    }
+    window.addEventListener("popstate", markUrlChange);
+    new MutationObserver(() => {
+        t.lastMutationAt = now();
+        requestAnimationFrame(() => { t.lastRenderAt = now(); });
+    }).observe(document, {subtree: true, childList: true, characterData: true});
+})();
+"""
+
+# Resolves once the DOM has been quiet for quietMs, then reports the frame after the last change
+MEASURE_SCRIPT = """
+async ({quietMs, maxMs}) => {
+    const t = window.__cbTransition;
+    if (!t || t.clickAt === null) return null;
+    const started = performance.now();
+    while (performance.now() - t.lastMutationAt < quietMs && performance.now() - started < maxMs) {
+        await new Promise((resolve) => setTimeout(resolve, 16));
+    }
+    await new Promise((resolve) => requestAnimationFrame(resolve));
+    const result = {
+        click_at: t.clickAt,
+        url_changed_at: t.urlChangedAt,
+        stable_at: Math.max(t.lastRenderAt, t.urlChangedAt || t.clickAt),
+    };
+    t.clickAt = null;
+    t.urlChangedAt = null;
+    return result;
+}
+"""
+
+QUIET_MS = 100
+MAX_SETTLE_MS = 5000
+
+
+class TransitionRecorder:
+    """Times click-to-next-URL transitions and aggregates them per edge (from URL -> to URL)."""
+
+    def __init__(self):
+        self.enabled = False
+        self.samples = []
+
+    def measure(self, page, from_url, click_started):
+        """Record the transition that just moved the page away from from_url.
+
+        click_started is the time.perf_counter() value taken right before the click; it is only
+        used for full document navigations, where the page-side timestamps do not survive.
+        """
+        if not self.enabled:
+            return None
+        try:
+            timing = page.evaluate(MEASURE_SCRIPT, {"quietMs": QUIET_MS, "maxMs": MAX_SETTLE_MS})
+        except Exception:
+            timing = None
+
+        from_key, to_key = url_key(from_url), url_key(page.url)
+        sample = {"edge": f"{from_key} -> {to_key}", "from": from_key, "to": to_key}
+        if timing:
+            sample["mode"] = "spa"
+            sample["duration_ms"] = timing["stable_at"] - timing["click_at"]
+            sample["url_change_ms"] = (timing["url_changed_at"] - timing["click_at"]
+                                       if timing["url_changed_at"] is not None else None)
+        else:
+            sample["mode"] = "document"
+            sample["duration_ms"] = (time.perf_counter() - click_started) * 1000
+            sample["url_change_ms"] = None
+        self.samples.append(sample)
+        return sample
+
+    def append_history(self, file_path=None):
+        """Append this run's samples to the JSONL history used for cross-run percentiles."""
+        file_path = Path(file_path or BaseConfig.TRANSITIONS_HISTORY_FILE)
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        run_id = datetime.now().isoformat(timespec="seconds")
+        with open(file_path, "a") as f:
+            for sample in self.samples:
+                f.write(json.dumps({"run": run_id, **sample}) + "\n")
+        return file_path
+
+
+def iter_history(file_path=None):
+    file_path = Path(file_path or BaseConfig.TRANSITIONS_HISTORY_FILE)
+    if not file_path.exists():
+        return
+    with open(file_path, "r") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def edge_percentiles(samples):
+    """Return duration percentiles per edge, in first-seen order."""
+    durations = {}
+    for sample in samples:
+        durations.setdefault(sample["edge"], []).append(sample["duration_ms"])
+    return {edge: summarize(values) for edge, values in durations.items()}
+
+
+def format_edges(edges):
+    lines = [f"{'Transition':<70} {'Count':>6} {'p50':>8} {'p90':>8} {'p95':>8} {'p99':>8} {'Max':>8}"]
+    for edge, stats in edges.items():
+        lines.append(f"{edge:<70} {stats['count']:>6} {stats['p50']:>8.0f} {stats['p90']:>8.0f} "
+                     f"{stats['p95']:>8.0f} {stats['p99']:>8.0f} {stats['max']:>8.0f}")
+    return "\n".join(lines)
+
+
+TRANSITIONS = TransitionRecorder()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-edge SPA transition percentiles across runs (ms).")
+    parser.add_argument("--history", default=str(BaseConfig.TRANSITIONS_HISTORY_FILE))
+    parser.add_argument("--last-runs", type=int, help="Only include the most recent N runs.")
+    args = parser.parse_args()
+
+    samples = list(iter_history(args.history))
+    if args.last_runs:
+        runs = sorted({s["run"] for s in samples})[-args.last_runs:]
+        samples = [s for s in samples if s["run"] in runs]
+    print(format_edges(edge_percentiles(samples)))
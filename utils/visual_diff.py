@@ -0,0 +1,211 @@
+import argparse
+import hashlib
+import json
+import os
+import re
+import shutil
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from config.base_config import BaseConfig
+
+# take_screenshot() names files <step>_<YYYY-mm-dd_HH-MM-SS>.png
+SCREENSHOT_NAME = re.compile(r"^(?P<step>.+)_\d{4}-\d{2}-\d{2}_\d{2}-\d{2}-\d{2}\.png$")
+
+PIXEL_THRESHOLD = 16  # per-channel difference below which a pixel counts as unchanged
+MAX_DIFF_RATIO = 0.001  # share of changed pixels tolerated before a step is reported as changed
+
+
+def file_digest(file_path):
+    return hashlib.blake2b(Path(file_path).read_bytes(), digest_size=16).hexdigest()
+
+
+def dhash(image):
+    """64-bit difference hash of a PIL image (9x8 grayscale thumbnail, left/right gradients)."""
+    import numpy as np
+    from PIL import Image
+
+    pixels = np.asarray(image.convert("L").resize((9, 8), Image.BILINEAR), dtype=np.int16)
+    bits = (pixels[:, 1:] > pixels[:, :-1]).flatten()
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def thumbnail_dhash(image):
+    """dHash of an opened image from a reduced decode, before any full-size pixel load.
+
+    JPEG decodes straight at a fraction of the size (draft mode); other formats are shrunk with a
+    cheap box reduce() rather than converted and resampled at full size.
+    """
+    image.draft("L", (64, 64))
+    factor = min(image.size) // 64
+    return dhash(image.reduce(factor) if factor > 1 else image)
+
+
+def hash_distance(first, second):
+    return bin(first ^ second).count("1")
+
+
+def latest_screenshots(screenshot_dir=None):
+    """Return {step: path} with the most recent screenshot of every step."""
+    latest = {}
+    for path in sorted(Path(screenshot_dir or BaseConfig.SCREENSHOT_DIR).glob("*.png")):
+        match = SCREENSHOT_NAME.match(path.name)
+        latest[match.group("step") if match else path.stem] = path
+    return latest
+
+
+def _baseline_meta(baseline_path):
+    meta_path = baseline_path.with_suffix(".json")
+    try:
+        with open(meta_path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def compare_images(step, baseline_path, actual_path, diff_dir=None, pixel_threshold=PIXEL_THRESHOLD,
+                   max_diff_ratio=MAX_DIFF_RATIO, trust_phash=False):
+    """Compare one screenshot with its baseline and return a result dict.
+
+    Cheapest checks first: identical bytes (digest cached next to the baseline), then the size and,
+    with trust_phash, an identical perceptual hash, using the size and dHash stored with the
+    baseline and a reduced decode of the screenshot; otherwise a vectorized per-pixel diff. A diff
+    image with changed pixels in red is written to diff_dir for changed steps.
+    """
+    result = {"step": step, "baseline": str(baseline_path), "actual": str(actual_path)}
+    baseline_path = Path(baseline_path)
+    if not baseline_path.exists():
+        return {**result, "status": "new"}
+
+    meta = _baseline_meta(baseline_path) or {"digest": file_digest(baseline_path)}
+    if meta["digest"] == file_digest(actual_path):
+        return {**result, "status": "identical", "diff_ratio": 0.0, "hash_distance": 0}
+
+    from PIL import Image
+
+    with Image.open(actual_path) as actual_image:
+        actual_size = actual_image.size
+        actual_hash = thumbnail_dhash(actual_image)
+    baseline_hash, baseline_size = meta.get("dhash"), meta.get("size")
+    if baseline_hash is None or baseline_size is None:
+        # Baselines approved before the hash was stored
+        with Image.open(baseline_path) as baseline_image:
+            baseline_size = baseline_image.size
+            baseline_hash = thumbnail_dhash(baseline_image)
+    baseline_size = tuple(baseline_size)
+    distance = hash_distance(baseline_hash, actual_hash)
+    result["hash_distance"] = distance
+    if actual_size != baseline_size:
+        return {**result, "status": "size_changed", "baseline_size": baseline_size, "actual_size": actual_size}
+    if trust_phash and distance == 0:
+        return {**result, "status": "match", "diff_ratio": None}
+
+    import numpy as np
+
+    with Image.open(actual_path) as actual_image, Image.open(baseline_path) as baseline_image:
+        actual = np.asarray(actual_image.convert("RGB"), dtype=np.int16)
+        baseline = np.asarray(baseline_image.convert("RGB"), dtype=np.int16)
+    changed = np.abs(actual - baseline).max(axis=2) > pixel_threshold
+    diff_ratio = float(changed.mean())
+    result["diff_ratio"] = diff_ratio
+    if diff_ratio <= max_diff_ratio:
+        return {**result, "status": "match"}
+
+    if diff_dir:
+        diff_dir = Path(diff_dir)
+        diff_dir.mkdir(parents=True, exist_ok=True)
+        overlay = (actual * 0.4).astype(np.uint8)
+        overlay[changed] = (255, 0, 0)
+        diff_path = diff_dir / f"{step}_diff.png"
+        Image.fromarray(overlay).save(diff_path, compress_level=1)
+        result["diff"] = str(diff_path)
+    return {**result, "status": "changed"}
+
+
+def _compare_task(task):
+    return compare_images(**task)
+
+
+def compare_run(screenshot_dir=None, baseline_dir=None, diff_dir=None, workers=None, **options):
+    """Compare the latest screenshot of every step with its baseline, in a process pool."""
+    baseline_dir = Path(baseline_dir or BaseConfig.VISUAL_BASELINE_DIR)
+    diff_dir = Path(diff_dir or BaseConfig.VISUAL_DIFF_DIR)
+    tasks = [{"step": step, "baseline_path": baseline_dir / f"{step}.png", "actual_path": path,
+              "diff_dir": diff_dir, **options}
+             for step, path in latest_screenshots(screenshot_dir).items()]
+    if workers == 1 or len(tasks) < 2:
+        return [_compare_task(task) for task in tasks]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(_compare_task, tasks))
+
+
+def approve(screenshot_dir=None, baseline_dir=None, steps=None):
+    """Make the latest screenshots the new baselines, with their digest and perceptual hash."""
+    from PIL import Image
+
+    baseline_dir = Path(baseline_dir or BaseConfig.VISUAL_BASELINE_DIR)
+    baseline_dir.mkdir(parents=True, exist_ok=True)
+    approved = []
+    for step, path in latest_screenshots(screenshot_dir).items():
+        if steps and step not in steps:
+            continue
+        baseline_path = baseline_dir / f"{step}.png"
+        shutil.copyfile(path, baseline_path)
+        with Image.open(baseline_path) as image:
+            size = image.size
+            meta = {"digest": file_digest(baseline_path), "dhash": thumbnail_dhash(image), "size": size}
+        with open(baseline_path.with_suffix(".json"), "w") as f:
+            json.dump(meta, f, indent=4)
+        approved.append(step)
+    return approved
+
+
+def format_results(results):
+    lines = [f"{'Step':<50} {'Status':>12} {'Changed %':>10} {'dHash':>6}"]
+    for r in sorted(results, key=lambda r: r["step"]):
+        ratio = f"{r['diff_ratio'] * 100:.3f}" if r.get("diff_ratio") is not None else "-"
+        lines.append(f"{r['step']:<50} {r['status']:>12} {ratio:>10} {r.get('hash_distance', '-'):>6}")
+    return "\n".join(lines)
+
+
+def save_results(results, diff_dir=None):
+    file_path = Path(diff_dir or BaseConfig.VISUAL_DIFF_DIR) / "report.json"
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(file_path, "w") as f:
+        json.dump(results, f, indent=4)
+    return file_path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare funnel screenshots with approved baselines.")
+    parser.add_argument("--screenshots", default=str(BaseConfig.SCREENSHOT_DIR))
+    parser.add_argument("--baselines", default=str(BaseConfig.VISUAL_BASELINE_DIR))
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    compare = subparsers.add_parser("compare", help="Diff the latest screenshots against the baselines.")
+    compare.add_argument("--workers", type=int, default=os.cpu_count(), help="Comparison processes.")
+    compare.add_argument("--pixel-threshold", type=int, default=PIXEL_THRESHOLD)
+    compare.add_argument("--max-diff-ratio", type=float, default=MAX_DIFF_RATIO)
+    compare.add_argument("--trust-phash", action="store_true",
+                         help="Treat an identical perceptual hash as a match without a pixel diff.")
+
+    approve_parser = subparsers.add_parser("approve", help="Store the latest screenshots as baselines.")
+    approve_parser.add_argument("--step", action="append", help="Only approve this step (repeatable).")
+
+    args = parser.parse_args(argv)
+    if args.command == "approve":
+        approved = approve(args.screenshots, args.baselines, args.step)
+        print(f"✅ Approved {len(approved)} baselines in {args.baselines}")
+        return 0
+
+    results = compare_run(args.screenshots, args.baselines, workers=args.workers,
+                          pixel_threshold=args.pixel_threshold, max_diff_ratio=args.max_diff_ratio,
+                          trust_phash=args.trust_phash)
+    print(format_results(results))
+    print(f"Report saved to: {save_results(results)}")
+    return 1 if any(r["status"] in ("changed", "size_changed") for r in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())